@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 import os
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
@@ -39,100 +38,97 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 
 			image_filename = '{image_dir}/disk-octets-{devname}-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{devname} {title_disk_octets}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', '"Bytes per second"'])
-				args.append('DEF:ravg={data_dir}/disk-{devname}/disk_octets.rrd:read:AVERAGE'.format(**config))
-				args.append('DEF:rmin={data_dir}/disk-{devname}/disk_octets.rrd:read:MIN'.format(**config))
-				args.append('DEF:rmax={data_dir}/disk-{devname}/disk_octets.rrd:read:MAX'.format(**config))
-				args.append('VDEF:rtot=ravg,TOTAL')
-				args.append('DEF:wavg={data_dir}/disk-{devname}/disk_octets.rrd:write:AVERAGE'.format(**config))
-				args.append('DEF:wmin={data_dir}/disk-{devname}/disk_octets.rrd:write:MIN'.format(**config))
-				args.append('DEF:wmax={data_dir}/disk-{devname}/disk_octets.rrd:write:MAX'.format(**config))
-				args.append('VDEF:wtot=wavg,TOTAL')
-				args.append('LINE1:ravg{color_line_disk_read}:"Read"'.format(**config))
-				args.append('GPRINT:rmin:MIN:"%5.1lf%s Min"')
-				args.append('GPRINT:ravg:AVERAGE:"%5.1lf%s Avg"')
-				args.append('GPRINT:rmax:MAX:"%5.1lf%s Max"')
-				args.append('GPRINT:rtot:"%5.1lf%s Total\l"')
-				args.append('LINE1:wavg{color_line_disk_write}:"Write"'.format(**config))
-				args.append('GPRINT:wmin:MIN:"%5.1lf%s Min"')
-				args.append('GPRINT:wavg:AVERAGE:"%5.1lf%s Avg"')
-				args.append('GPRINT:wmax:MAX:"%5.1lf%s Max"')
-				args.append('GPRINT:wtot:"%5.1lf%s Total\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{devname} {title_disk_octets}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Bytes per second')
+				spec.DEF('ravg', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'read', 'AVERAGE')
+				spec.DEF('rmin', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'read', 'MIN')
+				spec.DEF('rmax', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'read', 'MAX')
+				spec.VDEF('rtot', 'ravg,TOTAL')
+				spec.DEF('wavg', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'write', 'AVERAGE')
+				spec.DEF('wmin', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'write', 'MIN')
+				spec.DEF('wmax', '{data_dir}/disk-{devname}/disk_octets.rrd'.format(**config), 'write', 'MAX')
+				spec.VDEF('wtot', 'wavg,TOTAL')
+				spec.LINE('ravg', config['color_line_disk_read'], 'Read')
+				spec.GPRINT('rmin', '%5.1lf%s Min', 'MIN')
+				spec.GPRINT('ravg', '%5.1lf%s Avg', 'AVERAGE')
+				spec.GPRINT('rmax', '%5.1lf%s Max', 'MAX')
+				spec.GPRINT('rtot', '%5.1lf%s Total\\l')
+				spec.LINE('wavg', config['color_line_disk_write'], 'Write')
+				spec.GPRINT('wmin', '%5.1lf%s Min', 'MIN')
+				spec.GPRINT('wavg', '%5.1lf%s Avg', 'AVERAGE')
+				spec.GPRINT('wmax', '%5.1lf%s Max', 'MAX')
+				spec.GPRINT('wtot', '%5.1lf%s Total\\l')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 
 			image_filename = '{image_dir}/disk-ops-{devname}-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{devname} {title_disk_ops}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', '"Operations per second"'])
-				args.append('DEF:ravg={data_dir}/disk-{devname}/disk_ops.rrd:read:AVERAGE'.format(**config))
-				args.append('DEF:rmin={data_dir}/disk-{devname}/disk_ops.rrd:read:MIN'.format(**config))
-				args.append('DEF:rmax={data_dir}/disk-{devname}/disk_ops.rrd:read:MAX'.format(**config))
-				args.append('VDEF:rtot=ravg,TOTAL')
-				args.append('DEF:wavg={data_dir}/disk-{devname}/disk_ops.rrd:write:AVERAGE'.format(**config))
-				args.append('DEF:wmin={data_dir}/disk-{devname}/disk_ops.rrd:write:MIN'.format(**config))
-				args.append('DEF:wmax={data_dir}/disk-{devname}/disk_ops.rrd:write:MAX'.format(**config))
-				args.append('VDEF:wtot=wavg,TOTAL')
-				args.append('LINE1:ravg{color_line_disk_read}:"Read"'.format(**config))
-				args.append('GPRINT:rmin:MIN:"%5.1lf%s Min"')
-				args.append('GPRINT:ravg:AVERAGE:"%5.1lf%s Avg"')
-				args.append('GPRINT:rmax:MAX:"%5.1lf%s Max"')
-				args.append('GPRINT:rtot:"%5.1lf%s Total\l"')
-				args.append('LINE1:wavg{color_line_disk_write}:"Write"'.format(**config))
-				args.append('GPRINT:wmin:MIN:"%5.1lf%s Min"')
-				args.append('GPRINT:wavg:AVERAGE:"%5.1lf%s Avg"')
-				args.append('GPRINT:wmax:MAX:"%5.1lf%s Max"')
-				args.append('GPRINT:wtot:"%5.1lf%s Total\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{devname} {title_disk_ops}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Operations per second')
+				spec.DEF('ravg', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'read', 'AVERAGE')
+				spec.DEF('rmin', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'read', 'MIN')
+				spec.DEF('rmax', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'read', 'MAX')
+				spec.VDEF('rtot', 'ravg,TOTAL')
+				spec.DEF('wavg', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'write', 'AVERAGE')
+				spec.DEF('wmin', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'write', 'MIN')
+				spec.DEF('wmax', '{data_dir}/disk-{devname}/disk_ops.rrd'.format(**config), 'write', 'MAX')
+				spec.VDEF('wtot', 'wavg,TOTAL')
+				spec.LINE('ravg', config['color_line_disk_read'], 'Read')
+				spec.GPRINT('rmin', '%5.1lf%s Min', 'MIN')
+				spec.GPRINT('ravg', '%5.1lf%s Avg', 'AVERAGE')
+				spec.GPRINT('rmax', '%5.1lf%s Max', 'MAX')
+				spec.GPRINT('rtot', '%5.1lf%s Total\\l')
+				spec.LINE('wavg', config['color_line_disk_write'], 'Write')
+				spec.GPRINT('wmin', '%5.1lf%s Min', 'MIN')
+				spec.GPRINT('wavg', '%5.1lf%s Avg', 'AVERAGE')
+				spec.GPRINT('wmax', '%5.1lf%s Max', 'MAX')
+				spec.GPRINT('wtot', '%5.1lf%s Total\\l')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 
 			image_filename = '{image_dir}/disk-time-{devname}-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/disk-{devname}/disk_time.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{devname} {title_disk_time}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', '"Avg. Time/Op"'])
-				args.append('DEF:ravg={data_dir}/disk-{devname}/disk_time.rrd:read:AVERAGE'.format(**config))
-				args.append('DEF:rmin={data_dir}/disk-{devname}/disk_time.rrd:read:MIN'.format(**config))
-				args.append('DEF:rmax={data_dir}/disk-{devname}/disk_time.rrd:read:MAX'.format(**config))
-				args.append('VDEF:rtot=ravg,TOTAL')
-				args.append('DEF:wavg={data_dir}/disk-{devname}/disk_time.rrd:write:AVERAGE'.format(**config))
-				args.append('DEF:wmin={data_dir}/disk-{devname}/disk_time.rrd:write:MIN'.format(**config))
-				args.append('DEF:wmax={data_dir}/disk-{devname}/disk_time.rrd:write:MAX'.format(**config))
-				args.append('VDEF:wtot=wavg,TOTAL')
-				args.append('LINE1:ravg{color_line_disk_read}:"Read"'.format(**config))
-				args.append('GPRINT:rmin:MIN:"%5.1lf%ss Min"')
-				args.append('GPRINT:ravg:AVERAGE:"%5.1lf%ss Avg"')
-				args.append('GPRINT:rmax:MAX:"%5.1lf%ss Max"')
-				args.append('GPRINT:rtot:"%5.1lf%s Total\l"')
-				args.append('LINE1:wavg{color_line_disk_write}:"Write"'.format(**config))
-				args.append('GPRINT:wmin:MIN:"%5.1lf%ss Min"')
-				args.append('GPRINT:wavg:AVERAGE:"%5.1lf%ss Avg"')
-				args.append('GPRINT:wmax:MAX:"%5.1lf%ss Max"')
-				args.append('GPRINT:wtot:"%5.1lf%s Total\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{devname} {title_disk_time}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Avg. Time/Op')
+				spec.DEF('ravg', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'read', 'AVERAGE')
+				spec.DEF('rmin', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'read', 'MIN')
+				spec.DEF('rmax', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'read', 'MAX')
+				spec.VDEF('rtot', 'ravg,TOTAL')
+				spec.DEF('wavg', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'write', 'AVERAGE')
+				spec.DEF('wmin', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'write', 'MIN')
+				spec.DEF('wmax', '{data_dir}/disk-{devname}/disk_time.rrd'.format(**config), 'write', 'MAX')
+				spec.VDEF('wtot', 'wavg,TOTAL')
+				spec.LINE('ravg', config['color_line_disk_read'], 'Read')
+				spec.GPRINT('rmin', '%5.1lf%ss Min', 'MIN')
+				spec.GPRINT('ravg', '%5.1lf%ss Avg', 'AVERAGE')
+				spec.GPRINT('rmax', '%5.1lf%ss Max', 'MAX')
+				spec.GPRINT('rtot', '%5.1lf%s Total\\l')
+				spec.LINE('wavg', config['color_line_disk_write'], 'Write')
+				spec.GPRINT('wmin', '%5.1lf%ss Min', 'MIN')
+				spec.GPRINT('wavg', '%5.1lf%ss Avg', 'AVERAGE')
+				spec.GPRINT('wmax', '%5.1lf%ss Max', 'MAX')
+				spec.GPRINT('wtot', '%5.1lf%s Total\\l')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 		return 0
@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 import os
 import re
 
@@ -56,51 +55,49 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 
 			image_filename = '{image_dir}/nut-charge-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/nut-{upsname}/percent-charge.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_charge}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--upper-limit', '100'])
-				args.extend(['--lower-limit', '0'])
-				args.append('--rigid')
-				args.extend(['--vertical-label', 'Percent'])
-				args.append('DEF:avg={data_dir}/nut-{upsname}/percent-charge.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:min={data_dir}/nut-{upsname}/percent-charge.rrd:value:MIN'.format(**config))
-				args.append('DEF:max={data_dir}/nut-{upsname}/percent-charge.rrd:value:MAX'.format(**config))
-				args.append('LINE1:avg{color_nut_charge}:"Charge"'.format(**config))
-				args.append('GPRINT:min:MIN:"%4.2lf Min"')
-				args.append('GPRINT:avg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:max:MAX:"%4.2lf Max"')
-				args.append('GPRINT:avg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_charge}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--upper-limit', '100')
+				spec.option('--lower-limit', '0')
+				spec.option('--rigid')
+				spec.option('--vertical-label', 'Percent')
+				spec.DEF('avg', '{data_dir}/nut-{upsname}/percent-charge.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('min', '{data_dir}/nut-{upsname}/percent-charge.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('max', '{data_dir}/nut-{upsname}/percent-charge.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('avg', config['color_nut_charge'], 'Charge')
+				spec.GPRINT('min', '%4.2lf Min', 'MIN')
+				spec.GPRINT('avg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('max', '%4.2lf Max', 'MAX')
+				spec.GPRINT('avg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 
 			image_filename = '{image_dir}/nut-load-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/nut-{upsname}/percent-load.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_load}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--upper-limit', '100'])
-				args.extend(['--lower-limit', '0'])
-				args.append('--rigid')
-				args.extend(['--vertical-label', 'Percent'])
-				args.append('DEF:avg={data_dir}/nut-{upsname}/percent-load.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:min={data_dir}/nut-{upsname}/percent-load.rrd:value:MIN'.format(**config))
-				args.append('DEF:max={data_dir}/nut-{upsname}/percent-load.rrd:value:MAX'.format(**config))
-				args.append('LINE1:avg{color_nut_load}:"Load"'.format(**config))
-				args.append('GPRINT:min:MIN:"%4.2lf Min"')
-				args.append('GPRINT:avg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:max:MAX:"%4.2lf Max"')
-				args.append('GPRINT:avg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_load}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--upper-limit', '100')
+				spec.option('--lower-limit', '0')
+				spec.option('--rigid')
+				spec.option('--vertical-label', 'Percent')
+				spec.DEF('avg', '{data_dir}/nut-{upsname}/percent-load.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('min', '{data_dir}/nut-{upsname}/percent-load.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('max', '{data_dir}/nut-{upsname}/percent-load.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('avg', config['color_nut_load'], 'Load')
+				spec.GPRINT('min', '%4.2lf Min', 'MIN')
+				spec.GPRINT('avg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('max', '%4.2lf Max', 'MAX')
+				spec.GPRINT('avg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 
@@ -111,43 +108,41 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			# informations.
 			image_filename = '{image_dir}/nut-temperature-{period}.png'.format(**config)
 			if os.path.exists('{data_dir}/nut-{upsname}/temperature-battery.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_temperature}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', 'Celsius'])
-				args.append('DEF:avg={data_dir}/nut-{upsname}/temperature-battery.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:min={data_dir}/nut-{upsname}/temperature-battery.rrd:value:MIN'.format(**config))
-				args.append('DEF:max={data_dir}/nut-{upsname}/temperature-battery.rrd:value:MAX'.format(**config))
-				args.append('LINE1:avg{color_nut_temperature}:"Temperature"'.format(**config))
-				args.append('GPRINT:min:MIN:"%4.2lf Min"')
-				args.append('GPRINT:avg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:max:MAX:"%4.2lf Max"')
-				args.append('GPRINT:avg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_temperature}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Celsius')
+				spec.DEF('avg', '{data_dir}/nut-{upsname}/temperature-battery.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('min', '{data_dir}/nut-{upsname}/temperature-battery.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('max', '{data_dir}/nut-{upsname}/temperature-battery.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('avg', config['color_nut_temperature'], 'Temperature')
+				spec.GPRINT('min', '%4.2lf Min', 'MIN')
+				spec.GPRINT('avg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('max', '%4.2lf Max', 'MAX')
+				spec.GPRINT('avg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			elif os.path.exists('{data_dir}/nut-{upsname}/temperature-ups.rrd'.format(**config)):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_temperature}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', 'Celsius'])
-				args.append('DEF:avg={data_dir}/nut-{upsname}/temperature-ups.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:min={data_dir}/nut-{upsname}/temperature-ups.rrd:value:MIN'.format(**config))
-				args.append('DEF:max={data_dir}/nut-{upsname}/temperature-ups.rrd:value:MAX'.format(**config))
-				args.append('LINE1:avg{color_nut_temperature}:"Temperature"'.format(**config))
-				args.append('GPRINT:min:MIN:"%4.2lf Min"')
-				args.append('GPRINT:avg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:max:MAX:"%4.2lf Max"')
-				args.append('GPRINT:avg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_temperature}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Celsius')
+				spec.DEF('avg', '{data_dir}/nut-{upsname}/temperature-ups.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('min', '{data_dir}/nut-{upsname}/temperature-ups.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('max', '{data_dir}/nut-{upsname}/temperature-ups.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('avg', config['color_nut_temperature'], 'Temperature')
+				spec.GPRINT('min', '%4.2lf Min', 'MIN')
+				spec.GPRINT('avg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('max', '%4.2lf Max', 'MAX')
+				spec.GPRINT('avg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 
@@ -155,96 +150,93 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			if (os.path.exists('{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config)) and
 					os.path.exists('{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config)) and
 					os.path.exists('{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config))):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_voltage}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', 'Volt'])
-				args.append('DEF:bavg={data_dir}/nut-{upsname}/voltage-battery.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:bmin={data_dir}/nut-{upsname}/voltage-battery.rrd:value:MIN'.format(**config))
-				args.append('DEF:bmax={data_dir}/nut-{upsname}/voltage-battery.rrd:value:MAX'.format(**config))
-				args.append('DEF:iavg={data_dir}/nut-{upsname}/voltage-input.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:imin={data_dir}/nut-{upsname}/voltage-input.rrd:value:MIN'.format(**config))
-				args.append('DEF:imax={data_dir}/nut-{upsname}/voltage-input.rrd:value:MAX'.format(**config))
-				args.append('DEF:oavg={data_dir}/nut-{upsname}/voltage-output.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:omin={data_dir}/nut-{upsname}/voltage-output.rrd:value:MIN'.format(**config))
-				args.append('DEF:omax={data_dir}/nut-{upsname}/voltage-output.rrd:value:MAX'.format(**config))
-				args.append('LINE1:bavg{color_nut_voltage_battery}:"Battery"'.format(**config))
-				args.append('GPRINT:bmin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:bavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:bmax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:bavg:LAST:"%4.2lf Last\l"')
-				args.append('LINE1:iavg{color_nut_voltage_input}:"Input"'.format(**config))
-				args.append('GPRINT:imin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:iavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:imax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:iavg:LAST:"%4.2lf Last\l"')
-				args.append('LINE1:oavg{color_nut_voltage_output}:"Output"'.format(**config))
-				args.append('GPRINT:omin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:oavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:omax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:oavg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_voltage}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Volt')
+				spec.DEF('bavg', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('bmin', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('bmax', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'MAX')
+				spec.DEF('iavg', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('imin', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('imax', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MAX')
+				spec.DEF('oavg', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('omin', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('omax', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('bavg', config['color_nut_voltage_battery'], 'Battery')
+				spec.GPRINT('bmin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('bavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('bmax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('bavg', '%4.2lf Last\\l', 'LAST')
+				spec.LINE('iavg', config['color_nut_voltage_input'], 'Input')
+				spec.GPRINT('imin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('iavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('imax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('iavg', '%4.2lf Last\\l', 'LAST')
+				spec.LINE('oavg', config['color_nut_voltage_output'], 'Output')
+				spec.GPRINT('omin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('oavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('omax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('oavg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			elif (os.path.exists('{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config)) and
 					os.path.exists('{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config))):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_voltage}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', 'Volt'])
-				args.append('DEF:bavg={data_dir}/nut-{upsname}/voltage-battery.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:bmin={data_dir}/nut-{upsname}/voltage-battery.rrd:value:MIN'.format(**config))
-				args.append('DEF:bmax={data_dir}/nut-{upsname}/voltage-battery.rrd:value:MAX'.format(**config))
-				args.append('DEF:iavg={data_dir}/nut-{upsname}/voltage-input.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:imin={data_dir}/nut-{upsname}/voltage-input.rrd:value:MIN'.format(**config))
-				args.append('DEF:imax={data_dir}/nut-{upsname}/voltage-input.rrd:value:MAX'.format(**config))
-				args.append('LINE1:bavg{color_nut_voltage_battery}:"Battery"'.format(**config))
-				args.append('GPRINT:bmin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:bavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:bmax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:bavg:LAST:"%4.2lf Last\l"')
-				args.append('LINE1:iavg{color_nut_voltage_input}:"Input"'.format(**config))
-				args.append('GPRINT:imin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:iavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:imax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:iavg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_voltage}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Volt')
+				spec.DEF('bavg', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('bmin', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('bmax', '{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config), 'value', 'MAX')
+				spec.DEF('iavg', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('imin', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('imax', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('bavg', config['color_nut_voltage_battery'], 'Battery')
+				spec.GPRINT('bmin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('bavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('bmax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('bavg', '%4.2lf Last\\l', 'LAST')
+				spec.LINE('iavg', config['color_nut_voltage_input'], 'Input')
+				spec.GPRINT('imin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('iavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('imax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('iavg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			elif (os.path.exists('{data_dir}/nut-{upsname}/voltage-battery.rrd'.format(**config)) and
 					os.path.exists('{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config))):
-				args = []
-				args.append(image_filename)
-				args.extend(config['defaults'])
-				args.extend(['--start', config['start']])
-				args.extend(['--title', '"{title_nut_voltage}{title_by_period}"'.format(**config)])
-				args.append('--slope-mode')
-				args.extend(['--lower-limit', '0'])
-				args.extend(['--vertical-label', 'Volt'])
-				args.append('DEF:iavg={data_dir}/nut-{upsname}/voltage-input.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:imin={data_dir}/nut-{upsname}/voltage-input.rrd:value:MIN'.format(**config))
-				args.append('DEF:imax={data_dir}/nut-{upsname}/voltage-input.rrd:value:MAX'.format(**config))
-				args.append('DEF:oavg={data_dir}/nut-{upsname}/voltage-output.rrd:value:AVERAGE'.format(**config))
-				args.append('DEF:omin={data_dir}/nut-{upsname}/voltage-output.rrd:value:MIN'.format(**config))
-				args.append('DEF:omax={data_dir}/nut-{upsname}/voltage-output.rrd:value:MAX'.format(**config))
-				args.append('LINE1:iavg{color_nut_voltage_input}:"Input"'.format(**config))
-				args.append('GPRINT:imin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:iavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:imax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:iavg:LAST:"%4.2lf Last\l"')
-				args.append('LINE1:oavg{color_nut_voltage_output}:"Output"'.format(**config))
-				args.append('GPRINT:omin:MIN:"%4.2lf Min"')
-				args.append('GPRINT:oavg:AVERAGE:"%4.2lf Avg"')
-				args.append('GPRINT:omax:MAX:"%4.2lf Max"')
-				args.append('GPRINT:oavg:LAST:"%4.2lf Last\l"')
-				args.append('COMMENT:"{last_update}"'.format(**config))
-				openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+				spec = openmediavault.mkrrdgraph.GraphSpec(
+					image_filename, config['defaults'])
+				spec.option('--start', config['start'])
+				spec.option('--title', '{title_nut_voltage}{title_by_period}'.format(**config))
+				spec.option('--slope-mode')
+				spec.option('--lower-limit', '0')
+				spec.option('--vertical-label', 'Volt')
+				spec.DEF('iavg', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('imin', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('imax', '{data_dir}/nut-{upsname}/voltage-input.rrd'.format(**config), 'value', 'MAX')
+				spec.DEF('oavg', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'AVERAGE')
+				spec.DEF('omin', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'MIN')
+				spec.DEF('omax', '{data_dir}/nut-{upsname}/voltage-output.rrd'.format(**config), 'value', 'MAX')
+				spec.LINE('iavg', config['color_nut_voltage_input'], 'Input')
+				spec.GPRINT('imin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('iavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('imax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('iavg', '%4.2lf Last\\l', 'LAST')
+				spec.LINE('oavg', config['color_nut_voltage_output'], 'Output')
+				spec.GPRINT('omin', '%4.2lf Min', 'MIN')
+				spec.GPRINT('oavg', '%4.2lf Avg', 'AVERAGE')
+				spec.GPRINT('omax', '%4.2lf Max', 'MAX')
+				spec.GPRINT('oavg', '%4.2lf Last\\l', 'LAST')
+				spec.COMMENT(config['last_update'])
+				openmediavault.mkrrdgraph.render_graph(spec)
 			else:
 				openmediavault.mkrrdgraph.copy_placeholder_image(image_filename)
 		return 0
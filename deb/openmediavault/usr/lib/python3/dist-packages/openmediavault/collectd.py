@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+__all__ = [
+	"ConfigItem",
+	"ConfigParseError",
+	"load",
+	"parse"
+]
+
+import os
+import re
+import threading
+
+_TOKEN_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|(</|<|>)|(#.*)|([^\s"<>#]+)|(\S)')
+_NUMBER_RE = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+_BOOLEANS = {
+	"true": True, "yes": True, "on": True,
+	"false": False, "no": False, "off": False
+}
+
+# The parsed configuration files, see load().
+_cache = {}
+_cache_lock = threading.Lock()
+
+class ConfigParseError(ValueError):
+	pass
+
+class ConfigItem(object):
+	"""
+	A configuration option or block. An option like 'MountPoint "/"'
+	has the key 'MountPoint' and the values ['/'], a block like
+	'<Plugin df>' additionally contains the nested items. Unquoted
+	values are converted to booleans and numbers, the raw_values
+	contain the values as written in the file, e.g. '01' or '1e3'.
+	"""
+
+	def __init__(self, key, values=None, raw_values=None):
+		self.key = key
+		self.values = list(values or [])
+		if raw_values is None:
+			raw_values = [ str(value) for value in self.values ]
+		self.raw_values = list(raw_values)
+		self.children = []
+
+	def __repr__(self):
+		return "ConfigItem({!r}, {!r})".format(self.key, self.values)
+
+	def find_all(self, key):
+		"""
+		Get the nested items with the given key. Keys are case
+		insensitive.
+		:param key:	The key of the items.
+		:returns:	Returns the list of matching items.
+		"""
+		key = key.lower()
+		return [ child for child in self.children
+			if child.key.lower() == key ]
+
+	def get_values(self, key, raw=False):
+		"""
+		Get the values of an option that may be repeated.
+		:param key:	The key of the option.
+		:param raw:	Set to True to get the values as written in the
+			file. Defaults to False.
+		:returns:	Returns the values of all occurrences of the option.
+		"""
+		values = []
+		for child in self.find_all(key):
+			values.extend(child.raw_values if raw else child.values)
+		return values
+
+	def get_plugin(self, name):
+		"""
+		Get the configuration blocks of a plugin, e.g. '<Plugin df>'.
+		:param name:	The name of the plugin.
+		:returns:	Returns the list of blocks.
+		"""
+		name = name.lower()
+		return [ block for block in self.find_all("Plugin")
+			if block.values and str(block.values[0]).lower() == name ]
+
+	def get_plugin_values(self, name, key, raw=False):
+		"""
+		Get the values of an option of a plugin.
+		:param name:	The name of the plugin.
+		:param key:	The key of the option.
+		:param raw:	Set to True to get the values as written in the
+			file. Defaults to False.
+		:returns:	Returns the values of all occurrences of the option
+			within the blocks of the plugin.
+		"""
+		values = []
+		for block in self.get_plugin(name):
+			values.extend(block.get_values(key, raw))
+		return values
+
+def _convert(token):
+	lower = token.lower()
+	if lower in _BOOLEANS:
+		return _BOOLEANS[lower]
+	if _NUMBER_RE.match(token):
+		return float(token) if re.search(r"[.eE]", token) else int(token)
+	return token
+
+def _tokenize(line, filename, lineno):
+	tokens = []
+	for m in _TOKEN_RE.finditer(line):
+		string, punct, comment, bare, invalid = m.groups()
+		if comment is not None:
+			break
+		if invalid is not None:
+			raise ConfigParseError("Unexpected character '{}' in "
+				"{}:{}".format(invalid, filename, lineno))
+		if string is not None:
+			tokens.append(("string", re.sub(r"\\(.)", r"\1", string)))
+		elif punct is not None:
+			tokens.append((punct, punct))
+		else:
+			tokens.append(("bare", bare))
+	return tokens
+
+def _get_values(tokens):
+	return [ _convert(text) if "bare" == kind else text
+		for kind, text in tokens ]
+
+def _get_raw_values(tokens):
+	return [ text for _, text in tokens ]
+
+def _lines(text):
+	lineno = 0
+	pending = None
+	for lineno, line in enumerate(text.splitlines(), 1):
+		# A backslash at the end of a line continues the line.
+		if pending is not None:
+			line = pending + line
+			pending = None
+		if line.endswith("\\"):
+			pending = line[:-1]
+			continue
+		yield lineno, line
+	if pending is not None:
+		yield lineno, pending
+
+def parse(text, filename="<string>"):
+	"""
+	Parse a collectd configuration.
+	:param text:	The content of the configuration file.
+	:param filename:	The name of the file used in error messages.
+	:returns:	Returns the root ConfigItem object, its children are the
+		top-level options and blocks.
+	:raises ConfigParseError:	If the configuration is malformed.
+	"""
+	root = ConfigItem(None)
+	stack = [ root ]
+	for lineno, line in _lines(text):
+		tokens = _tokenize(line, filename, lineno)
+		if not tokens:
+			continue
+		kinds = [ kind for kind, _ in tokens ]
+		if "bare" == kinds[0] and set(kinds[1:]) <= { "bare", "string" }:
+			# An option, e.g. 'MountPoint "/"'.
+			item = ConfigItem(tokens[0][1], _get_values(tokens[1:]),
+				_get_raw_values(tokens[1:]))
+			stack[-1].children.append(item)
+		elif len(kinds) > 2 and kinds[:2] == [ "<", "bare" ] and \
+				">" == kinds[-1] and \
+				set(kinds[2:-1]) <= { "bare", "string" }:
+			# The beginning of a block, e.g. '<Plugin df>'.
+			item = ConfigItem(tokens[1][1], _get_values(tokens[2:-1]),
+				_get_raw_values(tokens[2:-1]))
+			stack[-1].children.append(item)
+			stack.append(item)
+		elif kinds == [ "</", "bare", ">" ]:
+			key = tokens[1][1]
+			if len(stack) == 1 or stack[-1].key.lower() != key.lower():
+				raise ConfigParseError("Unexpected closing block '{}' "
+					"in {}:{}".format(key, filename, lineno))
+			stack.pop()
+		else:
+			raise ConfigParseError("Invalid syntax in {}:{}".format(
+				filename, lineno))
+	if len(stack) > 1:
+		raise ConfigParseError("Block '{}' is not closed in {}".format(
+			stack[-1].key, filename))
+	return root
+
+def load(filename):
+	"""
+	Load a collectd configuration file. The file is parsed only once as
+	long as it is not modified.
+	:param filename:	The name of the configuration file.
+	:returns:	Returns the root ConfigItem object. It must not be
+		modified because it is shared by all callers.
+	:raises OSError:	If the file can't be read.
+	:raises ConfigParseError:	If the configuration is malformed.
+	"""
+	st = os.stat(filename)
+	signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+	with _cache_lock:
+		cached = _cache.get(filename)
+	if cached is not None and cached[0] == signature:
+		return cached[1]
+	with open(filename, "r") as fd:
+		root = parse(fd.read(), filename)
+	with _cache_lock:
+		_cache[filename] = (signature, root)
+	return root
@@ -24,6 +24,7 @@ __all__ = [
 	"DotCollapsedDict"
 ]
 
+import functools
 import re
 
 def flatten(d, seperator="."):
@@ -56,6 +57,49 @@ def flatten(d, seperator="."):
 	_process_item(d)
 	return result
 
+_INDEX_KEY_RE = re.compile(r'(\w+)\[(\d+)\](.(\S+))?')
+_INDEX_RE = re.compile(r'(\d+)(.(\S+))?')
+
+@functools.lru_cache(maxsize=4096)
+def _parse_key(key):
+	"""
+	Helper function to parse a key in dot notation, e.g. 'a.b.c' or
+	'a[0].b'. The result is cached because the same keys are accessed
+	over and over again.
+	:param key:	The key to parse.
+	:returns:	Returns a tuple (first, index, rest). The index is None
+				if the key does not start with a list index, e.g.
+				'a[0]'. The rest is None if there is nothing left.
+				Returns None if the key is no path at all.
+	"""
+	matches = _INDEX_KEY_RE.match(key)
+	if matches is not None:
+		return (matches.group(1), int(matches.group(2)), matches.group(4))
+	if "." not in key:
+		return None
+	first, rest = key.split(".", 1)
+	return (first, None, rest)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_index(key):
+	"""
+	Helper function to parse a key that starts with a list index,
+	e.g. '0.a.b'.
+	:param key:	The key to parse.
+	:returns:	Returns a tuple (index, rest) or None if the key does
+				not start with a list index. The rest is None if
+				there is nothing left.
+	"""
+	matches = _INDEX_RE.match(key)
+	if matches is None:
+		return None
+	return (int(matches.group(1)), matches.group(3))
+
+def _is_path(key):
+	# Keys without dots and brackets are plain dictionary keys. This
+	# is the fast path for most accesses.
+	return key.__class__ is str and ("." in key or "[" in key)
+
 class DotDict(dict):
 	def __init__(self, d=None):
 		if d is None:
@@ -76,12 +120,14 @@ class DotDict(dict):
 		return default
 
 	def __getitem__(self, key):
-		matches = re.match(r'(\w+)\[(\d+)\](.(\S+))?', key)
-		if not matches is None:
-			first = matches.group(1)
-			index = int(matches.group(2))
-			rest = matches.group(4)
-			branch = dict.__getitem__(self, first)
+		if not _is_path(key):
+			return dict.__getitem__(self, key)
+		parts = _parse_key(key)
+		if parts is None:
+			return dict.__getitem__(self, key)
+		first, index, rest = parts
+		branch = dict.__getitem__(self, first)
+		if index is not None:
 			if not isinstance(branch, list):
 				raise TypeError("Expected list.")
 			if rest is None:
@@ -91,35 +137,36 @@ class DotDict(dict):
 			if not isinstance(branch, DotDict):
 				raise TypeError("Expected dictionary.")
 			return branch[rest]
-		elif key is None or "." not in key:
-			return dict.__getitem__(self, key)
-		else:
-			first, rest = key.split(".", 1)
-			branch = dict.__getitem__(self, first)
-			if isinstance(branch, list):
-				index = rest
-				if "." not in index:
-					rest = None
-				else:
-					index, rest = index.split(".", 1)
-				if not index.isdigit():
-					raise KeyError("Key '{}' must be a number.".format(index))
-				branch = branch[int(index)]
-				if rest is None:
-					return branch
-			if not isinstance(branch, DotDict):
-				raise KeyError("Can't get '{}' in '{}' ({}).".format(
-					rest, first, str(branch)))
-			return branch[rest]
+		if isinstance(branch, list):
+			index = rest
+			if "." not in index:
+				rest = None
+			else:
+				index, rest = index.split(".", 1)
+			if not index.isdigit():
+				raise KeyError("Key '{}' must be a number.".format(index))
+			branch = branch[int(index)]
+			if rest is None:
+				return branch
+		if not isinstance(branch, DotDict):
+			raise KeyError("Can't get '{}' in '{}' ({}).".format(
+				rest, first, str(branch)))
+		return branch[rest]
 
 	__getattr__ = __getitem__
 
 	def __setitem__(self, key, value):
-		matches = re.match(r'(\w+)\[(\d+)\](.(\S+))?', key)
-		if not matches is None:
-			first = matches.group(1)
-			index = int(matches.group(2))
-			rest = matches.group(4)
+		parts = _parse_key(key) if _is_path(key) else None
+		if parts is None:
+			if isinstance(value, list):
+				value = [DotDict(item) if isinstance(item, dict) else item
+					for item in value]
+			if isinstance(value, dict) and not isinstance(value, DotDict):
+				value = DotDict(value)
+			dict.__setitem__(self, key, value)
+			return
+		first, index, rest = parts
+		if index is not None:
 			branch = self.setdefault(first, list())
 			# Auto-expand list if necessary.
 			size = len(branch)
@@ -132,61 +179,49 @@ class DotDict(dict):
 				if not isinstance(branch[index], DotDict):
 					raise TypeError("Expected dictionary.")
 				branch[index][rest] = value
-		elif not key is None and "." in key:
-			first, rest = key.split(".", 1)
-			# Is it a list?
-			matches = re.match(r'(\d+)(.(\S+))?', rest)
-			if not matches:
-				branch = self.setdefault(first, DotDict())
-			else:
-				branch = self.setdefault(first, list())
-				if not isinstance(branch, list):
-					raise TypeError("Expected list.")
-				index = int(matches.group(1))
-				rest = matches.group(3)
-				# Auto-expand list if necessary.
-				size = len(branch)
-				if index >= size:
-					branch.extend(DotDict() for _ in range(size, index + 1))
-				# Populate the list at the given index.
-				if rest is None:
-					branch[index] = DotDict(value) if isinstance(value, dict) else value
-					return
-				if not isinstance(branch[index], DotDict):
-					raise TypeError("Expected dictionary.")
-				branch = branch[index]
-			if not isinstance(branch, DotDict):
-				branch = DotDict()
-			branch[rest] = value
+			return
+		# Is it a list?
+		parts = _parse_index(rest)
+		if parts is None:
+			branch = self.setdefault(first, DotDict())
 		else:
-			if isinstance(value, list):
-				value = [DotDict(item) if isinstance(item, dict) else item
-					for item in value]
-			if isinstance(value, dict) and not isinstance(value, DotDict):
-				value = DotDict(value)
-			dict.__setitem__(self, key, value)
+			branch = self.setdefault(first, list())
+			if not isinstance(branch, list):
+				raise TypeError("Expected list.")
+			index, rest = parts
+			# Auto-expand list if necessary.
+			size = len(branch)
+			if index >= size:
+				branch.extend(DotDict() for _ in range(size, index + 1))
+			# Populate the list at the given index.
+			if rest is None:
+				branch[index] = DotDict(value) if isinstance(value, dict) else value
+				return
+			if not isinstance(branch[index], DotDict):
+				raise TypeError("Expected dictionary.")
+			branch = branch[index]
+		if not isinstance(branch, DotDict):
+			branch = DotDict()
+		branch[rest] = value
 
 	__setattr__ = __setitem__
 
 	def __contains__(self, key):
-		matches = re.match(r'(\w+)\[(\d+)\](.(\S+))?', key)
-		if not matches is None:
-			first = matches.group(1)
-			index = int(matches.group(2))
-			rest = matches.group(4)
-			branch = dict.__getitem__(self, first)
-			if rest is None:
-				return index in branch
-			branch = branch[index]
-			return rest in branch
-		else:
-			if key is None or not "." in key:
-				return dict.__contains__(self, key)
-			else:
-				first, rest = key.split(".", 1)
+		if not _is_path(key):
+			return dict.__contains__(self, key)
+		parts = _parse_key(key)
+		if parts is None:
+			return dict.__contains__(self, key)
+		first, index, rest = parts
 		if not dict.__contains__(self, first):
 			return False
 		branch = dict.__getitem__(self, first)
+		if index is not None:
+			if not isinstance(branch, list) or index >= len(branch):
+				return False
+			if rest is None:
+				return True
+			branch = branch[index]
 		if not isinstance(branch, DotDict):
 			return False
 		return rest in branch
@@ -18,7 +18,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
-__all__ = [ "ICommand" ]
+__all__ = [ "ICommand", "get_shell_prefix", "to_shell" ]
 
 import abc
 import os
@@ -26,11 +26,62 @@ import argparse
 import shutil
 import json
 import re
+import shlex
 import sys
 import tempfile
 import openmediavault
 import openmediavault.config.datamodel
 import openmediavault.string
+import openmediavault.subprocess
+
+def get_shell_prefix(id):
+	"""
+	Get the default prefix of the shell variable names of the given
+	data model. It prevents the variables from overwriting those of
+	the calling script.
+	:param id:	The data model ID, e.g. 'conf.service.ssh'.
+	:returns:	Returns the last part of the data model ID followed by
+		an underscore, e.g. 'ssh_'.
+	"""
+	return "%s_" % id.split(".")[-1]
+
+def to_shell(data, prefix=""):
+	"""
+	Convert configuration object(s) to shell variable assignments that
+	can be evaluated by a shell script. The variable names are the
+	property paths, e.g. 'ntp_enable' for the property 'ntp.enable'.
+	Lists are converted to the variable '<name>_count' and the
+	variables '<name>_<index>...' of the list items. Boolean values
+	are converted to 1 and 0. Names that would start with a digit,
+	e.g. the items of a list without a prefix, are prefixed with an
+	underscore, thus every name is a valid shell identifier.
+	Example:
+	eval "$(omv-confdbadm read --format=shell conf.system.time)"
+	echo ${time_timezone}
+	:param data:	The dictionary or list returned by get_dict().
+	:param prefix:	The prefix of the variable names. Defaults to ''.
+	:returns:	Returns the list of assignments, e.g. "timezone='UTC'".
+	"""
+	lines = []
+	def _process(name, value):
+		if isinstance(value, dict):
+			for key, item in value.items():
+				_process(name + [ key ], item)
+		elif isinstance(value, list):
+			_process(name + [ "count" ], len(value))
+			for index, item in enumerate(value):
+				_process(name + [ str(index) ], item)
+		else:
+			if isinstance(value, bool):
+				value = int(value)
+			elif value is None:
+				value = ""
+			var_name = re.sub(r"[^A-Za-z0-9_]", "_", prefix + "_".join(name))
+			if not var_name or var_name[0].isdigit():
+				var_name = "_" + var_name
+			lines.append("%s=%s" % (var_name, shlex.quote(str(value))))
+	_process([], data)
+	return lines
 
 class ICommand(metaclass=abc.ABCMeta):
 	@abc.abstractproperty
@@ -85,6 +136,35 @@ class CommandHelper():
 		shutil.copy(self._backup_path, openmediavault.getenv(
 			"OMV_CONFIG_FILE"))
 
+	def execCreateScript(self, id):
+		"""
+		Execute the script that creates the default configuration for
+		the specified data model.
+		:param id:	The data model ID, e.g. 'conf.service.ssh'.
+		:raises RuntimeError:	If the script does not exist or is not
+			executable.
+		:raises subprocess.CalledProcessError:	If the script fails.
+		"""
+		create_dir = openmediavault.getenv("OMV_CONFDB_CREATE_DIR",
+			"/usr/share/openmediavault/confdb/create.d");
+		script_name = ""
+		for name in os.listdir(create_dir):
+			# Split the script name into its parts:
+			# <DATAMODELID>.<EXT>
+			if id == os.path.splitext(name)[0]:
+				script_name = name
+				break
+		# Test if the script exists and is executable.
+		script_path = os.path.join(create_dir, script_name)
+		if not os.path.exists(script_path):
+			raise RuntimeError("The script '%s' does not exist" %
+				script_name)
+		if not os.access(script_path, os.X_OK):
+			raise RuntimeError("The script '%s' is not " \
+				"executable" % script_name)
+		# Execute the script.
+		openmediavault.subprocess.check_call([ script_path ])
+
 	def argparse_is_uuid4(self, arg):
 		"""
 		Check if the specified value is a valid UUID4.
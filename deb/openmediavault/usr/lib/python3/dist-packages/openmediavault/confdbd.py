@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+__all__ = [ "RequestHandler", "Server", "evaluate" ]
+
+import json
+import math
+import socketserver
+import lxml.etree
+import openmediavault
+import openmediavault.config
+
+def _to_string(value):
+	"""
+	Convert the result of a XPath expression to a string like the
+	XPath string() function does.
+	"""
+	if isinstance(value, bool):
+		return "true" if value else "false"
+	if isinstance(value, float):
+		if math.isnan(value):
+			return "NaN"
+		if math.isinf(value):
+			return "Infinity" if value > 0 else "-Infinity"
+		if value.is_integer():
+			return str(int(value))
+		return repr(value)
+	if isinstance(value, lxml.etree._Element):
+		return value.xpath("string()")
+	return str(value)
+
+def evaluate(tree, expr):
+	"""
+	Evaluate a XPath expression like 'xmlstarlet sel -t -v <expr>'
+	does. The string values of all nodes of a node-set are separated
+	by a newline.
+	:param tree:	The lxml.etree.ElementTree instance.
+	:param expr:	The XPath expression, e.g. '//system/time/timezone'.
+	:returns:	Returns the string value of the result.
+	:raises lxml.etree.XPathError:	If the expression is invalid.
+	"""
+	value = tree.xpath(expr)
+	if isinstance(value, list):
+		return "\n".join(_to_string(node) for node in value)
+	return _to_string(value)
+
+class RequestHandler(socketserver.StreamRequestHandler):
+	"""
+	Processes the queries of a client, one per line:
+	- 'xpath <expr>' evaluates a XPath expression, see evaluate().
+	- 'get <id> [<identifier>]' gets the configuration object(s) of
+	  a data model, e.g. 'get conf.system.time'.
+	The reply is 'OK <JSON encoded result>' or 'ERROR <message>'. A
+	client can send several queries over the same connection.
+	"""
+
+	timeout = 60
+
+	def _process(self, line):
+		command, _, arg = line.partition(" ")
+		if "xpath" == command:
+			# The XML tree is parsed again only if the configuration file
+			# has been modified.
+			tree = openmediavault.config.DatabaseCache.get(
+				openmediavault.getenv("OMV_CONFIG_FILE"))
+			return evaluate(tree, arg)
+		if "get" == command:
+			db = openmediavault.config.Database()
+			objs = db.get(*arg.split(None, 1))
+			if isinstance(objs, list):
+				return [ obj.get_dict() for obj in objs ]
+			return objs.get_dict()
+		raise ValueError("Unknown command '%s'." % command)
+
+	def handle(self):
+		try:
+			for line in self.rfile:
+				line = line.decode(errors="replace").rstrip("\n")
+				try:
+					response = "OK %s" % json.dumps(self._process(line))
+				except Exception as e:
+					response = "ERROR %s" % str(e).replace("\n", " ")
+				self.wfile.write(("%s\n" % response).encode())
+		except OSError:
+			# The client has disconnected or has been idle too long.
+			pass
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+	"""
+	The configuration database query server. The parsed configuration
+	file is kept in memory and shared by all queries.
+	"""
+	daemon_threads = True
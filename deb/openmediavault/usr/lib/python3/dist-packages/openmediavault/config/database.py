@@ -20,10 +20,14 @@
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 __all__ = [
 	"Database",
+	"DatabaseCache",
 	"DatabaseException",
 	"DatabaseQueryException",
 	"DatabaseQueryNotFoundException",
 	"DatabaseFilter",
+	"DatabaseIndex",
+	"DatabaseObject",
+	"DatabaseTransaction",
 	"DatabaseGetQuery",
 	"DatabaseGetByFilterQuery",
 	"DatabaseSetQuery",
@@ -33,13 +37,26 @@ __all__ = [
 ]
 
 import abc
+import contextlib
+import functools
+import hashlib
+import io
 import os
+import re
+import stat
+import tempfile
+import threading
+import time
 import lxml.etree
 import fcntl
 import openmediavault.collections
 import openmediavault.config.datamodel
 import openmediavault.config.object
 
+# The package is not completely initialized at this point, thus the
+# base class must be imported directly.
+from openmediavault.config.object import Object
+
 class DatabaseException(Exception):
 	pass
 
@@ -64,7 +81,705 @@ class DatabaseQueryNotFoundException(DatabaseQueryException):
 class DatabaseFilter(openmediavault.collections.DotDict):
 	pass
 
+class DatabaseCache(object):
+	"""
+	A process-wide cache of the parsed XML configuration files. A cached
+	tree is identified by the device, inode, modification time and size
+	of the file it was parsed from, thus it is invalidated automatically
+	as soon as the file is modified on disk.
+	A file that is rewritten in place, e.g. by the PHP implementation,
+	keeps its inode. If it also keeps its size and is modified within
+	the same tick of the file system timestamps, then its key does not
+	change. Thus the content of files that have been modified less than
+	RACY_INTERVAL seconds before they were read is compared, too.
+	Note, the cached trees are shared by all read-only database queries,
+	so they MUST NOT be modified.
+	"""
+	enabled = True
+	RACY_INTERVAL = 2
+	_entries = {}
+	_lock = threading.Lock()
+
+	@staticmethod
+	def _get_key(st):
+		return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+	@staticmethod
+	def _is_racy(st):
+		# A file modified right before it was read might be modified
+		# again without changing its modification time.
+		return time.time() - st.st_mtime < DatabaseCache.RACY_INTERVAL
+
+	@staticmethod
+	def _get_digest(content):
+		return hashlib.sha1(content).digest()
+
+	@staticmethod
+	def get(path):
+		"""
+		Get the parsed XML tree of the specified file. The file is parsed
+		only if it is not cached or if it has been modified in the meantime.
+		:param path:	The path of the XML configuration file.
+		:returns:		Returns the lxml.etree.ElementTree instance.
+		"""
+		return DatabaseCache.lookup(path)[0]
+
+	@staticmethod
+	def lookup(path):
+		"""
+		Get the parsed XML tree of the specified file and its secondary
+		indexes.
+		:param path:	The path of the XML configuration file.
+		:returns:		Returns a tuple of the lxml.etree.ElementTree and
+						the openmediavault.config.DatabaseIndex instance.
+		"""
+		if not DatabaseCache.enabled:
+			tree = lxml.etree.parse(path)
+			return (tree, DatabaseIndex(tree))
+		with DatabaseCache._lock:
+			st = os.stat(path)
+			key = DatabaseCache._get_key(st)
+			entry = DatabaseCache._entries.get(path)
+			if entry is not None and entry[0] == key and entry[3] is None:
+				return entry[1:3]
+			if entry is not None and entry[0] != key:
+				entry = None
+			racy = DatabaseCache._is_racy(st)
+			if entry is None and not racy:
+				tree = lxml.etree.parse(path)
+				index = DatabaseIndex(tree)
+				digest = None
+			else:
+				# The file might have been modified without changing its
+				# key, thus compare the content.
+				with open(path, "rb") as f:
+					content = f.read()
+				digest = DatabaseCache._get_digest(content)
+				if entry is not None and entry[3] == digest:
+					(tree, index) = entry[1:3]
+				else:
+					tree = lxml.etree.parse(io.BytesIO(content),
+						base_url=path)
+					index = DatabaseIndex(tree)
+				if not racy:
+					digest = None
+			DatabaseCache._entries[path] = (key, tree, index, digest)
+			return (tree, index)
+
+	@staticmethod
+	def put(path, tree, index=None, content=None):
+		"""
+		Store the XML tree that has just been written to the specified
+		file. The tree MUST NOT be modified afterwards.
+		:param path:	The path of the XML configuration file.
+		:param tree:	The lxml.etree.ElementTree instance.
+		:param index:	The openmediavault.config.DatabaseIndex instance
+						of the tree. Defaults to None.
+		:param content:	The content that has been written to the file.
+						If not set, the tree is not cached if the file
+						could be modified unnoticed, see RACY_INTERVAL.
+						Defaults to None.
+		"""
+		if not DatabaseCache.enabled:
+			return
+		if index is None:
+			index = DatabaseIndex(tree)
+		with DatabaseCache._lock:
+			st = os.stat(path)
+			digest = None
+			if DatabaseCache._is_racy(st):
+				if content is None:
+					DatabaseCache._entries.pop(path, None)
+					return
+				digest = DatabaseCache._get_digest(content)
+			DatabaseCache._entries[path] = (DatabaseCache._get_key(st),
+				tree, index, digest)
+
+	@staticmethod
+	def invalidate(path=None):
+		"""
+		Remove the specified file from the cache.
+		:param path:	The path of the XML configuration file. If not
+						set, then the whole cache is cleared. Defaults
+						to None.
+		"""
+		with DatabaseCache._lock:
+			if path is None:
+				DatabaseCache._entries.clear()
+			else:
+				DatabaseCache._entries.pop(path, None)
+
+class DatabaseIndex(object):
+	"""
+	Secondary indexes of a XML tree. They map the values of the data
+	model 'idproperty' to the elements of the configuration objects and
+	count the references of the 'refproperty' elements. The indexes are
+	built on first use and MUST be updated incrementally via add() and
+	remove() when the XML tree is modified.
+	"""
+	enabled = True
+
+	_uuid_re = re.compile(r'[0-9a-f]{8}-([0-9a-f]{4}-){3}[0-9a-f]{12}',
+		flags=re.IGNORECASE)
+	_xpath_re = re.compile(r'^//\w+(/\w+)*$')
+
+	def __init__(self, tree):
+		"""
+		:param tree: The lxml.etree.ElementTree instance to index.
+		"""
+		self._tree = tree
+		# The identifier indexes per property name, e.g.
+		# { 'uuid': { '<UUID>': [ <Element sharedfolder> ] } }
+		self._ids = {}
+		# The reference counters per property name, e.g.
+		# { 'mntentref': { '<UUID>': 2 } }
+		self._refs = {}
+
+	def is_indexable(self, model):
+		"""
+		Check whether the configuration objects of the data model can be
+		looked up via the index.
+		:param model:	The openmediavault.config.Datamodel object.
+		:returns:		Returns True if the index can be used.
+		"""
+		return model.is_iterable and model.is_identifiable and \
+			None != self._xpath_re.match(model.queryinfo['xpath'])
+
+	def get(self, model, identifier):
+		"""
+		Get the elements of the configuration objects with the specified
+		identifier.
+		:param model:		The openmediavault.config.Datamodel object.
+		:param identifier:	The identifier of the configuration object,
+							e.g. the UUID.
+		:returns:			Returns a list of lxml.etree.Element instances.
+		"""
+		assert(self.is_indexable(model))
+		ids = self._ids.get(model.idproperty)
+		if ids is None:
+			ids = self._build_ids(model.idproperty)
+		# Make sure the elements are located at the path of the data
+		# model, e.g. '//system/shares/sharedfolder'.
+		tags = model.queryinfo['xpath'][2:].split("/")
+		return [ element for element in ids.get(identifier, [])
+			if self._match_path(element, tags) ]
+
+	def is_referenced(self, model, identifier):
+		"""
+		Check whether the configuration object with the specified
+		identifier is referenced.
+		:param model:		The openmediavault.config.Datamodel object.
+		:param identifier:	The identifier of the configuration object,
+							e.g. the UUID.
+		:returns:			Returns True or False. None is returned if the
+							identifier is no UUID, in this case the index
+							can not be used.
+		"""
+		if not self._uuid_re.fullmatch(identifier):
+			return None
+		refs = self._refs.get(model.refproperty)
+		if refs is None:
+			refs = self._build_refs(model.refproperty)
+		return 0 < refs.get(identifier, 0)
+
+	def add(self, element):
+		"""
+		Add the element and its descendants to the indexes. Call this
+		method after the element has been inserted into the XML tree.
+		:param element: The lxml.etree.Element instance.
+		"""
+		self._update(element, 1)
+
+	def remove(self, element):
+		"""
+		Remove the element and its descendants from the indexes. Call
+		this method before the element is removed from the XML tree.
+		:param element: The lxml.etree.Element instance.
+		"""
+		self._update(element, -1)
+
+	def _build_ids(self, name):
+		ids = {}
+		for id_element in self._tree.iter(name):
+			if not id_element.text:
+				continue
+			ids.setdefault(id_element.text, []).append(
+				id_element.getparent())
+		self._ids[name] = ids
+		return ids
+
+	def _build_refs(self, name):
+		refs = {}
+		for ref_element in self._tree.iter(name):
+			for value in self._get_ref_values(ref_element):
+				refs[value] = refs.get(value, 0) + 1
+		self._refs[name] = refs
+		return refs
+
+	def _get_ref_values(self, element):
+		return [ m.group(0) for m in self._uuid_re.finditer(
+			"".join(element.itertext())) ]
+
+	def _match_path(self, element, tags):
+		for tag in reversed(tags):
+			if element is None or element.tag != tag:
+				return False
+			element = element.getparent()
+		return True
+
+	def _update(self, element, delta):
+		assert(lxml.etree.iselement(element))
+		for name, ids in self._ids.items():
+			for id_element in element.iter(name):
+				if not id_element.text:
+					continue
+				owner = id_element.getparent()
+				elements = ids.setdefault(id_element.text, [])
+				if 0 < delta:
+					elements.append(owner)
+				elif owner in elements:
+					elements.remove(owner)
+		for name, refs in self._refs.items():
+			for ref_element in element.iter(name):
+				for value in self._get_ref_values(ref_element):
+					refs[value] = refs.get(value, 0) + delta
+
+def _parse_subtree(path, tags):
+	"""
+	Parse only the given subtree of the XML configuration file. The file
+	is parsed incrementally. Top level sections that have been parsed
+	completely are freed unless they contain the subtree. Parsing stops
+	as soon as the section containing the subtree has been parsed, then
+	the elements of the section that are not part of the subtree are
+	freed, too. Note, the first tag of the subtree path must name a top
+	level section of the configuration file, e.g. 'system' or
+	'services'.
+	:param path:	The path of the XML configuration file.
+	:param tags:	The tags of the subtree path, e.g.
+					[ 'system', 'shares', 'sharedfolder' ] for
+					'//system/shares/sharedfolder'.
+	:returns:		Returns a lxml.etree.ElementTree instance.
+	"""
+	def _prune(element, level):
+		# Remove the children that are not part of the subtree.
+		if level >= len(tags):
+			return
+		for child in list(element):
+			if child.tag == tags[level]:
+				_prune(child, level + 1)
+			else:
+				element.remove(child)
+
+	def _process(root, complete):
+		# Process the top level elements that have been parsed
+		# completely, that are all except the last one while parsing
+		# is in progress.
+		elements = list(root)
+		if not complete:
+			elements = elements[:-1]
+		for element in elements:
+			if element.tag == tags[0]:
+				while element.getnext() is not None:
+					root.remove(element.getnext())
+				_prune(element, 1)
+				return True
+			root.remove(element)
+		return False
+
+	assert(0 < len(tags))
+	# Only listen for the root element, thus the parser runs at full
+	# speed. The top level sections are processed after each chunk.
+	parser = lxml.etree.XMLPullParser(events=("start",), tag="config")
+	root = None
+	with open(path, "rb") as f:
+		while True:
+			data = f.read(256 * 1024)
+			if not data:
+				break
+			parser.feed(data)
+			for event, element in parser.read_events():
+				root = element
+			if root is not None and _process(root, False):
+				return lxml.etree.ElementTree(root)
+	root = parser.close()
+	_process(root, True)
+	return lxml.etree.ElementTree(root)
+
+def _save_tree(path, tree, index=None):
+	"""
+	Write the XML tree to the specified configuration file. The XML tree
+	is written to a temporary file in the same directory first, which is
+	then renamed to the configuration file. Thus readers never see an
+	empty or half-written file and a crash does not destroy the
+	configuration file.
+	The writers are serialized by a lock on the directory of the
+	configuration file, which is taken by the PHP implementation
+	(OMV\\Config\\DatabaseBackend) too. Note, the PHP implementation still
+	rewrites the file in place, thus the atomicity is only guaranteed
+	for the modifications written by this function.
+	:param path:	The path of the XML configuration file.
+	:param tree:	The lxml.etree.ElementTree instance to write.
+	:param index:	The openmediavault.config.DatabaseIndex instance of
+					the tree. Defaults to None.
+	"""
+	real_path = os.path.realpath(path)
+	dirname, basename = os.path.split(real_path)
+	content = lxml.etree.tostring(tree, pretty_print=True,
+		xml_declaration=True, encoding="UTF-8")
+	# Serialize the writers, including the PHP implementation. Note, the
+	# configuration file itself can not be locked because it is replaced
+	# by a new inode.
+	dir_fd = os.open(dirname, os.O_RDONLY)
+	try:
+		fcntl.flock(dir_fd, fcntl.LOCK_EX)
+		(fd, tmp_path) = tempfile.mkstemp(prefix=".%s." % basename,
+			dir=dirname)
+		try:
+			with os.fdopen(fd, "wb") as f:
+				# Keep the permissions and ownership of the original file.
+				try:
+					st = os.stat(real_path)
+					os.fchmod(f.fileno(), stat.S_IMODE(st.st_mode))
+					os.fchown(f.fileno(), st.st_uid, st.st_gid)
+				except (FileNotFoundError, PermissionError):
+					pass
+				f.write(content)
+				f.flush()
+				os.fsync(f.fileno())
+			os.rename(tmp_path, real_path)
+		except:
+			os.unlink(tmp_path)
+			raise
+		# Make sure the rename is persistent.
+		os.fsync(dir_fd)
+		# Update the cache before the lock is released, otherwise
+		# another process may modify the file in the meantime.
+		DatabaseCache.put(path, tree, index, content)
+	finally:
+		fcntl.flock(dir_fd, fcntl.LOCK_UN)
+		os.close(dir_fd)
+
+@functools.lru_cache(maxsize=512)
+def _compile_xpath(id, xpath):
+	"""
+	Compile the XPath expression. The compiled expressions are cached
+	per data model, thus the variables ($arg1, $arg2, ...) of the
+	expression MUST be used for the filter values.
+	:param id:		The data model identifier, e.g. 'conf.service.ftp'.
+	:param xpath:	The XPath expression to compile.
+	:returns:		Returns the lxml.etree.XPath object.
+	"""
+	return lxml.etree.XPath(xpath)
+
+def _element_to_dict(element, list_tags, dict_tags):
+	"""
+	Helper function to convert a lxml.etree.Element instance to a Python
+	dictionary.
+	:param element:		The lxml.etree.Element instance to convert.
+	:param list_tags:	The tags that must be handled as lists.
+	:param dict_tags:	The tags that must be handled as dictionaries.
+	:returns:			Returns a Python dictionary.
+	"""
+	assert(lxml.etree.iselement(element))
+	result = {}
+	for child_element in element:
+		tag = child_element.tag
+		# Skip comments.
+		if tag is lxml.etree.Comment:
+			continue
+		if len(child_element):
+			value = _element_to_dict(child_element, list_tags, dict_tags)
+		else:
+			value = child_element.text
+			# Empty strings are None, so convert them.
+			value = "" if value is None else value
+		if tag in list_tags:
+			try:
+				# Add value to an existing list.
+				result[tag].append(value)
+			except AttributeError:
+				# Convert existing entry into a list.
+				result[tag] = [ result[tag], value ]
+			except KeyError:
+				# Add a new entry.
+				result[tag] = [ value ]
+		elif tag in dict_tags and value == "":
+			# Create an empty dictionary if value is an empty string.
+			result[tag] = {}
+		else:
+			result[tag] = value
+	return result
+
+class DatabaseObject(Object):
+	"""
+	A configuration object that is backed by the lxml.etree.Element
+	instance it has been read from. Top level properties are decoded
+	from the element on first access. The object is materialized, i.e.
+	all properties are converted, not before it is modified or the
+	whole properties dictionary is requested.
+	"""
+	def __init__(self, id, element):
+		"""
+		:param id:		The data model identifier, e.g.
+						'conf.system.filesystem.mountpoint'.
+		:param element:	The lxml.etree.Element instance to wrap. It must
+						not be modified afterwards.
+		"""
+		self._model = openmediavault.config.DatamodelRegistry.get(id)
+		self._properties = None
+		self._element = element
+		self._decoded = {}
+
+	@property
+	def is_materialized(self):
+		"""
+		Check whether all properties have been converted.
+		:returns:	Returns True if the object is materialized, otherwise
+					False.
+		"""
+		return self._element is None
+
+	@property
+	def properties(self):
+		self._materialize()
+		return self._properties
+
+	def get(self, name):
+		if self._element is None:
+			return super().get(name)
+		try:
+			return self._decoded[name]
+		except KeyError:
+			pass
+		value = self._decode(name)
+		if self._element is None:
+			# The property could not be decoded separately.
+			return super().get(name)
+		self._decoded[name] = value
+		return value
+
+	def set(self, name, value, validate=True):
+		self._materialize()
+		super().set(name, value, validate)
+
+	def reset_all(self):
+		self._element = None
+		self._decoded = None
+		super().reset_all()
+
+	def _decode(self, name):
+		"""
+		Decode a top level property from the wrapped element. Properties
+		of type 'array' or 'object' and paths in dot notation cause the
+		object to be materialized.
+		:param name:	The name of the property.
+		:returns:		The converted value of the property or None if
+						the object has been materialized.
+		"""
+		if "." in name or "[" in name:
+			self._materialize()
+			return None
+		self.assert_exists(name)
+		if self.model.schema.get_by_path(name).get("type") in [
+				"array", "object" ]:
+			self._materialize()
+			return None
+		child_element = None
+		# Use the last element if the tag is given multiple times, like
+		# the full conversion does.
+		for child_element in self._element.iterchildren(name):
+			pass
+		if child_element is None:
+			return self.model.property_get_default(name)
+		if len(child_element):
+			self._materialize()
+			return None
+		value = child_element.text
+		# Empty strings are None, so convert them.
+		value = "" if value is None else value
+		return self.model.property_convert(name, value)
+
+	def _materialize(self):
+		"""
+		Convert all properties of the wrapped element.
+		"""
+		if self._element is None:
+			return
+		element = self._element
+		self.reset_all()
+		self.set_dict(_element_to_dict(element, self.model.list_properties,
+			self.model.dict_properties), False)
+
+class DatabaseTransaction(object):
+	"""
+	Apply several database queries to a single in-memory XML tree. The
+	configuration file is written only once when the transaction is
+	committed.
+	"""
+	def __init__(self, database_file):
+		"""
+		:param database_file: The path of the XML configuration file.
+		"""
+		self._database_file = database_file
+		self._root_element = None
+		self._index = None
+		self._modified = False
+		self._undo_log = None
+
+	@property
+	def root_element(self):
+		"""
+		Get the XML tree of the transaction. The configuration file is
+		parsed on first access.
+		:returns: Returns the lxml.etree.ElementTree instance.
+		"""
+		if self._root_element is None:
+			self._root_element = lxml.etree.parse(self._database_file)
+			self._index = DatabaseIndex(self._root_element)
+		return self._root_element
+
+	@property
+	def index(self):
+		"""
+		Get the secondary indexes of the XML tree of the transaction.
+		:returns: Returns the openmediavault.config.DatabaseIndex instance.
+		"""
+		self.root_element
+		return self._index
+
+	@property
+	def is_modified(self):
+		"""
+		Check whether the XML tree has been modified.
+		:returns: Returns True if the XML tree has been modified.
+		"""
+		return self._modified
+
+	def set_modified(self):
+		"""
+		Mark the XML tree as modified.
+		"""
+		self._modified = True
+
+	def commit(self):
+		"""
+		Write the XML tree to the configuration file if it has been
+		modified.
+		"""
+		if self._modified:
+			_save_tree(self._database_file, self._root_element, self._index)
+		self._root_element = None
+		self._index = None
+		self._modified = False
+
+	def rollback(self):
+		"""
+		Discard all modifications of the XML tree.
+		"""
+		self._root_element = None
+		self._index = None
+		self._modified = False
+
+	@contextlib.contextmanager
+	def savepoint(self):
+		"""
+		Undo the modifications of the XML tree that are made within the
+		block if an exception escapes it. The modifications are recorded
+		in an undo log, thus the XML tree is not copied. Savepoints can
+		not be nested.
+		``
+		Example:
+		with db.transaction() as transaction:
+			with transaction.savepoint():
+				for obj in objs:
+					db.delete(obj)
+		``
+		"""
+		assert(self._undo_log is None)
+		modified = self._modified
+		self._undo_log = []
+		try:
+			yield
+		except:
+			undo_log = self._undo_log
+			# Do not record the modifications made by the undo functions.
+			self._undo_log = None
+			for undo in reversed(undo_log):
+				undo()
+			self._modified = modified
+			raise
+		finally:
+			self._undo_log = None
+
+	def log_undo(self, func, *args):
+		"""
+		Record a function that reverts a modification of the XML tree.
+		The function is called if the current savepoint is rolled back.
+		Nothing is recorded if there is no savepoint.
+		:param func:	The function to call.
+		:param args:	The arguments of the function.
+		"""
+		if self._undo_log is not None:
+			self._undo_log.append(functools.partial(func, *args))
+
 class Database(object):
+	def __init__(self, streaming=False):
+		"""
+		:param streaming:	Set to True to parse only the subtree of the
+							data model for read-only queries. This is
+							faster and uses less memory if only a few
+							queries are executed, e.g. by a script.
+							Defaults to False.
+		"""
+		self._transaction = None
+		self._transaction_level = 0
+		self._streaming = streaming
+
+	@contextlib.contextmanager
+	def transaction(self):
+		"""
+		Execute all queries within the block against a single in-memory
+		XML tree. The configuration file is loaded once and written once
+		when the block is left. All modifications are discarded if an
+		exception escapes the block. Nested blocks join the outermost
+		transaction.
+		``
+		Example:
+		with db.transaction():
+			for obj in objs:
+				db.set(obj)
+		``
+		:returns: Returns the openmediavault.config.DatabaseTransaction
+			object.
+		"""
+		if self._transaction is None:
+			self._transaction = DatabaseTransaction(
+				openmediavault.getenv("OMV_CONFIG_FILE"))
+		transaction = self._transaction
+		self._transaction_level += 1
+		try:
+			yield transaction
+		except:
+			self._transaction_level -= 1
+			if 0 == self._transaction_level:
+				self._transaction = None
+				transaction.rollback()
+			raise
+		else:
+			self._transaction_level -= 1
+			if 0 == self._transaction_level:
+				self._transaction = None
+				transaction.commit()
+
+	def _execute(self, query):
+		"""
+		Execute the query, if necessary within the current transaction.
+		:param query: The openmediavault.config.DatabaseQuery to execute.
+		"""
+		query.transaction = self._transaction
+		query.streaming = self._streaming
+		query.execute()
+
 	def get(self, id, identifier=None):
 		"""
 		Get the specified configuration object.
@@ -76,7 +791,7 @@ class Database(object):
 							objects or a single object is returned.
 		"""
 		query = openmediavault.config.DatabaseGetQuery(id, identifier)
-		query.execute()
+		self._execute(query)
 		return query.response
 
 	def get_by_filter(self, id, filter, **kwargs):
@@ -118,7 +833,7 @@ class Database(object):
 							of configuration objects.
 		"""
 		query = openmediavault.config.DatabaseGetByFilterQuery(id, filter)
-		query.execute()
+		self._execute(query)
 		if "min_result" in kwargs:
 			if len(query.response) < kwargs.get("min_result"):
 				raise DatabaseException("The query does not return the " \
@@ -153,7 +868,7 @@ class Database(object):
 						otherwise False.
 		"""
 		query = openmediavault.config.DatabaseGetByFilterQuery(id, filter)
-		query.execute()
+		self._execute(query)
 		if query.response is None:
 			return False
 		if isinstance(query.response, list) and 0 >= len(query.response):
@@ -167,7 +882,7 @@ class Database(object):
 		:returns:	True if the object is referenced, otherwise False.
 		"""
 		query = openmediavault.config.DatabaseIsReferencedQuery(obj)
-		query.execute()
+		self._execute(query)
 		return query.response
 
 	def is_unique(self, obj, property):
@@ -221,7 +936,7 @@ class Database(object):
 				})
 		query = openmediavault.config.DatabaseGetByFilterQuery(
 			obj.model.id, filter)
-		query.execute()
+		self._execute(query)
 		return 0 == len(query.response)
 
 	def delete(self, obj):
@@ -232,7 +947,7 @@ class Database(object):
 		"""
 		assert(isinstance(obj, openmediavault.config.Object))
 		query = openmediavault.config.DatabaseDeleteQuery(obj)
-		query.execute()
+		self._execute(query)
 		return query.response
 
 	def delete_by_filter(self, id, filter):
@@ -264,7 +979,7 @@ class Database(object):
 		:returns: Returns the deleted configuration objects.
 		"""
 		query = openmediavault.config.DatabaseDeleteByFilterQuery(id, filter)
-		query.execute()
+		self._execute(query)
 		return query.response
 
 	def set(self, obj):
@@ -277,10 +992,17 @@ class Database(object):
 		"""
 		assert(isinstance(obj, openmediavault.config.Object))
 		query = openmediavault.config.DatabaseSetQuery(obj)
-		query.execute()
+		self._execute(query)
 		return obj
 
 class DatabaseQuery(metaclass=abc.ABCMeta):
+	# Read-only queries use the shared XML tree from the database cache.
+	# Queries that modify the XML tree MUST set this to False.
+	_readonly = True
+	# Queries that only access the subtree of the data model can use
+	# the streaming read mode.
+	_streamable = False
+
 	def __init__(self, id):
 		"""
 		:param id: The data model identifier, e.g. 'conf.service.ftp.share'.
@@ -288,16 +1010,21 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 		# Get the path to the database.
 		self._database_file = openmediavault.getenv("OMV_CONFIG_FILE")
 		os.stat(self._database_file)
-		# Create the data model object.
-		self._model = openmediavault.config.Datamodel(id)
+		# Get the data model object.
+		self._model = openmediavault.config.DatamodelRegistry.get(id)
 		# Get the property names that must be handled as lists and dicts.
-		self._force_list_tags = []
-		self._force_dict_tags = []
+		self._force_list_tags = frozenset()
+		self._force_dict_tags = frozenset()
 		self._parse_model()
 		# Set the default response value.
 		self._response = None
-		# The XML tree.
+		# The XML tree and its secondary indexes.
 		self._root_element = None
+		self._index = None
+		# The transaction the query is executed in.
+		self._transaction = None
+		# Parse only the subtree of the data model?
+		self._streaming = False
 
 	@property
 	def model(self):
@@ -315,12 +1042,86 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 		"""
 		return self._response
 
-	@abc.abstractproperty
+	@property
+	def transaction(self):
+		"""
+		Get the transaction the query is executed in.
+		:returns:	Returns the openmediavault.config.DatabaseTransaction
+					object or None.
+		"""
+		return self._transaction
+
+	@transaction.setter
+	def transaction(self, transaction):
+		"""
+		Set the transaction the query is executed in.
+		:param transaction:	The openmediavault.config.DatabaseTransaction
+							object or None.
+		"""
+		if not transaction is None:
+			assert(isinstance(transaction, DatabaseTransaction))
+		self._transaction = transaction
+
+	@property
+	def streaming(self):
+		"""
+		Check whether only the subtree of the data model is parsed.
+		:returns:	Returns True if the streaming read mode is enabled,
+					otherwise False.
+		"""
+		return self._streaming
+
+	@streaming.setter
+	def streaming(self, streaming):
+		"""
+		Enable or disable the streaming read mode. If enabled, read-only
+		queries parse only the subtree of the data model instead of the
+		whole XML configuration file. The XML tree is neither taken from
+		nor put into the database cache.
+		:param streaming:	Set to True to enable the streaming read mode.
+		"""
+		self._streaming = streaming
+
+	@property
+	def filter(self):
+		"""
+		Get the filter used to build the predicate of the XPath string.
+		:returns:	Returns the openmediavault.config.DatabaseFilter object
+					or None.
+		"""
+		return None
+
+	@property
 	def xpath(self):
 		"""
 		Get the XPath string used to execute the database query.
 		:returns: The XPath string for this database query.
 		"""
+		return self._build_xpath()
+
+	def _get_base_xpath(self):
+		"""
+		Get the XPath string that selects the elements the filter
+		predicate is applied to.
+		:returns: Returns the XPath string.
+		"""
+		return self.model.queryinfo['xpath']
+
+	def _build_xpath(self, variables=None):
+		"""
+		Build the XPath string of the database query.
+		:param variables:	If a dictionary is given, then the filter values
+							are not embedded into the XPath string. Instead
+							the XPath variables $arg1, $arg2, ... are used
+							and their values are stored in the dictionary.
+							Defaults to None.
+		:returns:			Returns the XPath string.
+		"""
+		xpath = self._get_base_xpath()
+		if self.filter:
+			xpath = "%s[%s]" % (xpath, self._build_predicate(self.filter,
+				variables))
+		return xpath
 
 	@abc.abstractmethod
 	def execute(self):
@@ -330,41 +1131,47 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 
 	def _parse_model(self):
 		"""
-		Parse the data model and get the properties that must be handled
-		as lists and dicts.
-		"""
-		def callback(model, name, path, schema, user_data):
-			if "array" == schema['type'] and name:
-				user_data['lists'].append(name)
-			if "object" == schema['type'] and name:
-				user_data['dicts'].append(name)
-
-		tags = {
-			"lists": [],
-			"dicts": []
-		}
-		# ToDo: Refactor the whole process of collecting and processing
-		# the special properties.
-		self.model.walk_schema("", callback, tags)
-		self._force_list_tags = tags['lists']
-		self._force_dict_tags = [ name for name in tags['dicts']
-			if name not in tags['lists'] ]
+		Get the properties that must be handled as lists and dicts. They
+		are computed only once per data model.
+		"""
+		self._force_list_tags = self.model.list_properties
+		self._force_dict_tags = self.model.dict_properties
 
 	def _load(self):
 		"""
 		Helper function to load the XML configuration file.
 		"""
-		# Parse the XML configuration file.
-		self._root_element = lxml.etree.parse(self._database_file)
+		if not self._transaction is None:
+			# Use the XML tree of the transaction.
+			self._root_element = self._transaction.root_element
+			self._index = self._transaction.index
+		elif self._readonly and self._streaming and self._streamable and \
+				DatabaseIndex._xpath_re.match(self._get_base_xpath()):
+			# Parse only the subtree of the data model. Building the
+			# secondary indexes does not pay off for a single query.
+			self._root_element = _parse_subtree(self._database_file,
+				self._get_base_xpath()[2:].split("/"))
+			self._index = None
+		elif self._readonly:
+			# Use the shared, cached XML tree.
+			(self._root_element, self._index) = DatabaseCache.lookup(
+				self._database_file)
+		else:
+			# Parse the XML configuration file. The query gets its own
+			# copy of the XML tree because it is going to modify it.
+			self._root_element = lxml.etree.parse(self._database_file)
+			self._index = DatabaseIndex(self._root_element)
+		if not DatabaseIndex.enabled:
+			self._index = None
 
 	def _save(self):
+		if not self._transaction is None:
+			# The XML configuration file is written when the transaction
+			# is committed.
+			self._transaction.set_modified()
+			return
 		# Save the XML configuration file.
-		with open(self._database_file, "wb") as f:
-			fcntl.flock(f, fcntl.LOCK_EX)
-			f.write(lxml.etree.tostring(self._root_element,
-				pretty_print=True, xml_declaration=True,
-				encoding="UTF-8"))
-			fcntl.flock(f, fcntl.LOCK_UN)
+		_save_tree(self._database_file, self._root_element, self._index)
 
 	def _get_root_element(self):
 		"""
@@ -374,6 +1181,78 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 			self._load()
 		return self._root_element
 
+	def _get_index(self):
+		"""
+		Get the secondary indexes of the configuration file XML tree.
+		:returns:	Returns the openmediavault.config.DatabaseIndex instance
+					or None if the indexes are disabled.
+		"""
+		self._get_root_element()
+		return self._index
+
+	def _find_elements_by_id(self, identifier):
+		"""
+		Find the elements of the configuration objects with the specified
+		identifier. The secondary indexes are used if possible, otherwise
+		the XPath query is executed. Note, the XPath query MUST filter by
+		the specified identifier.
+		:param identifier:	The identifier of the configuration object.
+		:returns:			Returns a list of lxml.etree.Element instances.
+		"""
+		index = self._get_index()
+		if index is not None and index.is_indexable(self.model):
+			return index.get(self.model, identifier)
+		return self._execute_xpath()
+
+	def _append_element(self, parent, element):
+		"""
+		Append the element to the parent element and update the indexes.
+		"""
+		parent.append(element)
+		if self._index is not None:
+			self._index.add(element)
+		self._log_undo(self._remove_element, parent, element)
+
+	def _insert_element(self, parent, position, element):
+		"""
+		Insert the element at the given position of the parent element
+		and update the indexes.
+		"""
+		parent.insert(position, element)
+		if self._index is not None:
+			self._index.add(element)
+		self._log_undo(self._remove_element, parent, element)
+
+	def _replace_element(self, parent, element, new_element):
+		"""
+		Replace the element by a new one and update the indexes.
+		"""
+		if self._index is not None:
+			self._index.remove(element)
+		parent.replace(element, new_element)
+		if self._index is not None:
+			self._index.add(new_element)
+		self._log_undo(self._replace_element, parent, new_element, element)
+
+	def _remove_element(self, parent, element):
+		"""
+		Remove the element from its parent and update the indexes.
+		"""
+		self._log_undo(self._insert_element, parent, parent.index(element),
+			element)
+		if self._index is not None:
+			self._index.remove(element)
+		parent.remove(element)
+
+	def _log_undo(self, func, *args):
+		"""
+		Record the function that reverts a modification of the XML tree
+		if the query is executed within a transaction, see
+		DatabaseTransaction.savepoint().
+		"""
+		if self._transaction is not None:
+			self._transaction.log_undo(func, *args)
+
 	def _execute_xpath(self):
 		"""
 		Helper method to execute the XPath query.
@@ -381,8 +1260,13 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 					the specified XPath query.
 		"""
 		root_element = self._get_root_element()
+		# Get the compiled XPath query. The filter values are passed as
+		# variables, thus the compiled query can be reused for every query
+		# of the same data model and filter shape.
+		variables = {}
+		xpath = _compile_xpath(self.model.id, self._build_xpath(variables))
 		# Execute the XPath query and return the matching elements.
-		return root_element.xpath(self.xpath)
+		return xpath(root_element, **variables)
 
 	def _element_to_dict(self, element):
 		"""
@@ -391,35 +1275,8 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 		:param element:	The lxml.etree.Element instance to convert.
 		:returns:		Returns a Python dictionary.
 		"""
-		assert(lxml.etree.iselement(element))
-		result = {}
-		for child_element in list(element):
-			# Skip comments.
-			if child_element.tag is lxml.etree.Comment:
-				continue
-			if list(child_element):
-				value = self._element_to_dict(child_element)
-			else:
-				value = child_element.text
-				# Empty strings are None, so convert them.
-				value = "" if value is None else value
-			tag = child_element.tag
-			if tag in self._force_list_tags:
-				try:
-					# Add value to an existing list.
-					result[tag].append(value)
-				except AttributeError:
-					# Convert existing entry into a list.
-					result[tag] = [ result[tag], value ]
-				except KeyError:
-					# Add a new entry.
-					result[tag] = [ value ]
-			elif tag in self._force_dict_tags and value == "":
-				# Create an empty dictionary if value is an empty string.
-				result[tag] = {}
-			else:
-				result[tag] = value
-		return result
+		return _element_to_dict(element, self._force_list_tags,
+			self._force_dict_tags)
 
 	def _elements_to_object(self, elements):
 		"""
@@ -435,17 +1292,16 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 							If no element is given, then None is returned.
 		"""
 		assert(isinstance(elements, list))
+		# The objects decode the elements lazily. This is safe because
+		# the elements are never modified, they are replaced or removed
+		# by the queries that write to the database.
 		if self.model.is_iterable:
-			result = []
-			for element in elements:
-				obj = openmediavault.config.Object(self.model.id)
-				obj.set_dict(self._element_to_dict(element), False)
-				result.append(obj)
+			result = [ DatabaseObject(self.model.id, element)
+				for element in elements ]
 		else:
 			result = None
 			if 0 < len(elements):
-				result = openmediavault.config.Object(self.model.id)
-				result.set_dict(self._element_to_dict(elements[0]), False)
+				result = DatabaseObject(self.model.id, elements[0])
 		return result
 
 	def _dict_to_elements(self, dictionary, element):
@@ -489,7 +1345,7 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 			element.append(sub_element)
 			_process_value(sub_element, sub_value)
 
-	def _build_predicate(self, filter):
+	def _build_predicate(self, filter, variables=None):
 		"""
 		Helper method to build the predicate for the specified filter.
 		Supported operators:
@@ -578,51 +1434,79 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 				]
 			]
 		]
+		If the *variables* dictionary is given, then the values are
+		replaced by XPath variables, e.g. [type=$arg1 and devicename=$arg2].
 		"""
+		def _string(value):
+			value = str(value)
+			if not variables is None:
+				name = "arg%d" % (len(variables) + 1)
+				variables[name] = value
+				return "$%s" % name
+			# Build a valid XPath string literal. Note, XPath 1.0 does not
+			# support escaping, so the concat() function must be used if
+			# the value contains both quote characters.
+			if not "'" in value:
+				return "'%s'" % value
+			if not '"' in value:
+				return '"%s"' % value
+			return "concat('%s')" % "', \"'\", '".join(value.split("'"))
+
+		def _number(value):
+			if not variables is None and isinstance(value, (int, float)) \
+					and not isinstance(value, bool):
+				name = "arg%d" % (len(variables) + 1)
+				variables[name] = value
+				return "$%s" % name
+			return str(value)
+
 		assert(isinstance(filter, DatabaseFilter))
 		if not "operator" in filter:
 			raise KeyError("Invalid filter, the field 'operator' is missing.")
 		result = ""
 		if filter['operator'] in [ 'and', 'or' ]:
 			result = "(%s %s %s)" % (
-				self._build_predicate(DatabaseFilter(filter['arg0'])),
+				self._build_predicate(DatabaseFilter(filter['arg0']),
+					variables),
 				filter['operator'],
-				self._build_predicate(DatabaseFilter(filter['arg1'])))
+				self._build_predicate(DatabaseFilter(filter['arg1']),
+					variables))
 		elif filter['operator'] in [ '=', 'equals' ]:
-			result = "%s=%s" % (filter['arg0'], filter['arg1'])
+			result = "%s=%s" % (filter['arg0'], _number(filter['arg1']))
 		elif filter['operator'] in [ '!=', 'notEquals' ]:
-			result = "%s!=%s" % (filter['arg0'], filter['arg1'])
+			result = "%s!=%s" % (filter['arg0'], _number(filter['arg1']))
 		elif "enum" == filter['operator']:
 			parts = []
 			for enumv in filter['arg1']:
-				parts.append("%s=%s" % (filter['arg0'], enumv))
+				parts.append("%s=%s" % (filter['arg0'], _number(enumv)))
 			result = "(%s)" % " or ".join(parts)
 		elif filter['operator'] in [ '==', 'stringEquals' ]:
-			result = "%s='%s'" % (filter['arg0'], filter['arg1'])
+			result = "%s=%s" % (filter['arg0'], _string(filter['arg1']))
 		elif filter['operator'] in [ '!==', '!=', 'stringNotEquals' ]:
-			result = "%s!='%s'" % (filter['arg0'], filter['arg1'])
+			result = "%s!=%s" % (filter['arg0'], _string(filter['arg1']))
 		elif "stringContains" == filter['operator']:
-			result = "contains(%s,'%s')" % (filter['arg0'],
-				filter['arg1'])
+			result = "contains(%s,%s)" % (filter['arg0'],
+				_string(filter['arg1']))
 		elif "stringStartsWith" == filter['operator']:
-			result = "starts-with(%s,'%s')" % (filter['arg0'],
-				filter['arg1'])
+			result = "starts-with(%s,%s)" % (filter['arg0'],
+				_string(filter['arg1']))
 		elif "stringEnum" == filter['operator']:
 			parts = [];
 			for enumv in filter['arg1']:
-				parts.append("%s='%s'" % (filter['arg0'], enumv))
+				parts.append("%s=%s" % (filter['arg0'], _string(enumv)))
 			result = "(%s)" % " or ".join(parts)
 		elif filter['operator'] in [ '!', 'not' ]:
 			result = "not(%s)" % (
-				self._build_predicate(DatabaseFilter(filter['arg0'])))
+				self._build_predicate(DatabaseFilter(filter['arg0']),
+					variables))
 		elif filter['operator'] in [ '<', 'less' ]:
-			result = "%s<%s" % (filter['arg0'], filter['arg1'])
+			result = "%s<%s" % (filter['arg0'], _number(filter['arg1']))
 		elif filter['operator'] in [ '>', 'greater' ]:
-			result = "%s>%s" % (filter['arg0'], filter['arg1'])
+			result = "%s>%s" % (filter['arg0'], _number(filter['arg1']))
 		elif filter['operator'] in [ '<=', 'lessEqual' ]:
-			result = "%s<=%s" % (filter['arg0'], filter['arg1'])
+			result = "%s<=%s" % (filter['arg0'], _number(filter['arg1']))
 		elif filter['operator'] in [ '>=', 'greaterEqual' ]:
-			result = "%s>=%s" % (filter['arg0'], filter['arg1'])
+			result = "%s>=%s" % (filter['arg0'], _number(filter['arg1']))
 		elif "distinct" == filter['operator']:
 			result = "not({0}=preceding-sibling::*/{0})".format(filter['arg0'])
 		else:
@@ -631,6 +1515,8 @@ class DatabaseQuery(metaclass=abc.ABCMeta):
 		return result
 
 class DatabaseGetByFilterQuery(DatabaseQuery):
+	_streamable = True
+
 	def __init__(self, id, filter):
 		if not filter is None:
 			assert(isinstance(filter, DatabaseFilter))
@@ -641,18 +1527,13 @@ class DatabaseGetByFilterQuery(DatabaseQuery):
 	def filter(self):
 		return self._filter
 
-	@property
-	def xpath(self):
-		if self.filter:
-			return "%s[%s]" % (self.model.queryinfo['xpath'],
-				self._build_predicate(self.filter))
-		return self.model.queryinfo['xpath']
-
 	def execute(self):
 		elements = self._execute_xpath()
 		self._response = self._elements_to_object(elements)
 
 class DatabaseGetQuery(DatabaseQuery):
+	_streamable = True
+
 	def __init__(self, id, identifier=None):
 		super().__init__(id)
 		self._identifier = identifier
@@ -662,18 +1543,20 @@ class DatabaseGetQuery(DatabaseQuery):
 		return self._identifier
 
 	@property
-	def xpath(self):
+	def filter(self):
 		if self.model.is_iterable and self.identifier:
-			return DatabaseGetByFilterQuery(self.model.id,
-				DatabaseFilter({
-					'operator': 'stringEquals',
-					'arg0': self.model.idproperty,
-					'arg1': self.identifier
-				})).xpath
-		return self.model.queryinfo['xpath']
+			return DatabaseFilter({
+				'operator': 'stringEquals',
+				'arg0': self.model.idproperty,
+				'arg1': self.identifier
+			})
+		return None
 
 	def execute(self):
-		elements = self._execute_xpath()
+		if self.model.is_iterable and self.identifier:
+			elements = self._find_elements_by_id(self.identifier)
+		else:
+			elements = self._execute_xpath()
 		self._response = self._elements_to_object(elements)
 		# Validate the query result.
 		# If the object is iterable and if there is an identifier,
@@ -698,21 +1581,35 @@ class DatabaseIsReferencedQuery(DatabaseQuery):
 		return self._obj
 
 	@property
-	def xpath(self):
-		return "//%s[%s]" % (self.model.refproperty,
-			self._build_predicate(DatabaseFilter({
-				'operator': 'stringContains',
-				'arg0': '.',
-				'arg1': self.object.get(self.model.idproperty)
-			})))
+	def filter(self):
+		return DatabaseFilter({
+			'operator': 'stringContains',
+			'arg0': '.',
+			'arg1': self.object.get(self.model.idproperty)
+		})
+
+	def _get_base_xpath(self):
+		return "//%s" % self.model.refproperty
 
 	def execute(self):
+		index = self._get_index()
+		if index is not None:
+			self._response = index.is_referenced(self.model,
+				self.object.get(self.model.idproperty))
+			if self._response is not None:
+				return
 		elements = self._execute_xpath()
 		self._response = 0 < len(elements)
 
 class DatabaseSetQuery(DatabaseQuery):
+	_readonly = False
+
 	def __init__(self, obj):
 		assert(isinstance(obj, openmediavault.config.Object))
+		# Convert all properties before the element that is wrapped by
+		# the object might get replaced.
+		if isinstance(obj, DatabaseObject):
+			obj._materialize()
 		self._obj = obj
 		super().__init__(obj.model.id)
 
@@ -721,23 +1618,25 @@ class DatabaseSetQuery(DatabaseQuery):
 		return self._obj
 
 	@property
-	def xpath(self):
+	def filter(self):
 		if self.model.is_iterable and not self.object.is_new:
 			# Find and update the element with the specified identifier.
-			return DatabaseGetByFilterQuery(self.model.id,
-				DatabaseFilter({
-					'operator': 'stringEquals',
-					'arg0': self.model.idproperty,
-					'arg1': self.object.get(self.model.idproperty)
-				})).xpath
-
+			return DatabaseFilter({
+				'operator': 'stringEquals',
+				'arg0': self.model.idproperty,
+				'arg1': self.object.get(self.model.idproperty)
+			})
 		# Find all elements matching the XPath.
-		return self.model.queryinfo['xpath']
+		return None
 
 	def execute(self):
 		append_element = False
 		# Execute the query.
-		elements = self._execute_xpath()
+		if self.model.is_iterable and not self.object.is_new:
+			elements = self._find_elements_by_id(self.object.get(
+				self.model.idproperty))
+		else:
+			elements = self._execute_xpath()
 		# Validate the query result.
 		if self.model.is_iterable:
 			# If an identifier was set for an iterable object, then there
@@ -763,7 +1662,7 @@ class DatabaseSetQuery(DatabaseQuery):
 				assert(lxml.etree.iselement(parent))
 				# Append a new element to the XML tree.
 				element = lxml.etree.Element(tag)
-				parent.append(element)
+				self._append_element(parent, element)
 				# Append the element to the result list. Thus we can continue
 				# as normal.
 				elements.append(element)
@@ -778,15 +1677,17 @@ class DatabaseSetQuery(DatabaseQuery):
 			# Append/Update the element.
 			if append_element: # Add mode
 				# Append the new element to the parent element.
-				parent.append(new_element)
+				self._append_element(parent, new_element)
 				# Immediatelly abort because nothing more has to be done.
 				break
 			else: # Update mode
 				# Replace the old element with the new one.
-				parent.replace(element, new_element)
+				self._replace_element(parent, element, new_element)
 		self._save()
 
 class DatabaseDeleteQuery(DatabaseQuery):
+	_readonly = False
+
 	def __init__(self, obj):
 		assert(isinstance(obj, openmediavault.config.Object))
 		self._obj = obj
@@ -797,18 +1698,21 @@ class DatabaseDeleteQuery(DatabaseQuery):
 		return self._obj
 
 	@property
-	def xpath(self):
+	def filter(self):
 		if self.model.is_iterable:
-			return DatabaseGetByFilterQuery(self.model.id,
-				DatabaseFilter({
-					'operator': 'stringEquals',
-					'arg0': self.model.idproperty,
-					'arg1': self.object.get(self.model.idproperty)
-				})).xpath
-		return self.model.queryinfo['xpath']
+			return DatabaseFilter({
+				'operator': 'stringEquals',
+				'arg0': self.model.idproperty,
+				'arg1': self.object.get(self.model.idproperty)
+			})
+		return None
 
 	def execute(self):
-		elements = self._execute_xpath()
+		if self.model.is_iterable:
+			elements = self._find_elements_by_id(self.object.get(
+				self.model.idproperty))
+		else:
+			elements = self._execute_xpath()
 		self._response = self._elements_to_object(elements)
 		try:
 			self._response = self._response[0]
@@ -818,10 +1722,12 @@ class DatabaseDeleteQuery(DatabaseQuery):
 			parent = element.getparent()
 			if parent is None:
 				continue
-			parent.remove(element)
+			self._remove_element(parent, element)
 		self._save()
 
 class DatabaseDeleteByFilterQuery(DatabaseGetByFilterQuery):
+	_readonly = False
+
 	def execute(self):
 		elements = self._execute_xpath()
 		self._response = self._elements_to_object(elements)
@@ -829,5 +1735,5 @@ class DatabaseDeleteByFilterQuery(DatabaseGetByFilterQuery):
 			parent = element.getparent()
 			if parent is None:
 				continue
-			parent.remove(element)
+			self._remove_element(parent, element)
 		self._save()
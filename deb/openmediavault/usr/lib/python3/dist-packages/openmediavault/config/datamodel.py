@@ -18,10 +18,18 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
-__all__ = [ "Datamodel" ]
+__all__ = [ "Datamodel", "DatamodelRegistry" ]
 
+import functools
+import glob
+import json
+import mmap
 import os
 import os.path
+import pickle
+import tempfile
+import threading
+import time
 import openmediavault
 import openmediavault.datamodel.datamodel
 import openmediavault.json.schema
@@ -36,21 +44,31 @@ class DatamodelNotFoundException(Exception):
 		return self._id
 
 class Datamodel(openmediavault.datamodel.Datamodel):
-	def __init__(self, id):
+	def __init__(self, id, validate=True):
 		"""
-		:param id: The data model identifier, e.g. 'conf.service.ftp.share'.
+		:param id:			The data model identifier, e.g.
+							'conf.service.ftp.share', or the data model
+							as Python dictionary.
+		:param validate:	Set to False to do not validate the data model
+							given as Python dictionary. Defaults to True.
 		"""
-		# Load the data model.
+		# Load the data model. Note, the data models are loaded via the
+		# registry, thus they are read and validated only once.
 		if isinstance(id, dict):
 			model = id
+			# Validate the data model.
+			if validate:
+				self._validate(model)
 		else:
-			model = self._load(id)
-		# Validate the data model.
-		self._validate(model)
+			model = DatamodelRegistry.get(id).model
 		# Call the parent constructor.
 		super().__init__(model)
+		self._schema = None
+		self._list_properties = None
+		self._dict_properties = None
 
-	def _load(self, id):
+	@staticmethod
+	def _load(id):
 		"""
 		Load the specified data model from file system.
 		:param id: The data model identifier, e.g. 'conf.service.ftp.share'.
@@ -58,16 +76,15 @@ class Datamodel(openmediavault.datamodel.Datamodel):
 		:raises openmediavault.datamodel.DatamodelNotFoundException:
 		"""
 		# Load the file content.
-		datamodels_dir = openmediavault.getenv("OMV_DATAMODELS_DIR",
-			"/usr/share/openmediavault/datamodels");
-		datamodel_path = os.path.join(datamodels_dir, "%s.json" % id)
+		datamodel_path = os.path.join(_get_datamodels_dir(), "%s.json" % id)
 		if not os.path.exists(datamodel_path):
 			raise DatamodelNotFoundException(id)
 		with open(datamodel_path) as f:
 			content = f.read()
 		return content
 
-	def _validate(self, model):
+	@staticmethod
+	def _validate(model):
 		"""
 		Validate the data model.
 		:param model: The data model as JSON object or string.
@@ -140,12 +157,15 @@ class Datamodel(openmediavault.datamodel.Datamodel):
 		:returns:	Returns the JSON schema of the data model properties
 					as openmediavault.datamodel.Schema object.
 		"""
-		# Build a valid JSON schema.
-		schema = openmediavault.datamodel.Schema({
-			"type": "object",
-			"properties": self.model['properties']
-		})
-		return schema
+		# Build a valid JSON schema. It is built only once because it
+		# is accessed very often, e.g. for every property of a
+		# configuration object.
+		if self._schema is None:
+			self._schema = openmediavault.datamodel.Schema({
+				"type": "object",
+				"properties": self.model['properties']
+			})
+		return self._schema
 
 	@property
 	def queryinfo(self):
@@ -163,6 +183,48 @@ class Datamodel(openmediavault.datamodel.Datamodel):
 	def refproperty(self):
 		return self.queryinfo['refproperty']
 
+	@property
+	def list_properties(self):
+		"""
+		Get the names of the properties of type 'array'. Their values
+		must be handled as lists, even if they contain only one item.
+		:returns: Returns a frozenset of property names.
+		"""
+		if self._list_properties is None:
+			self._parse_properties()
+		return self._list_properties
+
+	@property
+	def dict_properties(self):
+		"""
+		Get the names of the properties of type 'object' that are not
+		also used as 'array' properties. Their empty values must be
+		handled as dictionaries.
+		:returns: Returns a frozenset of property names.
+		"""
+		if self._dict_properties is None:
+			self._parse_properties()
+		return self._dict_properties
+
+	def _parse_properties(self):
+		"""
+		Parse the data model schema and get the names of the properties
+		that must be handled as lists and dicts.
+		"""
+		def callback(model, name, path, schema, user_data):
+			if "array" == schema['type'] and name:
+				user_data['lists'].add(name)
+			if "object" == schema['type'] and name:
+				user_data['dicts'].add(name)
+
+		names = {
+			"lists": set(),
+			"dicts": set()
+		}
+		self.walk_schema("", callback, names)
+		self._list_properties = frozenset(names['lists'])
+		self._dict_properties = frozenset(names['dicts'] - names['lists'])
+
 	@property
 	def notificationid(self):
 		"""
@@ -185,7 +247,7 @@ class Datamodel(openmediavault.datamodel.Datamodel):
 		:raises openmediavault.json.SchemaException:
 		:raises openmediavault.json.SchemaValidationException:
 		"""
-		self.schema.validate(value, name)
+		self.schema.validate(data)
 
 	def property_get_default(self, path):
 		"""
@@ -329,3 +391,172 @@ class Datamodel(openmediavault.datamodel.Datamodel):
 
 		_walk_schema("", path, self.schema.get_by_path(path), callback,
 			user_data);
+
+def _get_datamodels_dir():
+	return openmediavault.getenv("OMV_DATAMODELS_DIR",
+		"/usr/share/openmediavault/datamodels")
+
+def _get_bundle_file():
+	return openmediavault.getenv("OMV_DATAMODELS_BUNDLE_FILE",
+		os.path.join(openmediavault.getenv("OMV_CACHE_DIR",
+			"/var/cache/openmediavault"), "datamodels.pickle"))
+
+def _get_signature(datamodels_dir):
+	"""
+	Get the signature of the data model files. It changes if a file is
+	added, removed or modified, even if it is modified in place.
+	"""
+	signature = []
+	for name in sorted(os.listdir(datamodels_dir)):
+		if not name.endswith(".json"):
+			continue
+		try:
+			st = os.stat(os.path.join(datamodels_dir, name))
+		except FileNotFoundError:
+			continue
+		signature.append((name, st.st_mtime_ns, st.st_size))
+	return signature
+
+class DatamodelRegistry(object):
+	"""
+	A process-wide registry of the data models. Every data model is read
+	and validated only once. If an up-to-date bundle of the data models
+	exists, which is created by 'omv-confdbadm compile', then the data
+	models are taken from it instead of reading the JSON files.
+	Note, the data models returned by the registry are shared, so they
+	MUST NOT be modified.
+	The data model files and the bundle are checked for modifications
+	at most every CHECK_INTERVAL seconds, thus long-running processes
+	pick up new or modified data models, e.g. after a package upgrade.
+	"""
+
+	CHECK_INTERVAL = 5
+
+	_lock = threading.Lock()
+	_state = { "key": None, "signature": None, "checked": None }
+
+	@staticmethod
+	def get(id):
+		"""
+		Get the specified data model.
+		:param id:	The data model identifier, e.g. 'conf.service.ftp'.
+		:returns:	Returns the openmediavault.config.Datamodel object.
+		:raises openmediavault.config.datamodel.DatamodelNotFoundException:
+		"""
+		datamodels_dir = _get_datamodels_dir()
+		bundle_file = _get_bundle_file()
+		DatamodelRegistry._check(datamodels_dir, bundle_file)
+		return DatamodelRegistry._get(datamodels_dir, bundle_file, id)
+
+	@staticmethod
+	def _check(datamodels_dir, bundle_file):
+		"""
+		Drop the cached data models if the data model files or the
+		bundle have been modified since the last check.
+		"""
+		state = DatamodelRegistry._state
+		key = (datamodels_dir, bundle_file)
+		now = time.monotonic()
+		with DatamodelRegistry._lock:
+			if state["key"] == key and state["checked"] is not None and \
+					now - state["checked"] < DatamodelRegistry.CHECK_INTERVAL:
+				return
+			try:
+				st = os.stat(bundle_file)
+				bundle_signature = (st.st_mtime_ns, st.st_size)
+			except OSError:
+				bundle_signature = None
+			try:
+				signature = (_get_signature(datamodels_dir), bundle_signature)
+			except OSError:
+				signature = None
+			if state["key"] != key or state["signature"] != signature:
+				DatamodelRegistry._get.cache_clear()
+				DatamodelRegistry._load_bundle.cache_clear()
+			state.update(key=key, signature=signature, checked=now)
+
+	@staticmethod
+	def clear():
+		"""
+		Remove all data models from the registry.
+		"""
+		with DatamodelRegistry._lock:
+			DatamodelRegistry._get.cache_clear()
+			DatamodelRegistry._load_bundle.cache_clear()
+			DatamodelRegistry._state.update(key=None, signature=None,
+				checked=None)
+
+	@staticmethod
+	def compile(path=None):
+		"""
+		Validate all configuration data models and store them in a bundle
+		that is loaded at once by the registry.
+		:param path:	The path of the bundle file. Defaults to the value
+						of the environment variable
+						OMV_DATAMODELS_BUNDLE_FILE.
+		:returns:		Returns the number of data models in the bundle.
+		"""
+		if path is None:
+			path = _get_bundle_file()
+		datamodels_dir = _get_datamodels_dir()
+		models = {}
+		for datamodel_path in glob.glob(os.path.join(datamodels_dir,
+				"conf.*.json")):
+			id = os.path.splitext(os.path.basename(datamodel_path))[0]
+			with open(datamodel_path) as f:
+				model = json.load(f)
+			try:
+				Datamodel._validate(model)
+			except Exception as e:
+				raise Exception("%s: %s" % (datamodel_path, str(e)))
+			models[id] = model
+		data = pickle.dumps({
+			"datamodels_dir": datamodels_dir,
+			"signature": _get_signature(datamodels_dir),
+			"models": models
+		}, protocol=pickle.HIGHEST_PROTOCOL)
+		# Write the bundle atomically.
+		dirname = os.path.dirname(os.path.abspath(path))
+		os.makedirs(dirname, exist_ok=True)
+		(fd, tmp_path) = tempfile.mkstemp(dir=dirname)
+		try:
+			with os.fdopen(fd, "wb") as f:
+				f.write(data)
+			os.chmod(tmp_path, 0o644)
+			os.rename(tmp_path, path)
+		except:
+			os.unlink(tmp_path)
+			raise
+		DatamodelRegistry.clear()
+		return len(models)
+
+	@staticmethod
+	@functools.lru_cache(maxsize=1)
+	def _load_bundle(datamodels_dir, path):
+		"""
+		Load the bundle of data models. The bundle is ignored if a data
+		model file has been added, removed or modified after the bundle
+		was created.
+		:returns:	Returns a dictionary of the validated data models. It
+					is empty if there is no usable bundle.
+		"""
+		try:
+			with open(path, "rb") as f:
+				with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+					bundle = pickle.loads(m)
+		except (OSError, ValueError, pickle.UnpicklingError):
+			return {}
+		if bundle.get("datamodels_dir") != datamodels_dir:
+			return {}
+		if bundle.get("signature") != _get_signature(datamodels_dir):
+			return {}
+		return bundle.get("models", {})
+
+	@staticmethod
+	@functools.lru_cache(maxsize=256)
+	def _get(datamodels_dir, bundle_file, id):
+		models = DatamodelRegistry._load_bundle(datamodels_dir, bundle_file)
+		if id in models:
+			# The bundled data models are already validated.
+			return Datamodel(models[id], False)
+		return Datamodel(json.loads(Datamodel._load(id)))
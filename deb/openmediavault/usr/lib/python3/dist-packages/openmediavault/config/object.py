@@ -35,7 +35,7 @@ class Object(object):
 		:param id:	The data model identifier, e.g. 'conf.service.ftp.share'.
 		"""
 		# Set the data model.
-		self._model = openmediavault.config.Datamodel(id)
+		self._model = openmediavault.config.DatamodelRegistry.get(id)
 		# Set the default values.
 		self.reset_all()
 
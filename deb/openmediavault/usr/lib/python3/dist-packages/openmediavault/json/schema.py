@@ -31,7 +31,6 @@ import re
 import urllib.parse
 import socket
 import openmediavault.collections
-import openmediavault.string
 
 class SchemaException(Exception):
 	pass
@@ -54,12 +53,16 @@ class SchemaValidationException(Exception):
 	def path(self):
 		return self._path
 
+def _to_str(value):
+	return "NULL" if (value is None) else str(value)
+
 class Schema(object):
 	def __init__(self, schema):
 		"""
 		:param schema: A JSON object (Python dictionary) describing the schema.
 		"""
 		self._schema = openmediavault.collections.DotDict(schema)
+		self._validators = {}
 
 	@property
 	def schema(self):
@@ -141,359 +144,446 @@ class Schema(object):
 		_validate_path(path)
 		return _walk_schema(path, self.schema)
 
+
+	def compile(self, name=""):
+		"""
+		Compile the schema of the given entity into a validator. The
+		schema is walked only once, the validator is cached and can be
+		used to validate any number of values.
+		:param name:	The JSON path of the entity, e.g. 'aa.bb.cc',
+						defaults to an empty string. Use an empty value
+						for the root.
+		:returns:		Returns a callable that takes the value to
+						validate. It raises a SchemaValidationException
+						if the value is invalid.
+		:raises openmediavault.json.SchemaPathException:
+		"""
+		try:
+			return self._validators[name]
+		except KeyError:
+			pass
+		validator = self._compile_type(self.get_by_path(name))
+		def validate(value):
+			validator(value, name)
+		self._validators[name] = validate
+		return validate
+
 	def validate(self, value, name=""):
 		"""
 		Validate the given value.
-		:param value:	The value to validate.
+		:param value:	The value to validate. A JSON string is decoded
+						before it is validated.
 		:param name:	The JSON path of the entity to validate, e.g.
 						'aa.bb.cc', defaults to an empty string. Use an
 						empty value for the root.
 		:returns: None
+		:raises openmediavault.json.SchemaException:
+		:raises openmediavault.json.SchemaValidationException:
 		"""
-		# Convert all arrays (indexed and associative) to JSON string to
-		# ensure that they are converted into the required dictionary format.
-		if isinstance(value, (dict, list)):
-			value = json.dumps(value)
-		# Convert JSON string to dictionary.
-		if openmediavault.string.is_json(value):
-			value = json.loads(value)
-		schema = self.get_by_path(name);
-		self._validate_type(value, schema, name)
-
-	def _validate_type(self, value, schema, name):
+		if isinstance(value, str):
+			try:
+				value = json.loads(value)
+			except ValueError:
+				pass
+		self.compile(name)(value)
+
+	def _compile_type(self, schema):
 		"""
-		:returns: None
+		Compile the validator for the given schema.
+		:param schema:	The schema as Python dictionary.
+		:returns:		Returns a callable that takes the value and
+						the JSON path of the entity to validate.
 		"""
 		types = "any"
 		if "type" in schema:
 			types = schema['type']
 		if not isinstance(types, list):
-			types = [ types ];
-		valid = False;
-		last_exception = None;
-		for typek, typev in enumerate(types):
-			try:
-				if "any" == typev:
-					self._validate_any(value, schema, name)
-					valid = True
-				elif "array" == typev:
-					self._validate_array(value, schema, name)
-					valid = True
-				elif "boolean" == typev:
-					self._validate_boolean(value, schema, name)
-					valid = True
-				elif "object" == typev:
-					self._validate_object(value, schema, name)
-					valid = True
-				elif "integer" == typev:
-					self._validate_integer(value, schema, name)
-					valid = True
-				elif "number" == typev:
-					self._validate_number(value, schema, name)
-					valid = True
-				elif "string" == typev:
-					self._validate_string(value, schema, name)
-					valid = True
-				elif "null" == typev:
-					self._validate_null(value, schema, name)
-					valid = True
-				else:
-					raise SchemaException(
-						"%s: The type '%s' is not defined." %
-						(name, typev));
-			except SchemaValidationException as e:
-				# Continue with the next type but remember the exception.
-				last_exception = e;
-			# Break the foreach loop here because one of the defined types
-			# is successfully validated.
-			if True == valid:
-				break;
-		# If the validation is not successful, then trow the
-		# last exception.
-		if False == valid:
-			raise last_exception;
-
-	def _validate_any(self, value, schema, name):
-		pass
-
-	def _validate_boolean(self, value, schema, name):
-		if not isinstance(value, bool):
-			raise SchemaValidationException(name,
-				"The value '%s' is not a boolean." %
-				("NULL" if (value is None) else str(value)))
-
-	def _validate_integer(self, value, schema, name):
-		if not isinstance(value, int):
-			raise SchemaValidationException(name,
-				"The value '%s' is not an integer." %
-				("NULL" if (value is None) else str(value)))
-		self._check_minimum(value, schema, name)
-		self._check_exclusive_minimum(value, schema, name)
-		self._check_maximum(value, schema, name)
-		self._check_exclusive_maximum(value, schema, name)
-		self._check_enum(value, schema, name)
-		self._check_one_of(value, schema, name)
-
-	def _validate_number(self, value, schema, name):
-		if not isinstance(value, (int, float, decimal.Decimal)):
-			raise SchemaValidationException(name,
-				"The value '%s' is not a number." %
-				("NULL" if (value is None) else str(value)))
-		self._check_minimum(value, schema, name)
-		self._check_exclusive_minimum(value, schema, name)
-		self._check_maximum(value, schema, name)
-		self._check_exclusive_maximum(value, schema, name)
-		self._check_enum(value, schema, name)
-		self._check_one_of(value, schema, name)
-
-	def _validate_string(self, value, schema, name):
-		if not isinstance(value, str):
-			raise SchemaValidationException(name,
-				"The value '%s' is not a string." %
-				("NULL" if (value is None) else str(value)))
-		self._check_pattern(value, schema, name)
-		self._check_min_length(value, schema, name)
-		self._check_max_length(value, schema, name)
-		self._check_format(value, schema, name)
-		self._check_enum(value, schema, name)
-		self._check_one_of(value, schema, name)
-
-	def _validate_array(self, value, schema, name):
-		if not isinstance(value, list):
-			raise SchemaValidationException(name,
-				"The value '%s' is not an array." %
-				("NULL" if (value is None) else str(value)))
-		self._check_min_items(value, schema, name)
-		self._check_max_items(value, schema, name)
-		self._check_items(value, schema, name)
-
-	def _validate_object(self, value, schema, name):
-		if not isinstance(value, dict):
-			raise SchemaValidationException(name,
-				"The value '%s' is not an object." %
-				("NULL" if (value is None) else str(value)))
-		self._check_properties(value, schema, name)
-
-	def _validate_null(self, value, schema, name):
-		if not isinstance(value, type(None)):
-			raise SchemaValidationException(name,
-				"The value '%s' is not NULL." %
-				str(value))
-
-	def _check_minimum(self, value, schema, name):
-		if not "minimum" in schema:
-			return
-		if schema['minimum'] > value:
-			raise SchemaValidationException(name,
-				"The value %s is less than %s." %
-				(str(value), str(schema['minimum'])))
+			types = [ types ]
+		validators = [ self._compile_single_type(type, schema)
+			for type in types ]
+		if 1 == len(validators):
+			return validators[0]
+
+		def validate(value, name):
+			last_exception = None
+			for validator in validators:
+				try:
+					validator(value, name)
+					# One of the defined types is successfully
+					# validated.
+					return
+				except SchemaValidationException as e:
+					# Continue with the next type but remember the
+					# exception.
+					last_exception = e
+			# The validation is not successful, so throw the last
+			# exception.
+			raise last_exception
+		return validate
+
+	def _compile_single_type(self, type, schema):
+		if "any" == type:
+			return lambda value, name: None
+		if "array" == type:
+			return self._compile_checks((list, tuple), "an array", [
+				self._compile_min_items(schema),
+				self._compile_max_items(schema),
+				self._compile_items(schema)
+			])
+		if "boolean" == type:
+			return self._compile_checks(bool, "a boolean", [])
+		if "object" == type:
+			return self._compile_checks(dict, "an object", [
+				self._compile_properties(schema)
+			])
+		if "integer" == type:
+			return self._compile_checks(int, "an integer",
+				self._compile_numeric(schema))
+		if "number" == type:
+			return self._compile_checks((int, float, decimal.Decimal),
+				"a number", self._compile_numeric(schema))
+		if "string" == type:
+			return self._compile_checks(str, "a string", [
+				self._compile_pattern(schema),
+				self._compile_min_length(schema),
+				self._compile_max_length(schema),
+				self._compile_format(schema),
+				self._compile_enum(schema),
+				self._compile_one_of(schema)
+			])
+		if "null" == type:
+			def validate(value, name):
+				if value is not None:
+					raise SchemaValidationException(name,
+						"The value '%s' is not NULL." % str(value))
+			return validate
+		return self._compile_error("The type '%s' is not defined." % type)
 
-	def _check_maximum(self, value, schema, name):
-		if not "maximum" in schema:
-			return
-		if schema['maximum'] < value:
-			raise SchemaValidationException(name,
-				"The value %s is bigger than %s." %
-				(str(value), str(schema['maximum'])))
+	def _compile_checks(self, types, description, checks):
+		"""
+		Helper method to compile a validator that checks the type of
+		the value and runs the given checks afterwards.
+		:param types:		The expected Python type or tuple of types.
+		:param description:	The description of the type used in the
+							error message, e.g. 'an integer'.
+		:param checks:		The list of compiled checks. Checks that are
+							None are skipped.
+		:returns:			Returns the validator.
+		"""
+		checks = [ check for check in checks if check is not None ]
+		message = "The value '%s' is not " + description + "."
+		def validate(value, name):
+			if not isinstance(value, types):
+				raise SchemaValidationException(name,
+					message % _to_str(value))
+			for check in checks:
+				check(value, name)
+		return validate
 
-	def _check_exclusive_minimum(self, value, schema, name):
+	def _compile_error(self, message):
+		"""
+		Helper method to compile a check that raises a SchemaException.
+		Errors in the schema are reported when a value is validated,
+		not when the schema is compiled.
+		:param message:	The error message.
+		:returns:		Returns the check.
+		"""
+		def check(value, name):
+			raise SchemaException("%s: %s" % (name, message))
+		return check
+
+	def _compile_numeric(self, schema):
+		return [
+			self._compile_minimum(schema),
+			self._compile_maximum(schema),
+			self._compile_enum(schema),
+			self._compile_one_of(schema)
+		]
+
+	def _compile_minimum(self, schema):
 		if not "minimum" in schema:
-			return
-		if not ("exclusiveMinimum" in schema and
-			(True == schema['exclusiveMinimum'])):
-			return
-		if schema['minimum'] == value:
-			raise SchemaValidationException(name,
-				"Invalid value %s, must be greater than %s." %
-				(str(value), str(schema['minimum'])))
+			return None
+		minimum = schema['minimum']
+		exclusive = "exclusiveMinimum" in schema and \
+			(True == schema['exclusiveMinimum'])
+		def check(value, name):
+			if minimum > value:
+				raise SchemaValidationException(name,
+					"The value %s is less than %s." %
+					(str(value), str(minimum)))
+			if exclusive and minimum == value:
+				raise SchemaValidationException(name,
+					"Invalid value %s, must be greater than %s." %
+					(str(value), str(minimum)))
+		return check
 
-	def _check_exclusive_maximum(self, value, schema, name):
+	def _compile_maximum(self, schema):
 		if not "maximum" in schema:
-			return
-		if not ("exclusiveMaximum" in schema and
-			(True == schema['exclusiveMaximum'])):
-			return
-		if schema['maximum'] == value:
-			raise SchemaValidationException(name,
-				"Invalid value %s, must be greater than %s." %
-				(str(value), str(schema['maximum'])))
+			return None
+		maximum = schema['maximum']
+		exclusive = "exclusiveMaximum" in schema and \
+			(True == schema['exclusiveMaximum'])
+		def check(value, name):
+			if maximum < value:
+				raise SchemaValidationException(name,
+					"The value %s is bigger than %s." %
+					(str(value), str(maximum)))
+			if exclusive and maximum == value:
+				raise SchemaValidationException(name,
+					"Invalid value %s, must be less than %s." %
+					(str(value), str(maximum)))
+		return check
 
-	def _check_min_length(self, value, schema, name):
+	def _compile_min_length(self, schema):
 		if not "minLength" in schema:
-			return
-		if schema['minLength'] > len(value):
-			raise SchemaValidationException(name,
-				"The value '%s' is too short, minimum length is %d." %
-				(value, schema['minLength']))
+			return None
+		min_length = schema['minLength']
+		def check(value, name):
+			if min_length > len(value):
+				raise SchemaValidationException(name,
+					"The value '%s' is too short, minimum length is %d." %
+					(value, min_length))
+		return check
 
-	def _check_max_length(self, value, schema, name):
+	def _compile_max_length(self, schema):
 		if not "maxLength" in schema:
-			return
-		if schema['maxLength'] < len(value):
-			raise SchemaValidationException(name,
-				"The value '%s' is too long, maximum length is %d." %
-				(value, schema['maxLength']))
+			return None
+		max_length = schema['maxLength']
+		def check(value, name):
+			if max_length < len(value):
+				raise SchemaValidationException(name,
+					"The value '%s' is too long, maximum length is %d." %
+					(value, max_length))
+		return check
 
-	def _check_pattern(self, value, schema, name):
+	def _compile_pattern(self, schema):
 		if not "pattern" in schema:
-			return
-		if not re.match(schema['pattern'], value):
-			raise SchemaValidationException(name,
-				"The value '%s' doesn't match the pattern '%s'." %
-				(value, schema['pattern']))
+			return None
+		pattern = schema['pattern']
+		try:
+			match = re.compile(pattern).match
+		except re.error as e:
+			return self._compile_error("Invalid pattern '%s': %s" %
+				(pattern, str(e)))
+		def check(value, name):
+			if not match(value):
+				raise SchemaValidationException(name,
+					"The value '%s' doesn't match the pattern '%s'." %
+					(value, pattern))
+		return check
+
+	def _compile_format(self, schema):
+		if not "format" in schema:
+			return None
+		check = self._get_format_checker(schema['format'])
+		if check is None:
+			return self._compile_error("The format '%s' is not defined." %
+				schema['format'])
+		return check
+
+	@staticmethod
+	def _compile_regex(pattern, message, flags=0):
+		"""
+		Helper method to create a format checker based on a regular
+		expression. The regular expression is compiled only once.
+		:param pattern:	The regular expression the value must match.
+		:param message:	The error message, '%s' is replaced by the value.
+		:param flags:	The regular expression flags. Defaults to 0.
+		:returns:		Returns the format checker.
+		"""
+		regex = re.compile(pattern, flags)
+		def check(value, name):
+			if not regex.match(value):
+				raise SchemaValidationException(name, message % value)
+		return check
+
+	def _get_format_checker(self, format):
+		"""
+		Get the checker for the given format, see
+		https://tools.ietf.org/html/draft-zyp-json-schema-03#section-5.23
+		Override this method to support additional formats.
+		:param format:	The name of the format, e.g. 'ipv4'.
+		:returns:		Returns a callable that takes the value and the
+						JSON path of the entity to validate, or None if
+						the format is not defined.
+		"""
+		if format in [ "date-time", "datetime" ]:
+			return self._compile_regex(
+				r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$',
+				"The value '%s' does not match to ISO 8601.")
+		if "date" == format:
+			return self._compile_regex(
+				r'^\d{4}-\d{2}-\d{2}$',
+				"The value '%s' does not match to YYYY-MM-DD.")
+		if "time" == format:
+			return self._compile_regex(
+				r'^\d{2}:\d{2}:\d{2}$',
+				"The value '%s' does not match to hh:mm:ss.")
+		if format in [ "host-name", "hostname" ]:
+			return self._compile_regex(
+				r'^[a-zA-Z]([-a-zA-Z0-9]{0,61}[a-zA-Z0-9])' \
+				'{0,1}$', "The value '%s' is not a valid hostname.")
+		if "regex" == format:
+			def check(value, name):
+				try:
+					re.compile(value)
+				except:
+					raise SchemaValidationException(name,
+						"The value '%s' is not a valid regex." % value)
+			return check
+		if "uri" == format:
+			def check(value, name):
+				try:
+					urllib.parse.urlparse(value)
+				except:
+					raise SchemaValidationException(name,
+						"The value '%s' is not an URI." % value)
+			return check
+		if "email" == format:
+			def check(value, name):
+				if not "@" in value:
+					raise SchemaValidationException(name,
+						"The value '%s' is not an email." % value)
+			return check
+		if format in [ "ip-address", "ipv4" ]:
+			def check(value, name):
+				try:
+					socket.inet_aton(value)
+				except socket.error:
+					raise SchemaValidationException(name,
+						"The value '%s' is not an IPv4 address." % value)
+			return check
+		if "ipv6" == format:
+			def check(value, name):
+				try:
+					socket.inet_pton(socket.AF_INET6, value)
+				except socket.error:
+					raise SchemaValidationException(name,
+						"The value '%s' is not an IPv6 address." % value)
+			return check
+		return None
 
 	def _check_format(self, value, schema, name):
 		"""
-		Check https://tools.ietf.org/html/draft-zyp-json-schema-03#section-5.23
+		Check the value against the format defined in the given schema.
+		:raises openmediavault.json.SchemaException:
+		:raises openmediavault.json.SchemaValidationException:
 		"""
-		if not "format" in schema:
-			return
-		if schema['format'] in [ "date-time", "datetime" ]:
-			if not re.match(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$', value):
-				raise SchemaValidationException(name,
-					"The value '%s' does not match to ISO 8601." % value)
-		elif "date" == schema['format']:
-			if not re.match(r'^\d{4}-\d{2}-\d{2}$', value):
-				raise SchemaValidationException(name,
-					"The value '%s' does not match to YYYY-MM-DD." % value)
-		elif "time" == schema['format']:
-			if not re.match(r'^\d{2}:\d{2}:\d{2}$', value):
-				raise SchemaValidationException(name,
-					"The value '%s' does not match to hh:mm:ss." % value)
-		elif schema['format'] in [ "host-name", "hostname" ]:
-			if not re.match(r'^[a-zA-Z]([-a-zA-Z0-9]{0,61}[a-zA-Z0-9])' \
-				'{0,1}$', value):
-				raise SchemaValidationException(name,
-					"The value '%s' is not a valid hostname." % value)
-		elif "regex" == schema['format']:
-			try:
-				re.compile(value)
-			except:
-				raise SchemaValidationException(name,
-					"The value '%s' is not a valid regex." % value)
-		elif "uri" == schema['format']:
-			try:
-				urllib.parse.urlparse(value);
-			except:
-				raise SchemaValidationException(name,
-					"The value '%s' is not an URI." % value)
-		elif "email" == schema['format']:
-			if not "@" in value:
-				raise SchemaValidationException(name,
-					"The value '%s' is not an email." % value)
-		elif schema['format'] in [ "ip-address", "ipv4" ]:
-			try:
-				socket.inet_aton(value)
-			except socket.error:
-				raise SchemaValidationException(name,
-					"The value '%s' is not an IPv4 address." % value)
-		elif "ipv6" == schema['format']:
-			try:
-				socket.inet_pton(socket.AF_INET6, value)
-			except socket.error:
-				raise SchemaValidationException(name,
-					"The value '%s' is not an IPv6 address." % value)
-		else:
-			raise SchemaException(
-				"%s: The format '%s' is not defined." %
-				(name, schema['format']))
+		check = self._compile_format(schema)
+		if check is not None:
+			check(value, name)
 
-	def _check_enum(self, value, schema, name):
+	def _compile_enum(self, schema):
 		if not "enum" in schema:
-			return
-		if not isinstance(schema['enum'], list):
-			raise SchemaException(
-				"The attribute 'enum' is not an array." % name)
-		if not isinstance(value, list):
-			value = [ value ]
-		for valuev in value:
-			if not valuev in schema['enum']:
-				raise SchemaValidationException(name,
-					"Invalid value '%s', allowed values are '%s'.",
-					(valuev, ", ".join(schema['enum'])))
+			return None
+		enum = schema['enum']
+		if not isinstance(enum, list):
+			return self._compile_error(
+				"The attribute 'enum' is not an array.")
+		def check(value, name):
+			if not isinstance(value, list):
+				value = [ value ]
+			for valuev in value:
+				if not valuev in enum:
+					raise SchemaValidationException(name,
+						"Invalid value '%s', allowed values are '%s'." %
+						(valuev, ", ".join(map(str, enum))))
+		return check
 
-	def _check_min_items(self, value, schema, name):
+	def _compile_min_items(self, schema):
 		if not "minItems" in schema:
-			return
-		if schema['minItems'] > len(value):
-			raise SchemaValidationException(name,
-				"Not enough array items, minimum is %d." %
-				schema['minItems'])
+			return None
+		min_items = schema['minItems']
+		def check(value, name):
+			if min_items > len(value):
+				raise SchemaValidationException(name,
+					"Not enough array items, minimum is %d." % min_items)
+		return check
 
-	def _check_max_items(self, value, schema, name):
+	def _compile_max_items(self, schema):
 		if not "maxItems" in schema:
-			return
-		if schema['maxItems'] < len(value):
-			raise SchemaValidationException(name,
-				"Too many array items, maximum is %d." %
-				schema['maxItems'])
+			return None
+		max_items = schema['maxItems']
+		def check(value, name):
+			if max_items < len(value):
+				raise SchemaValidationException(name,
+					"Too many array items, maximum is %d." % max_items)
+		return check
 
-	def _check_properties(self, value, schema, name):
+	def _compile_properties(self, schema):
 		if not "properties" in schema:
-			raise SchemaException(name,
+			return self._compile_error(
 				"No 'properties' attribute defined.")
 		if not isinstance(schema['properties'], dict):
-			raise SchemaException(name,
+			return self._compile_error(
 				"The attribute 'properties' is not a dictionary.")
-		for propk, propv in schema['properties'].items():
-			# Build the new path. Strip empty parts.
-			parts = [ name, propk ];
-			parts = [ part for part in parts if part ]
-			path = ".".join(parts);
-			# Check if the 'required' attribute is set.
-			if not propk in value:
-				if ("required" in propv) and (True == propv['required']):
-					raise SchemaValidationException(name,
-						"Missing 'required' attribute '%s'." %
-						path)
-				continue
-			self._validate_type(value[propk], propv, path)
-
-	def _check_items(self, value, schema, name):
+		properties = [ (propk, ("required" in propv) and
+			(True == propv['required']), self._compile_type(propv))
+			for propk, propv in schema['properties'].items() ]
+		def check(value, name):
+			for propk, required, validator in properties:
+				# Build the new path. Strip empty parts.
+				path = "%s.%s" % (name, propk) if name else propk
+				# Check if the 'required' attribute is set.
+				if not propk in value:
+					if required:
+						raise SchemaValidationException(name,
+							"Missing 'required' attribute '%s'." % path)
+					continue
+				validator(value[propk], path)
+		return check
+
+	def _compile_items(self, schema):
 		if not "items" in schema:
-			raise SchemaException(
-				"No 'items' attribute defined." %
-				name)
-		if isinstance(schema['items'], dict):
-			for itemk, itemv in value.items():
-				path = "%s[%d]" % (name, itemk)
-				valid = True;
-				for item_schema in schema['items']:
-					try:
-						self._validate_type(itemv, item_schema, path);
-					except SchemaValidationException:
-						valid = False
-				if not valid:
-					types = map(lambda x: x['type'], schema['items'])
-					raise SchemaValidationException(name,
-						"Invalid 'items' value, must be one of the " \
-						"following types '%s'." %
-						", ".join(types))
-		elif isinstance(schema['items'], list):
-			for itemk, itemv in enumerate(value):
-				path = "%s[%d]" % (name, itemk)
-				self._validate_type(itemv, schema['items'], path);
-		else:
-			raise SchemaValidationException(name,
-				"Invalid 'items' value.")
-
-	def _check_one_of(self, value, schema, name):
+			return self._compile_error("No 'items' attribute defined.")
+		items = schema['items']
+		if isinstance(items, dict):
+			validator = self._compile_type(items)
+			def check(value, name):
+				for itemk, itemv in enumerate(value):
+					validator(itemv, "%s[%d]" % (name, itemk))
+			return check
+		if isinstance(items, list):
+			# Each item must match one of the given schemas.
+			validators = [ self._compile_type(item) for item in items ]
+			types = ", ".join([ str(item.get("type", "any"))
+				for item in items ])
+			def check(value, name):
+				for itemk, itemv in enumerate(value):
+					path = "%s[%d]" % (name, itemk)
+					for validator in validators:
+						try:
+							validator(itemv, path)
+							break
+						except SchemaValidationException:
+							pass
+					else:
+						raise SchemaValidationException(name,
+							"Invalid 'items' value, must be one of the " \
+							"following types '%s'." % types)
+			return check
+		def check(value, name):
+			raise SchemaValidationException(name, "Invalid 'items' value.")
+		return check
+
+	def _compile_one_of(self, schema):
 		if not "oneOf" in schema:
-			return
+			return None
 		if not isinstance(schema['oneOf'], list):
-			raise SchemaException(
-				"The 'oneOf' attribute is not an array." %
-				name)
-		valid = False
-		for subSchemak, subSchemav in enumerate(schema['oneOf']):
-			try:
-				self._validate_type(value, subSchemav, name);
-				# If validation succeeds for one of the schema, then we
-				# can exit immediatelly.
-				valid = True
-			except SchemaValidationException:
-				# Nothing to do here.
-				pass
-		if not valid:
+			return self._compile_error(
+				"The 'oneOf' attribute is not an array.")
+		validators = [ self._compile_type(sub_schema)
+			for sub_schema in schema['oneOf'] ]
+		def check(value, name):
+			for validator in validators:
+				try:
+					validator(value, name)
+					# If validation succeeds for one of the schema,
+					# then we can exit immediatelly.
+					return
+				except SchemaValidationException:
+					# Nothing to do here.
+					pass
 			raise SchemaValidationException(name,
 				"Failed to match exactly one schema.")
+		return check
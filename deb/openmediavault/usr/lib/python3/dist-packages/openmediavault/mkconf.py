@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+__all__ = [
+	"get_dependencies",
+	"get_order",
+	"run_scripts"
+]
+
+import collections
+import concurrent.futures
+import os
+import re
+import subprocess
+
+_AFTER_RE = re.compile(r"^#\s*omv-mkconf-after:(.*)$", re.MULTILINE)
+
+def get_dependencies(path):
+	"""
+	Get the scripts that must be executed before the given script if
+	they are executed together. They are declared by a comment in the
+	script, e.g.
+	# omv-mkconf-after: certificates php-fpm
+	:param path:	The path of the script.
+	:returns:	Returns the list of script names.
+	"""
+	with open(path, "r", errors="replace") as fd:
+		content = fd.read()
+	names = []
+	for m in _AFTER_RE.finditer(content):
+		names.extend(m.group(1).split())
+	return names
+
+def get_order(dependencies):
+	"""
+	Sort the scripts topologically.
+	:param dependencies:	A dictionary that maps the script names to
+		the names of the scripts they depend on. Dependencies that are
+		not part of the dictionary are ignored.
+	:returns:	Returns the list of script names, every script follows
+		the scripts it depends on.
+	:raises ValueError:	If the dependencies contain a cycle.
+	"""
+	order = []
+	pending = collections.OrderedDict((name, set(deps) & set(dependencies))
+		for name, deps in dependencies.items())
+	while pending:
+		ready = [ name for name, deps in pending.items()
+			if deps <= set(order) ]
+		if not ready:
+			raise ValueError("The dependencies of the scripts '%s' are "
+				"circular." % "', '".join(sorted(pending)))
+		for name in ready:
+			order.append(name)
+			del pending[name]
+	return order
+
+def _execute(path):
+	result = subprocess.run([ path ], stdout=subprocess.PIPE,
+		stderr=subprocess.STDOUT)
+	return (result.returncode, result.stdout.decode(errors="replace"))
+
+def run_scripts(scripts_dir, names, max_workers=1, callback=None):
+	"""
+	Execute the given scripts concurrently. A script is started after
+	all scripts it depends on have been finished, see
+	get_dependencies().
+	:param scripts_dir:	The directory containing the scripts.
+	:param names:	The names of the scripts to execute.
+	:param max_workers:	The number of scripts that are executed in
+		parallel. Defaults to 1.
+	:param callback:	A function that is called with the name, the
+		exit code and the output (STDOUT and STDERR) of every script
+		as soon as it has been finished. Defaults to None.
+	:returns:	Returns an ordered dictionary that maps the script names
+		to a tuple of the exit code and the output of the script.
+	:raises ValueError:	If the dependencies contain a cycle.
+	"""
+	names = list(collections.OrderedDict.fromkeys(names))
+	dependencies = collections.OrderedDict()
+	for name in names:
+		dependencies[name] = [ dep for dep in get_dependencies(
+			os.path.join(scripts_dir, name)) if dep in names and dep != name ]
+	pending = get_order(dependencies)
+	results = {}
+	with concurrent.futures.ThreadPoolExecutor(
+			max_workers=max_workers) as executor:
+		running = {}
+		while pending or running:
+			# Start the scripts whose dependencies have been finished.
+			for name in [ name for name in pending if all(
+					dep in results for dep in dependencies[name]) ]:
+				pending.remove(name)
+				future = executor.submit(_execute,
+					os.path.join(scripts_dir, name))
+				running[future] = name
+			done, _ = concurrent.futures.wait(running,
+				return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				name = running.pop(future)
+				try:
+					results[name] = future.result()
+				except OSError as e:
+					results[name] = (126, "%s\n" % str(e))
+				if callback is not None:
+					callback(name, *results[name])
+	return collections.OrderedDict((name, results[name]) for name in names)
@@ -19,15 +19,52 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 __all__ = [
+	'GraphSpec',
+	'GraphCache',
+	'GraphEngine',
+	'GraphState',
 	'IPlugin',
-	'load_collectd_config'
+	'ModuleEngine',
+	'PipeEngine',
+	'PluginRegistry',
+	'RrdtoolError',
+	'RunCoalescer',
+	'SubprocessEngine',
+	'collect_graph_jobs',
+	'get_graph_engine',
+	'get_graph_sources',
+	'load_collectd_config',
+	'render_graph',
+	'run_graph_jobs'
 ]
 
 import abc
+import concurrent.futures
+import contextlib
+import hashlib
+import json
 import openmediavault
+import openmediavault.collectd
+import openmediavault.log
+import openmediavault.plugins
 import os
 import re
 import shutil
+import subprocess
+import threading
+import time
+
+# The list of graph jobs that are collected instead of being executed
+# immediately, see collect_graph_jobs(). The jobs are collected per
+# thread, thus graphs can be collected by several threads at once.
+_local = threading.local()
+
+# The maximum length of a command line that is accepted by 'rrdtool -'.
+# The commands are read into a buffer of 10000 bytes.
+PIPE_MAX_LINE_LENGTH = 9998
+
+class RrdtoolError(Exception):
+	pass
 
 class IPlugin(metaclass=abc.ABCMeta):
 	@abc.abstractmethod
@@ -36,15 +73,749 @@ class IPlugin(metaclass=abc.ABCMeta):
 		Build the RRD graph.
 		"""
 
+class PluginRegistry(openmediavault.plugins.Registry):
+	"""
+	Loads the plugins of a directory. A plugin is imported when it is
+	used the first time and again if its file has been modified.
+	"""
+
+	def __init__(self, path):
+		"""
+		:param path:	The directory containing the plugins.
+		"""
+		super().__init__(path, 'Plugin', IPlugin)
+		# The plugins that could not be loaded. They are loaded again
+		# only if their file has been modified.
+		self._failed = set()
+
+	def get_plugins(self, names=None):
+		"""
+		Get the plugins. Plugins that can't be loaded are skipped.
+		:param names:	The names of the plugins to load. Defaults to
+			None, which loads all plugins.
+		:returns:	Returns a dictionary of IPlugin objects, the keys are
+			the plugin names.
+		"""
+		plugins = {}
+		entries = self.get_entries()
+		with self._lock:
+			self._failed &= set(entries.values())
+			for name, entry in entries.items():
+				if (names is not None and name not in names) or \
+						entry in self._failed:
+					continue
+				try:
+					plugins[name] = entry.get_instance()
+				except Exception as e:
+					self._failed.add(entry)
+					openmediavault.log.error(
+						'Failed to load plugin (plugin=%s): %s', name, str(e))
+		return plugins
+
+class GraphSpec(object):
+	"""
+	Describes a RRD graph. The graph elements are added by the methods
+	named like the rrdtool graph elements, e.g.
+
+	spec = GraphSpec('/tmp/load-hour.png', config['defaults'])
+	spec.option('--start', '-1h')
+	spec.DEF('avg', '/var/lib/rrdcached/db/localhost/load/load.rrd',
+		'shortterm', 'AVERAGE')
+	spec.LINE('avg', '#0bb6ff', 'Load')
+	spec.GPRINT('avg', '%4.2lf Last\\l', 'LAST')
+
+	The graph is rendered without a shell, thus texts must not be
+	quoted. Colons in texts still need to be escaped for rrdtool.
+
+	Duplicate DEFs are merged only within a graph. Every 'rrdtool graph'
+	command reads its DEFs itself and rrdtool offers no way to share the
+	fetched data between commands, thus graphs that read the same RRD
+	file, e.g. the graphs of every period, can't share their DEFs.
+	Instead run_graph_jobs() flushes every RRD file from rrdcached only
+	once for all graphs of a run, which is where the repeated work of
+	the graphs was spent.
+	"""
+
+	def __init__(self, filename, options=None, shell=False):
+		"""
+		:param filename:	The name of the image file.
+		:param options:	The list of rrdtool options, e.g. the
+			default options of all graphs. Defaults to None.
+		:param shell:	Set to True if the arguments are quoted for
+			a shell, see call_rrdtool_graph(). Defaults to False.
+		"""
+		self.filename = filename
+		self.shell = shell
+		self._options = list(options or [])
+		self._elements = []
+		self._defs = {}
+
+	def option(self, *args):
+		"""
+		Append the given options.
+		"""
+		self._options.extend(args)
+		return self
+
+	def get_option(self, name):
+		"""
+		Get the value of the given option.
+		:returns:	Returns the value of the option or None if the
+			option is not set.
+		"""
+		try:
+			return self._options[self._options.index(name) + 1]
+		except (ValueError, IndexError):
+			return None
+
+	def DEF(self, vname, rrdfile, ds, cf):
+		"""
+		Read the data source of the given RRD file. Reading the same
+		data again via another variable name is replaced by a CDEF
+		that refers to the first variable.
+		"""
+		key = (rrdfile, ds, cf)
+		if key in self._defs:
+			if self._defs[key] != vname:
+				self.CDEF(vname, self._defs[key])
+			return self
+		self._defs[key] = vname
+		self._elements.append('DEF:{}={}:{}:{}'.format(vname, rrdfile, ds, cf))
+		return self
+
+	def CDEF(self, vname, rpn):
+		self._elements.append('CDEF:{}={}'.format(vname, rpn))
+		return self
+
+	def VDEF(self, vname, rpn):
+		self._elements.append('VDEF:{}={}'.format(vname, rpn))
+		return self
+
+	def _graph(self, type_, vname, color, legend, stack):
+		element = '{}:{}{}'.format(type_, vname, color)
+		if legend is not None or stack:
+			element += ':{}'.format(legend or '')
+		if stack:
+			element += ':STACK'
+		self._elements.append(element)
+		return self
+
+	def LINE(self, vname, color, legend=None, width=1, stack=False):
+		return self._graph('LINE{}'.format(width), vname, color, legend,
+			stack)
+
+	def AREA(self, vname, color, legend=None, stack=False):
+		return self._graph('AREA', vname, color, legend, stack)
+
+	def GPRINT(self, vname, format, cf=None):
+		"""
+		Print the value of a variable. The consolidation function must
+		not be set for variables that are defined by VDEF.
+		"""
+		if cf is None:
+			self._elements.append('GPRINT:{}:{}'.format(vname, format))
+		else:
+			self._elements.append('GPRINT:{}:{}:{}'.format(vname, cf,
+				format))
+		return self
+
+	def COMMENT(self, text):
+		self._elements.append('COMMENT:{}'.format(text))
+		return self
+
+	@property
+	def sources(self):
+		"""
+		Get the RRD files that are used by the graph.
+		"""
+		return get_graph_sources(self.to_args())
+
+	def to_args(self, daemon=True):
+		"""
+		Get the rrdtool graph arguments.
+		:param daemon:	Set to False to remove the --daemon option.
+			Defaults to True.
+		:returns:	Returns the list of arguments, the first one is the
+			name of the image file.
+		"""
+		options = self._options
+		if not daemon and '--daemon' in options:
+			index = options.index('--daemon')
+			options = options[:index] + options[index + 2:]
+		return [ self.filename, *options, *self._elements ]
+
+	def to_argv(self, daemon=True):
+		"""
+		Get the command line to render the graph.
+		:param daemon:	Set to False to remove the --daemon option.
+			Defaults to True.
+		:returns:	Returns the command line as list if the graph can be
+			executed without a shell, otherwise as string.
+		"""
+		argv = [ 'rrdtool', 'graph', *self.to_args(daemon) ]
+		if self.shell:
+			return ' '.join(argv)
+		return argv
+
 def call_rrdtool_graph(args):
 	"""
 	Call the rrdtool command line executable with the given arguments.
+	If the graph jobs are collected, then the arguments are queued and
+	the graph is created later by run_graph_jobs().
+	Note, the arguments are passed to the shell, use render_graph() for
+	new code.
 	"""
+	jobs = getattr(_local, 'graph_jobs', None)
+	if jobs is not None:
+		jobs.append(GraphSpec(args[0], args[1:], shell=True))
+		return 0
 	# The command below does not work because the RRD tool synatx is escaped
 	# and the graph legend is not rendered as expected.
 	#return openmediavault.subprocess.check_output(['rrdtool', 'graph', *args])
 	return os.system(' '.join(['rrdtool', 'graph', *args, '>/dev/null']))
 
+def render_graph(spec):
+	"""
+	Render the given graph. If the graph jobs are collected, then the
+	graph is queued and created later by run_graph_jobs().
+	:param spec:	The GraphSpec object describing the graph.
+	:returns:	Returns 0 on success, otherwise 1.
+	"""
+	jobs = getattr(_local, 'graph_jobs', None)
+	if jobs is not None:
+		jobs.append(spec)
+		return 0
+	try:
+		SubprocessEngine().render(spec)
+	except RrdtoolError:
+		return 1
+	return 0
+
+@contextlib.contextmanager
+def collect_graph_jobs():
+	"""
+	Collect the graph jobs of the calls to render_graph() and
+	call_rrdtool_graph() instead of executing them immediately. Use
+	run_graph_jobs() to create the graphs afterwards.
+	:returns:	Returns the list of collected GraphSpec objects.
+	"""
+	jobs = []
+	_local.graph_jobs = jobs
+	try:
+		yield jobs
+	finally:
+		_local.graph_jobs = None
+
+def _run_rrdtool(argv, shell=False):
+	result = subprocess.run(argv, shell=shell, stdout=subprocess.DEVNULL,
+		stderr=subprocess.PIPE, env=dict(os.environ, LANG='C'))
+	if result.returncode != 0:
+		raise RrdtoolError(result.stderr.decode(errors='replace').strip())
+
+class GraphEngine(metaclass=abc.ABCMeta):
+	"""
+	The base class of the engines that execute the rrdtool commands.
+	"""
+
+	name = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def close(self):
+		"""
+		Release the resources of the engine.
+		"""
+
+	@abc.abstractmethod
+	def execute(self, command, args):
+		"""
+		Execute a rrdtool command.
+		:param command:	The name of the command, e.g. 'graph'.
+		:param args:	The list of arguments.
+		:raises RrdtoolError:	If the command has failed.
+		"""
+
+	def render(self, spec, daemon=True):
+		"""
+		Render the given graph.
+		:param spec:	The GraphSpec object describing the graph.
+		:param daemon:	Set to False to remove the --daemon option.
+			Defaults to True.
+		:raises RrdtoolError:	If the graph could not be rendered.
+		"""
+		if spec.shell:
+			# The arguments are quoted for a shell.
+			_run_rrdtool(spec.to_argv(daemon), shell=True)
+		else:
+			self.execute('graph', spec.to_args(daemon))
+
+	def flush(self, daemon, sources):
+		"""
+		Flush the pending updates of the given RRD files.
+		:param daemon:	The address of rrdcached.
+		:param sources:	The list of RRD files.
+		:raises RrdtoolError:	If the files could not be flushed.
+		"""
+		self.execute('flushcached', [ '--daemon', daemon, *sources ])
+
+class SubprocessEngine(GraphEngine):
+	"""
+	Executes every command in its own rrdtool process.
+	"""
+
+	name = 'subprocess'
+
+	def execute(self, command, args):
+		_run_rrdtool([ 'rrdtool', command, *args ])
+
+class PipeEngine(GraphEngine):
+	"""
+	Executes the commands in long-lived 'rrdtool -' processes, thus
+	the costs to start a process per graph are saved. A process is
+	used by one thread at a time, further processes are started on
+	demand if the graphs are rendered in parallel.
+	"""
+
+	name = 'pipe'
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._idle = []
+
+	def close(self):
+		with self._lock:
+			processes, self._idle = self._idle, []
+		for process in processes:
+			self._stop(process)
+
+	def _start(self):
+		return subprocess.Popen([ 'rrdtool', '-' ], stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+			env=dict(os.environ, LANG='C'))
+
+	def _stop(self, process):
+		try:
+			process.stdin.close()
+		except OSError:
+			pass
+		try:
+			process.wait(timeout=5)
+		except subprocess.TimeoutExpired:
+			process.kill()
+			process.wait()
+		process.stdout.close()
+
+	def _quote(self, arg):
+		# rrdtool splits the command line at spaces, quotes are
+		# removed but backslashes are not interpreted.
+		if '\n' in arg:
+			raise ValueError('Newlines are not supported.')
+		for quote in [ '"', "'" ]:
+			if quote not in arg:
+				return '{0}{1}{0}'.format(quote, arg)
+		raise ValueError('Arguments containing both types of quotes '
+			'are not supported.')
+
+	def execute(self, command, args):
+		try:
+			line = ' '.join([ command, *map(self._quote, args) ]).encode()
+		except ValueError:
+			line = None
+		if line is None or len(line) > PIPE_MAX_LINE_LENGTH:
+			# The command can't be passed to 'rrdtool -'.
+			_run_rrdtool([ 'rrdtool', command, *args ])
+			return
+		with self._lock:
+			process = self._idle.pop() if self._idle else None
+		if process is None:
+			process = self._start()
+		reusable = False
+		try:
+			process.stdin.write(line + b'\n')
+			process.stdin.flush()
+			# The command may print some output, e.g. the size of the
+			# image, before the status line.
+			while True:
+				output = process.stdout.readline().decode(errors='replace')
+				if not output:
+					raise RrdtoolError('rrdtool has terminated unexpectedly')
+				if output.startswith('OK'):
+					reusable = True
+					return
+				if output.startswith('ERROR:'):
+					reusable = True
+					raise RrdtoolError(output[6:].strip())
+		finally:
+			if reusable:
+				with self._lock:
+					self._idle.append(process)
+			else:
+				process.kill()
+				self._stop(process)
+
+class ModuleEngine(GraphEngine):
+	"""
+	Executes the commands in-process using the rrdtool Python module.
+	The commands are serialized because the graph functions of librrd
+	are not guaranteed to be thread-safe.
+	"""
+
+	name = 'module'
+
+	def __init__(self):
+		import rrdtool
+		self._rrdtool = rrdtool
+		self._lock = threading.Lock()
+
+	def execute(self, command, args):
+		with self._lock:
+			try:
+				getattr(self._rrdtool, command)(*args)
+			except self._rrdtool.OperationalError as e:
+				raise RrdtoolError(str(e))
+
+def get_graph_engine(name='auto', max_workers=1):
+	"""
+	Get the engine that executes the rrdtool commands.
+	:param name:	The name of the engine, e.g. 'module', 'pipe' or
+		'subprocess'. If set to 'auto', the rrdtool Python module is
+		used if it is installed and the graphs are rendered by a single
+		thread, otherwise a 'rrdtool -' pipe per thread. Defaults to
+		'auto'.
+	:param max_workers:	The number of threads that render graphs
+		concurrently. The 'module' engine serializes the commands, thus
+		it is not selected by 'auto' if greater than 1. Defaults to 1.
+	:returns:	Returns a GraphEngine object.
+	:raises ImportError:	If the engine 'module' is requested but the
+		rrdtool Python module is not installed.
+	"""
+	if 'auto' == name:
+		if 1 < max_workers:
+			return PipeEngine()
+		try:
+			return ModuleEngine()
+		except ImportError:
+			return PipeEngine()
+	for cls in [ ModuleEngine, PipeEngine, SubprocessEngine ]:
+		if cls.name == name:
+			return cls()
+	raise ValueError("The graph engine '%s' is not supported." % name)
+
+def _flush_graph_sources(jobs, engine):
+	"""
+	Flush the pending updates of the RRD files used by the given graphs
+	at once instead of letting every graph flush the files it reads.
+	This way RRD files that are used by several graphs, e.g. by the
+	graphs of every period, are flushed only once.
+	:returns:	Returns the graphs whose RRD files have been flushed.
+	"""
+	flushed = set()
+	daemons = {}
+	for spec in jobs:
+		daemon = spec.get_option('--daemon')
+		if daemon is not None:
+			daemons.setdefault(daemon, []).append(spec)
+	for daemon, specs in daemons.items():
+		sources = []
+		for spec in specs:
+			sources.extend(source for source in spec.sources
+				if source not in sources and os.path.exists(source))
+		try:
+			# Limit the length of the command line.
+			for i in range(0, len(sources), 64):
+				engine.flush(daemon, sources[i:i + 64])
+		except (OSError, RrdtoolError):
+			# Let every graph flush its RRD files.
+			continue
+		flushed.update(id(spec) for spec in specs)
+	return flushed
+
+def run_graph_jobs(jobs, max_workers=1, engine=None):
+	"""
+	Create the graphs of the given jobs using a pool of threads, thus
+	the graphs are created in parallel.
+	:param jobs:	The list of GraphSpec objects, see
+		collect_graph_jobs().
+	:param max_workers:	The maximum number of graphs that are created
+		at the same time. Defaults to 1.
+	:param engine:	The GraphEngine object that renders the graphs.
+		Defaults to None, in this case every graph is rendered in its
+		own rrdtool process.
+	:returns:	Returns the list of image filenames of the failed jobs.
+		The errors are logged per job.
+	"""
+	if engine is None:
+		engine = SubprocessEngine()
+	failed = []
+	flushed = _flush_graph_sources(jobs, engine)
+	with concurrent.futures.ThreadPoolExecutor(
+			max_workers=max_workers) as executor:
+		futures = { executor.submit(engine.render, spec,
+			id(spec) not in flushed): spec.filename for spec in jobs }
+		for future in concurrent.futures.as_completed(futures):
+			filename = futures[future]
+			try:
+				future.result()
+			except Exception as e:
+				openmediavault.log.error(
+					'Failed to create graph (filename=%s): %s',
+					filename, str(e))
+				failed.append(filename)
+	return failed
+
+def get_graph_sources(args):
+	"""
+	Get the RRD files that are used by a graph.
+	:param args:	The rrdtool arguments of the graph.
+	:returns:	Returns the list of RRD filenames.
+	"""
+	sources = []
+	for arg in args:
+		m = re.match(r'^DEF:[^=]+=(.+):[^:]+:(AVERAGE|MIN|MAX|LAST)(:|$)', arg)
+		if m and m.group(1) not in sources:
+			sources.append(m.group(1))
+	return sources
+
+class GraphState(object):
+	"""
+	Keeps track of the modification time of the source RRD files at
+	the time a graph has been rendered. This is used to render a graph
+	only if its data has advanced by more than the resolution of the
+	graph, e.g. a yearly graph needs to be rendered only once a day.
+	"""
+
+	def __init__(self, filename):
+		"""
+		:param filename:	The file where the state is stored.
+		"""
+		self._filename = filename
+		self._graphs = {}
+
+	def load(self):
+		"""
+		Load the state. A missing or corrupt state file is ignored,
+		in this case all graphs are rendered.
+		"""
+		try:
+			with open(self._filename, 'r') as fd:
+				self._graphs = json.load(fd)
+		except (OSError, ValueError):
+			self._graphs = {}
+
+	def save(self):
+		"""
+		Save the state.
+		"""
+		os.makedirs(os.path.dirname(self._filename), exist_ok=True)
+		tmp_filename = '{}.tmp'.format(self._filename)
+		with open(tmp_filename, 'w') as fd:
+			json.dump(self._graphs, fd)
+		os.replace(tmp_filename, self._filename)
+
+	def _get_digest(self, spec):
+		# Ignore the comments, they contain the time of the last update.
+		h = hashlib.sha1()
+		for arg in spec.to_args():
+			if not arg.startswith('COMMENT:'):
+				h.update(arg.encode())
+				h.update(b'\0')
+		return h.hexdigest()
+
+	def _get_mtimes(self, spec):
+		return { source: os.stat(source).st_mtime
+			for source in spec.sources }
+
+	def is_outdated(self, spec, step):
+		"""
+		Check whether a graph needs to be rendered.
+		:param spec:	The GraphSpec object of the graph.
+		:param step:	The resolution of the graph in seconds.
+		:returns:	Returns True if the graph has not been rendered yet,
+			its arguments have been modified or its source RRD files
+			have advanced by more than the given resolution since the
+			graph has been rendered, otherwise False.
+		"""
+		graph = self._graphs.get(spec.filename)
+		if graph is None or not os.path.exists(spec.filename):
+			return True
+		if graph['digest'] != self._get_digest(spec):
+			return True
+		try:
+			mtimes = self._get_mtimes(spec)
+		except OSError:
+			return True
+		if not mtimes or set(mtimes) != set(graph['sources']):
+			return True
+		return max(mtimes.values()) - max(graph['sources'].values()) > step
+
+	def update(self, spec):
+		"""
+		Mark a graph as rendered.
+		:param spec:	The GraphSpec object of the graph.
+		"""
+		try:
+			mtimes = self._get_mtimes(spec)
+		except OSError:
+			return
+		self._graphs[spec.filename] = {
+			'digest': self._get_digest(spec),
+			'sources': mtimes,
+			'rendered': time.time()
+		}
+
+class GraphCache(object):
+	"""
+	Renders single graphs on demand. A graph is rendered again only if
+	it is older than the resolution of its period, e.g. a yearly graph
+	is rendered at most once a day. Concurrent requests for the same
+	graph are served by a single rendering.
+	"""
+
+	def __init__(self, registry, engine, get_config):
+		"""
+		:param registry:	The PluginRegistry object.
+		:param engine:	The GraphEngine object that renders the graphs.
+		:param get_config:	A function that returns the configuration
+			that is passed to the plugins for the given period, e.g.
+			'day'. It must raise a KeyError if the period does not
+			exist. Besides the plugin settings the configuration
+			contains the time span of the period in seconds ('seconds').
+		"""
+		self._registry = registry
+		self._engine = engine
+		self._get_config = get_config
+		self._lock = threading.Lock()
+		self._pending = {}
+
+	def _get_ttl(self, config):
+		# The time span that is covered by a single pixel.
+		width = GraphSpec(None, config['defaults']).get_option('--width')
+		return config['seconds'] / int(width or 400)
+
+	def _is_fresh(self, filename, ttl):
+		try:
+			return time.time() - os.stat(filename).st_mtime < ttl
+		except FileNotFoundError:
+			return False
+
+	def _render(self, name, config):
+		# The names of the images start with the name of the plugin, try
+		# all plugins if the image is named differently. Only the
+		# selected plugins are imported.
+		names = [ plugin_name for plugin_name in self._registry.get_entries()
+			if name.startswith(plugin_name + '-') ]
+		plugins = self._registry.get_plugins(names or None)
+		with collect_graph_jobs() as jobs:
+			for plugin_name, plugin in plugins.items():
+				try:
+					# The plugins modify the configuration.
+					plugin.create_graph(config.copy())
+				except Exception as e:
+					openmediavault.log.error(
+						'Failed to build graph (plugin=%s, period=%s): %s',
+						plugin_name, config['period'], str(e))
+		for spec in jobs:
+			if os.path.basename(spec.filename) == name:
+				self._engine.render(spec)
+				return
+		# Plugins copy a placeholder image if there is no data.
+		if not os.path.exists(os.path.join(config['image_dir'], name)):
+			raise KeyError("The graph '{}' does not exist.".format(name))
+
+	def get_graph(self, name):
+		"""
+		Get an up-to-date graph.
+		:param name:	The name of the image file, e.g. 'load-day.png'.
+			The period is the last part of the name.
+		:returns:	Returns the path of the image file.
+		:raises KeyError:	If the graph does not exist.
+		:raises RrdtoolError:	If the graph could not be rendered.
+		"""
+		error = KeyError("The graph '{}' does not exist.".format(name))
+		m = re.match(r'^[^/]+-([a-z]+)\.png$', name)
+		if not m or name.startswith('.'):
+			raise error
+		try:
+			config = self._get_config(m.group(1))
+		except KeyError:
+			raise error from None
+		filename = os.path.join(config['image_dir'], name)
+		if self._is_fresh(filename, self._get_ttl(config)):
+			return filename
+		with self._lock:
+			future = self._pending.get(filename)
+			if future is not None:
+				owner = False
+			else:
+				owner = True
+				future = concurrent.futures.Future()
+				self._pending[filename] = future
+		if not owner:
+			# The graph is rendered by another thread.
+			return future.result()
+		try:
+			self._render(name, config)
+		except Exception as e:
+			future.set_exception(e)
+			raise
+		else:
+			future.set_result(filename)
+		finally:
+			with self._lock:
+				del self._pending[filename]
+		return filename
+
+class RunCoalescer(object):
+	"""
+	Runs a function on request. Requests that arrive while the function
+	is running are served together by a single subsequent run. Every
+	run has its own future, thus a request always gets the result of
+	the run that has served it.
+	"""
+
+	def __init__(self, func):
+		self._func = func
+		self._cond = threading.Condition()
+		# The futures of the current run and of the run that starts
+		# after it.
+		self._running = None
+		self._pending = None
+
+	def request(self):
+		"""
+		Request a run of the function that starts after this call.
+		:returns:	Returns the result of the run.
+		:raises Exception:	The exception raised by the function.
+		"""
+		with self._cond:
+			if self._running is None:
+				future = self._running = concurrent.futures.Future()
+			elif self._pending is not None:
+				# Join the run that starts after the current one.
+				future = self._pending
+			else:
+				future = self._pending = concurrent.futures.Future()
+				while self._running is not None:
+					self._cond.wait()
+				# The run serves all requests that arrived so far.
+				self._pending = None
+				self._running = future
+			owner = future is self._running
+		if owner:
+			try:
+				future.set_result(self._func())
+			except BaseException as e:
+				future.set_exception(e)
+			finally:
+				with self._cond:
+					self._running = None
+					self._cond.notify_all()
+		return future.result()
+
 def copy_placeholder_image(filename):
 	"""
 	Helper function to copy the error graph image.
@@ -54,29 +825,49 @@ def copy_placeholder_image(filename):
 		'/usr/share/openmediavault/icons/rrd_graph_error_64.png');
 	shutil.copyfile(src, filename)
 
-def load_collectd_config(plugin_name, option):
+def _scan_collectd_config(filename, plugin_name, option):
 	"""
-	A simple configuration loader.
+	A simple line based configuration loader. It is used if the
+	configuration file can't be parsed.
 	"""
 	result = []
 	section_found = False
-	filename = os.path.join(openmediavault.getenv('OMV_COLLECTD_CONFIG_DIR',
-		'/etc/collectd/collectd.conf.d'), '{}.conf'.format(plugin_name));
-	if os.path.exists(filename):
-		with open(filename, 'r') as fd:
-			for line in fd:
-				line = line.strip()
-				m = re.match(r'^<Plugin\s+{}\s*>$'.format(plugin_name), line,
+	with open(filename, 'r') as fd:
+		for line in fd:
+			line = line.strip()
+			m = re.match(r'^<Plugin\s+{}\s*>$'.format(plugin_name), line,
+				flags=re.IGNORECASE)
+			if m:
+				section_found = True
+				continue
+			if section_found:
+				m = re.match(r'^\s*{}\s*(.+)$'.format(option), line,
 					flags=re.IGNORECASE)
 				if m:
-					section_found = True
+					result.append(m.group(1).strip('"\''))
 					continue
-				if section_found:
-					m = re.match(r'^\s*{}\s*(.+)$'.format(option), line,
-						flags=re.IGNORECASE)
-					if m:
-						result.append(m.group(1).strip('"\''))
-						continue
-					if re.match(r'^</Plugin>$', line, flags=re.IGNORECASE):
-						break
+				if re.match(r'^</Plugin>$', line, flags=re.IGNORECASE):
+					break
 	return result
+
+def load_collectd_config(plugin_name, option):
+	"""
+	Get the values of an option of a collectd plugin. The configuration
+	is read from the file <OMV_COLLECTD_CONFIG_DIR>/<plugin_name>.conf,
+	it is parsed only once as long as the file is not modified.
+	:param plugin_name:	The name of the plugin, e.g. 'df'.
+	:param option:	The name of the option, e.g. 'MountPoint'.
+	:returns:	Returns the values of all occurrences of the option as
+		strings, unquoted values are returned as written in the file.
+	"""
+	filename = os.path.join(openmediavault.getenv('OMV_COLLECTD_CONFIG_DIR',
+		'/etc/collectd/collectd.conf.d'), '{}.conf'.format(plugin_name))
+	try:
+		config = openmediavault.collectd.load(filename)
+	except FileNotFoundError:
+		return []
+	except openmediavault.collectd.ConfigParseError as e:
+		openmediavault.log.warning('Failed to parse the collectd '
+			'configuration, falling back to a line based scan: %s', str(e))
+		return _scan_collectd_config(filename, plugin_name, option)
+	return config.get_plugin_values(plugin_name, option, raw=True)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+__all__ = [ "Entry", "Registry" ]
+
+import ast
+import collections
+import importlib.util
+import os
+import sys
+import threading
+
+def _get_string(node):
+	# The string literals are ast.Str nodes up to Python 3.7.
+	if hasattr(node, "value"):
+		value = node.value
+	else:
+		value = getattr(node, "s", None)
+	return value if isinstance(value, str) else None
+
+def _scan(filename, class_name, derived=False):
+	"""
+	Find the plugin class in the source code of a file without
+	importing it.
+	:param derived:	Set to True to ignore a class that is derived from
+		'object' only. Defaults to False.
+	:returns:	Returns a tuple (found, description). The description
+		is None if it is not a string literal.
+	"""
+	with open(filename, "rb") as fd:
+		tree = ast.parse(fd.read(), filename)
+	for node in tree.body:
+		if not isinstance(node, ast.ClassDef) or node.name != class_name:
+			continue
+		if derived and all(getattr(base, "id", None) == "object"
+				for base in node.bases):
+			return (False, None)
+		for item in node.body:
+			# A property or method returning a string literal, e.g.
+			# 'def description(self): return "xyz"'.
+			if isinstance(item, ast.FunctionDef) and \
+					"description" == item.name and \
+					1 == len(item.body) and \
+					isinstance(item.body[0], ast.Return):
+				return (True, _get_string(item.body[0].value))
+			# A class attribute, e.g. 'description = "xyz"'.
+			if isinstance(item, ast.Assign) and \
+					[ getattr(target, "id", None)
+						for target in item.targets ] == [ "description" ]:
+				return (True, _get_string(item.value))
+		return (True, None)
+	return (False, None)
+
+class Entry(object):
+	"""
+	A plugin of a registry. The file of the plugin is imported when the
+	plugin is used the first time.
+	"""
+
+	def __init__(self, registry, name, filename, description):
+		self._registry = registry
+		self._name = name
+		self._filename = filename
+		self._description = description
+		self._instance = None
+		# Set if the plugin is not an instance of the base class.
+		self._rejected = False
+
+	@property
+	def name(self):
+		"""
+		Get the name of the plugin, which is the file name without the
+		extension.
+		"""
+		return self._name
+
+	@property
+	def filename(self):
+		return self._filename
+
+	@property
+	def description(self):
+		"""
+		Get the description of the plugin. The plugin is imported only if
+		the description can't be determined from its source code.
+		"""
+		if self._description is None:
+			self._description = self.get_instance().description
+		return self._description
+
+	def get_instance(self):
+		"""
+		Get the plugin object. The file is imported on first use.
+		:returns:	Returns the instance of the plugin class.
+		:raises Exception:	If the file can't be imported.
+		:raises TypeError:	If the plugin is not an instance of the base
+			class of the registry. The plugin is not returned by
+			Registry.get_entries() anymore.
+		"""
+		with self._registry._lock:
+			if self._instance is None:
+				try:
+					self._instance = self._registry._load(self)
+				except TypeError:
+					self._rejected = True
+					raise
+			return self._instance
+
+class Registry(object):
+	"""
+	Discovers the plugins of a directory, e.g. the commands of
+	omv-confdbadm. The plugins are found by scanning the source code of
+	the '*.py' files for the plugin class, thus listing the plugins does
+	not import any of them. Only the plugins that are used are imported.
+	Plugins that turn out not to be derived from the base class when
+	they are imported are dropped from the registry.
+	The directory is scanned again if a file has been added, removed or
+	modified.
+	"""
+
+	def __init__(self, path, class_name, base_class=object):
+		"""
+		:param path:	The directory containing the plugins.
+		:param class_name:	The name of the plugin class that is
+			instantiated, e.g. 'Command'.
+		:param base_class:	The class the plugins must be derived from.
+			Defaults to object.
+		"""
+		self._path = path
+		self._class_name = class_name
+		self._base_class = base_class
+		self._lock = threading.RLock()
+		self._signature = None
+		self._entries = collections.OrderedDict()
+
+	def _get_signature(self):
+		signature = []
+		for name in sorted(os.listdir(self._path)):
+			if not name.endswith(".py"):
+				continue
+			try:
+				st = os.stat(os.path.join(self._path, name))
+			except FileNotFoundError:
+				continue
+			signature.append((name, st.st_mtime_ns, st.st_size))
+		return signature
+
+	def _scan(self, signature):
+		entries = collections.OrderedDict()
+		old_signature = dict((item[0], item) for item in self._signature or [])
+		for item in signature:
+			name = os.path.splitext(item[0])[0]
+			# Keep the plugins whose files have not been modified.
+			if old_signature.get(item[0]) == item and name in self._entries:
+				entries[name] = self._entries[name]
+				continue
+			filename = os.path.join(self._path, item[0])
+			try:
+				(found, description) = _scan(filename, self._class_name,
+					self._base_class is not object)
+			except (OSError, SyntaxError, ValueError):
+				# Let the import report the error.
+				(found, description) = (True, None)
+			if found:
+				entries[name] = Entry(self, name, filename, description)
+		return entries
+
+	def _load(self, entry):
+		# Plugins may import helper modules located in their directory.
+		sys.path.insert(0, self._path)
+		try:
+			spec = importlib.util.spec_from_file_location(entry.name,
+				entry.filename)
+			module = importlib.util.module_from_spec(spec)
+			spec.loader.exec_module(module)
+		finally:
+			sys.path.remove(self._path)
+		instance = getattr(module, self._class_name)()
+		if not isinstance(instance, self._base_class):
+			raise TypeError("The plugin '%s' is not an instance of '%s'." % (
+				entry.name, self._base_class.__name__))
+		return instance
+
+	def get_entries(self):
+		"""
+		Get the plugins of the directory.
+		:returns:	Returns an ordered dictionary of Entry objects, the keys
+			are the plugin names in alphabetical order.
+		"""
+		with self._lock:
+			signature = self._get_signature()
+			if signature != self._signature:
+				self._entries = self._scan(signature)
+				self._signature = signature
+			return collections.OrderedDict((name, entry) for name, entry
+				in self._entries.items() if not entry._rejected)
+
+	def get(self, name):
+		"""
+		Get a plugin.
+		:param name:	The name of the plugin.
+		:returns:	Returns the Entry object.
+		:raises KeyError:	If the plugin does not exist.
+		"""
+		return self.get_entries()[name]
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import socket
+import struct
+import threading
+import openmediavault
+
+class RpcException(Exception):
+	def __init__(self, message, code, trace):
+		super().__init__(message)
+		self._code = code
+		self._trace = trace
+
+	@property
+	def code(self):
+		return self._code
+
+	@property
+	def trace(self):
+		return self._trace
+
+def encode_request(service, method, params=None):
+	"""
+	Encode a RPC request.
+	:param service:	The name of the RPC service.
+	:param method:	The name of the RPC method.
+	:param params:	The RPC parameters. Defaults to None.
+	:returns:	Returns the NUL terminated request as bytes.
+	"""
+	request = json.dumps({
+		"service": service,
+		"method": method,
+		"params": params,
+		"context": {
+			"username": "admin",
+			"role": 0x1
+		}
+	})
+	return request.encode() + b"\0"
+
+def decode_response(data):
+	"""
+	Decode a RPC response.
+	:param data:	The response as bytes without the terminating NUL.
+	:returns:	Returns the response of the RPC.
+	:raises RpcException:	If the RPC has failed.
+	"""
+	response = json.loads(data.decode())
+	if response["error"] is not None:
+		raise RpcException(**response["error"])
+	return response["response"]
+
+class RpcClient(object):
+	"""
+	A client that sends RPC requests to omv-engined via a persistent
+	connection. The connection is established on demand and re-used
+	by subsequent calls. If it has been closed by the daemon in the
+	meanwhile, e.g. because it has been idle for too long, then a new
+	connection is established transparently. The requests are sent
+	again only if none of them can have been executed, see call_many().
+	"""
+
+	_pool = {}
+	_pool_lock = threading.Lock()
+
+	def __init__(self, address=None, sndtimeo=None, rcvtimeo=None):
+		"""
+		:param address:	The address of the omv-engined socket. Defaults
+			to the value of OMV_ENGINED_SO_ADDRESS.
+		:param sndtimeo:	The send timeout in seconds. Defaults to the
+			value of OMV_ENGINED_SO_SNDTIMEO.
+		:param rcvtimeo:	The receive timeout in seconds. Defaults to the
+			value of OMV_ENGINED_SO_RCVTIMEO.
+		"""
+		if address is None:
+			address = openmediavault.getenv("OMV_ENGINED_SO_ADDRESS")
+		if sndtimeo is None:
+			sndtimeo = openmediavault.getenv("OMV_ENGINED_SO_SNDTIMEO",
+				type="int")
+		if rcvtimeo is None:
+			rcvtimeo = openmediavault.getenv("OMV_ENGINED_SO_RCVTIMEO",
+				type="int")
+		self._address = address
+		self._sndtimeo = sndtimeo
+		self._rcvtimeo = rcvtimeo
+		self._socket = None
+		self._pid = None
+		self._lock = threading.RLock()
+		# The receive buffer. Responses are read into it directly and
+		# are decoded once they are complete.
+		self._buffer = bytearray(65536)
+		self._length = 0
+		# The number of bytes sent by the current call.
+		self._sent = 0
+
+	@classmethod
+	def get_pooled(cls, address=None):
+		"""
+		Get the shared client of the current process for the given
+		address.
+		:param address:	The address of the omv-engined socket. Defaults
+			to the value of OMV_ENGINED_SO_ADDRESS.
+		:returns:	Returns a RpcClient object.
+		"""
+		if address is None:
+			address = openmediavault.getenv("OMV_ENGINED_SO_ADDRESS")
+		with cls._pool_lock:
+			client = cls._pool.get(address)
+			if client is None:
+				client = cls(address)
+				cls._pool[address] = client
+			return client
+
+	@property
+	def connected(self):
+		"""
+		Check whether a connection is established.
+		"""
+		return self._socket is not None and self._pid == os.getpid()
+
+	def connect(self):
+		"""
+		Establish the connection if not already done.
+		"""
+		with self._lock:
+			if self.connected:
+				return
+			# Never share a connection inherited from the parent process.
+			self._socket = None
+			self._length = 0
+			s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			try:
+				s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+					struct.pack("ll", self._sndtimeo, 0))
+				s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO,
+					struct.pack("ll", self._rcvtimeo, 0))
+				s.connect(self._address)
+			except Exception:
+				s.close()
+				raise
+			self._socket = s
+			self._pid = os.getpid()
+
+	def close(self):
+		"""
+		Close the connection.
+		"""
+		with self._lock:
+			if self.connected:
+				self._socket.close()
+			self._socket = None
+			self._length = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def call(self, service, method, params=None, idempotent=False):
+		"""
+		Execute a RPC.
+		:param service:	The name of the RPC service.
+		:param method:	The name of the RPC method.
+		:param params:	The RPC parameters. Defaults to None.
+		:param idempotent:	Set to True if the RPC may be executed
+			twice, see call_many(). Defaults to False.
+		:returns:	Returns the response of the RPC.
+		"""
+		return self.call_many([ (service, method, params) ],
+			idempotent)[0]
+
+	def call_many(self, calls, idempotent=False):
+		"""
+		Execute several RPCs at once. All requests are sent via the
+		same connection before the responses are read, thus the daemon
+		is able to process them without waiting for the client.
+		:param calls:	A list of (service, method, params) tuples.
+		:param idempotent:	Set to True if the RPCs may be executed
+			twice, e.g. because they only read data. If a re-used
+			connection breaks, the requests are sent again via a new
+			connection if no response has been received yet. Otherwise
+			they are sent again only if the connection broke before
+			any data has been sent, because the daemon might have
+			executed some of them already. Defaults to False.
+		:returns:	Returns a list containing the responses in the order
+			of the given calls. If a RPC fails, the RpcException of the
+			first failed call is raised after all responses have been
+			received.
+		"""
+		data = b"".join(encode_request(*call) for call in calls)
+		if not data:
+			return []
+		responses = []
+		with self._lock:
+			reused = self.connected
+			try:
+				self._transmit(data, len(calls), responses)
+			except ConnectionError:
+				# The daemon closes connections that have been idle for
+				# too long. Retry once using a new connection if none of
+				# the requests can have been executed yet.
+				if not reused or responses or not (idempotent or
+						0 == self._sent):
+					raise
+				self._transmit(data, len(calls), responses)
+		return [ decode_response(response) for response in responses ]
+
+	def _transmit(self, data, count, responses):
+		self.connect()
+		self._sent = 0
+		try:
+			with memoryview(data) as view:
+				while self._sent < len(data):
+					self._sent += self._socket.send(view[self._sent:])
+			while len(responses) < count:
+				responses.append(self._recv_response())
+		except Exception:
+			self.close()
+			raise
+
+	def _recv_response(self):
+		"""
+		Read the next NUL terminated response from the socket.
+		:returns:	Returns the response without the terminating NUL.
+		"""
+		start = 0
+		while True:
+			pos = self._buffer.find(b"\0", start, self._length)
+			if pos != -1:
+				response = self._buffer[:pos]
+				# Keep the data of the following responses.
+				remaining = self._length - pos - 1
+				self._buffer[:remaining] = self._buffer[pos + 1:self._length]
+				self._length = remaining
+				return response
+			start = self._length
+			# Grow the buffer if it is full.
+			if self._length == len(self._buffer):
+				self._buffer.extend(bytes(len(self._buffer)))
+			with memoryview(self._buffer)[self._length:] as view:
+				nbytes = self._socket.recv_into(view)
+			if nbytes == 0:
+				raise ConnectionError("Socket connection broken")
+			self._length += nbytes
+
+def call(service, method, params=None, idempotent=False):
+	"""
+	Execute a RPC via the shared persistent connection of the current
+	process.
+	:param service:	The name of the RPC service.
+	:param method:	The name of the RPC method.
+	:param params:	The RPC parameters. Defaults to None.
+	:param idempotent:	Set to True if the RPC may be executed twice,
+		see RpcClient.call_many(). Defaults to False.
+	:returns:	Returns the response of the RPC.
+	"""
+	return RpcClient.get_pooled().call(service, method, params,
+		idempotent)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+__all__ = [ "call", "gather_calls" ]
+
+import asyncio
+import openmediavault
+import openmediavault.rpc
+
+# The maximum size of a response. The default limit of the stream
+# reader (64 KiB) is too small for responses like the list of disks.
+STREAM_LIMIT = 64 * 1024 * 1024
+
+def _get_timeout(timeout):
+	if timeout is None:
+		timeout = openmediavault.getenv("OMV_ENGINED_SO_RCVTIMEO",
+			type="int")
+	return timeout
+
+async def _open_connection(address):
+	if address is None:
+		address = openmediavault.getenv("OMV_ENGINED_SO_ADDRESS")
+	return await asyncio.open_unix_connection(address, limit=STREAM_LIMIT)
+
+async def _execute(reader, writer, timeout, service, method, params=None):
+	writer.write(openmediavault.rpc.encode_request(service, method, params))
+	await writer.drain()
+	try:
+		data = await asyncio.wait_for(reader.readuntil(b"\0"), timeout)
+	except asyncio.IncompleteReadError:
+		raise ConnectionError("Socket connection broken")
+	return openmediavault.rpc.decode_response(data[:-1])
+
+async def call(service, method, params=None, address=None, timeout=None):
+	"""
+	Execute a RPC.
+	:param service:	The name of the RPC service.
+	:param method:	The name of the RPC method.
+	:param params:	The RPC parameters. Defaults to None.
+	:param address:	The address of the omv-engined socket. Defaults
+		to the value of OMV_ENGINED_SO_ADDRESS.
+	:param timeout:	The time in seconds to wait for the response.
+		Defaults to the value of OMV_ENGINED_SO_RCVTIMEO.
+	:returns:	Returns the response of the RPC.
+	:raises openmediavault.rpc.RpcException:	If the RPC has failed.
+	"""
+	reader, writer = await _open_connection(address)
+	try:
+		return await _execute(reader, writer, _get_timeout(timeout),
+			service, method, params)
+	finally:
+		writer.close()
+
+async def gather_calls(calls, limit=4, address=None, timeout=None,
+		return_exceptions=False):
+	"""
+	Execute several RPCs concurrently. At most `limit` connections to
+	omv-engined are used at the same time. Each connection processes
+	the pending calls one after another, thus the daemon does not need
+	to fork a child process per call.
+	:param calls:	A list of (service, method, params) tuples.
+	:param limit:	The maximum number of concurrent connections.
+		Defaults to 4.
+	:param address:	The address of the omv-engined socket. Defaults
+		to the value of OMV_ENGINED_SO_ADDRESS.
+	:param timeout:	The time in seconds to wait for a response.
+		Defaults to the value of OMV_ENGINED_SO_RCVTIMEO.
+	:param return_exceptions:	If True, exceptions are returned in
+		place of the response of the failed call, otherwise the first
+		exception is raised. Defaults to False.
+	:returns:	Returns a list containing the responses in the order of
+		the given calls.
+	:raises ValueError:	If the limit is less than 1.
+	"""
+	if limit < 1:
+		raise ValueError("The limit must be greater than zero.")
+	calls = list(calls)
+	timeout = _get_timeout(timeout)
+	results = [ None ] * len(calls)
+	# The iterator is shared by all workers.
+	pending = iter(enumerate(calls))
+
+	async def worker():
+		reader = writer = None
+		try:
+			for index, args in pending:
+				try:
+					if writer is None:
+						reader, writer = await _open_connection(address)
+					results[index] = await _execute(reader, writer,
+						timeout, *args)
+				except openmediavault.rpc.RpcException as e:
+					if not return_exceptions:
+						raise
+					results[index] = e
+				except (OSError, asyncio.TimeoutError,
+						asyncio.LimitOverrunError) as e:
+					# The state of the connection is unknown, use a
+					# new one for the next call.
+					if writer is not None:
+						writer.close()
+						writer = None
+					if not return_exceptions:
+						raise
+					results[index] = e
+		finally:
+			if writer is not None:
+				writer.close()
+
+	tasks = [ asyncio.ensure_future(worker()) for _ in range(
+		min(limit, len(calls))) ]
+	try:
+		await asyncio.gather(*tasks)
+	except Exception:
+		for task in tasks:
+			task.cancel()
+		raise
+	return results
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os.path
+import sys
+import argparse
+import json
+import openmediavault.confdbadm
+import openmediavault.config.database
+import openmediavault.config.object
+
+class Command(openmediavault.confdbadm.ICommand,
+		openmediavault.confdbadm.CommandHelper):
+	@property
+	def description(self):
+		return "Execute commands read from STDIN."
+
+	def _read(self, db, cmd):
+		if cmd.get("defaults", False):
+			objs = openmediavault.config.Object(cmd["id"])
+		elif "filter" in cmd:
+			objs = db.get_by_filter(cmd["id"],
+				openmediavault.config.DatabaseFilter(cmd["filter"]))
+		else:
+			objs = db.get(cmd["id"], cmd.get("uuid"))
+		if isinstance(objs, list):
+			return [ obj.get_dict() for obj in objs ]
+		if objs is None:
+			raise openmediavault.config.DatabaseException(
+				"No such object: %s" % cmd["id"])
+		return objs.get_dict()
+
+	def _update(self, db, cmd):
+		obj = openmediavault.config.Object(cmd["id"])
+		obj.set_dict(cmd["data"])
+		db.set(obj)
+		return obj.get_dict()
+
+	def _delete(self, db, cmd):
+		if "filter" in cmd:
+			objs = db.delete_by_filter(cmd["id"],
+				openmediavault.config.DatabaseFilter(cmd["filter"]))
+		else:
+			objs = db.get(cmd["id"], cmd.get("uuid"))
+			if not isinstance(objs, list):
+				objs = [] if objs is None else [ objs ]
+			for obj in objs:
+				db.delete(obj)
+		return len(objs)
+
+	def _exists(self, db, cmd):
+		filter = None
+		if "filter" in cmd:
+			filter = openmediavault.config.DatabaseFilter(cmd["filter"])
+		return db.exists(cmd["id"], filter)
+
+	def _create(self, db, cmd, transaction):
+		# The script modifies the configuration file directly, thus the
+		# pending modifications must be written before.
+		transaction.commit()
+		self.mkBackup()
+		try:
+			self.execCreateScript(cmd["id"])
+		except:
+			self.rollbackChanges()
+			raise
+		finally:
+			self.unlinkBackup()
+		return True
+
+	def execute(self, *args):
+		rc = 0
+		# Parse the command line arguments.
+		parser = argparse.ArgumentParser(
+			prog="%s %s" % (os.path.basename(args[0]), args[1]),
+			description=self.description,
+			epilog="Every line of STDIN is a JSON encoded command, e.g. "
+			"{\"command\": \"read\", \"id\": \"conf.service.ssh\"}. "
+			"The commands 'read', 'update', 'delete', 'exists' and "
+			"'create' are supported, they take the same arguments as "
+			"the equally named omv-confdbadm commands. The result of "
+			"every command is printed as a JSON line, e.g. "
+			"{\"response\": ...} or {\"error\": \"message\"}. All "
+			"modifications are written to the configuration database "
+			"at once when STDIN is closed.")
+		parser.parse_args(args[2:])
+		handlers = {
+			"read": self._read,
+			"update": self._update,
+			"delete": self._delete,
+			"exists": self._exists
+		}
+		# Execute all commands against the same in-memory configuration.
+		db = openmediavault.config.Database()
+		with db.transaction() as transaction:
+			for line in sys.stdin:
+				if not line.strip():
+					continue
+				try:
+					cmd = json.loads(line)
+					for key in [ "command", "id" ]:
+						if key not in cmd:
+							raise ValueError("The command has no '%s' "
+								"property." % key)
+					if "create" == cmd["command"]:
+						response = self._create(db, cmd, transaction)
+					elif "delete" == cmd["command"]:
+						# A failed delete must not leave partial
+						# modifications behind if it fails after some
+						# objects have been deleted. An update is a
+						# single query that either fails before the
+						# XML tree is modified or succeeds.
+						with transaction.savepoint():
+							response = self._delete(db, cmd)
+					elif cmd["command"] in handlers:
+						response = handlers[cmd["command"]](db, cmd)
+					else:
+						raise ValueError("Unknown command '%s'." %
+							cmd["command"])
+					result = { "response": response }
+				except Exception as e:
+					rc = 1
+					result = { "error": str(e) }
+				# Stream the results to the client.
+				print(json.dumps(result), flush=True)
+		return rc
+
+if __name__ == "__main__":
+	rc = 1
+	command = Command();
+	if not command.validate_args(*sys.argv):
+		command.usage(*sys.argv)
+	else:
+		rc = command.execute(*sys.argv)
+	sys.exit(rc)
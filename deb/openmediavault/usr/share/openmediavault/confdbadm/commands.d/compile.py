@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os.path
+import sys
+import argparse
+import openmediavault.confdbadm
+import openmediavault.config.datamodel
+import openmediavault.log
+
+class Command(openmediavault.confdbadm.ICommand,
+		openmediavault.confdbadm.CommandHelper):
+	@property
+	def description(self):
+		return "Precompile the data models into a bundle."
+
+	def execute(self, *args):
+		# Parse the command line arguments.
+		parser = argparse.ArgumentParser(
+			prog="%s %s" % (os.path.basename(args[0]), args[1]),
+			description=self.description)
+		parser.add_argument("--output", nargs="?",
+			help="The path of the bundle file. Defaults to " \
+			"'/var/cache/openmediavault/datamodels.pickle'.")
+		cmd_args = parser.parse_args(args[2:])
+		try:
+			openmediavault.config.DatamodelRegistry.compile(cmd_args.output)
+		except Exception as e:
+			openmediavault.log.error("Failed to compile the data " \
+				"models: %s" % str(e))
+			return 1
+		return 0
+
+if __name__ == "__main__":
+	rc = 1
+	command = Command();
+	if not command.validate_args(*sys.argv):
+		command.usage(*sys.argv)
+	else:
+		rc = command.execute(*sys.argv)
+	sys.exit(rc)
@@ -25,7 +25,6 @@ import argparse
 import openmediavault
 import openmediavault.confdbadm
 import openmediavault.log
-import openmediavault.subprocess
 
 class Command(openmediavault.confdbadm.ICommand,
 	openmediavault.confdbadm.CommandHelper):
@@ -42,29 +41,11 @@ class Command(openmediavault.confdbadm.ICommand,
 		parser.add_argument("id", type=self.argparse_is_datamodel_id,
 			help="The data model ID, e.g. 'conf.service.ssh'")
 		cmd_args = parser.parse_args(args[2:])
-		# Find the script.
-		create_dir = openmediavault.getenv("OMV_CONFDB_CREATE_DIR",
-			"/usr/share/openmediavault/confdb/create.d");
-		script_name = ""
-		for name in os.listdir(create_dir):
-			# Split the script name into its parts:
-			# <DATAMODELID>.<EXT>
-			if cmd_args.id == os.path.splitext(name)[0]:
-				script_name = name
-				break
 		try:
 			# Create a backup of the configuration database.
 			self.mkBackup()
-			# Test if the script exists and is executable.
-			script_path = os.path.join(create_dir, script_name)
-			if not os.path.exists(script_path):
-				raise RuntimeError("The script '%s' does not exist" %
-					script_name)
-			if not os.access(script_path, os.X_OK):
-				raise RuntimeError("The script '%s' is not " \
-					"executable" % script_name)
 			# Execute the script.
-			openmediavault.subprocess.check_call([ script_path ])
+			self.execCreateScript(cmd_args.id)
 			rc = 0
 		except Exception as e:
 			# Display the exception message.
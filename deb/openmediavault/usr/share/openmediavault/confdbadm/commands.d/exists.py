@@ -43,8 +43,9 @@ class Command(openmediavault.confdbadm.ICommand,
 		filter = None
 		if cmd_args.filter:
 			filter = openmediavault.config.DatabaseFilter(cmd_args.filter)
-		# Query the database.
-		db = openmediavault.config.Database()
+		# Query the database. Only the subtree of the data model is
+		# parsed because the command is executed only once.
+		db = openmediavault.config.Database(streaming=True)
 		return 0 if db.exists(cmd_args.id, filter) else 1
 
 if __name__ == "__main__":
@@ -42,6 +42,14 @@ class Command(openmediavault.confdbadm.ICommand,
 			help="The data model ID, e.g. 'conf.service.ssh'")
 		parser.add_argument("--prettify", action="store_true",
 			help="Prettifies the output, by adding spaces and indentation.")
+		parser.add_argument("--format", choices=["json", "jsonl", "shell"],
+			default="json", help="The output format. 'jsonl' prints "
+			"every object on a single line, 'shell' prints shell variable "
+			"assignments that can be evaluated by a shell script. "
+			"Defaults to 'json'.")
+		parser.add_argument("--prefix", help="The prefix of the shell "
+			"variable names. Defaults to the last part of the data model "
+			"ID, e.g. 'ssh_'.")
 		group1 = parser.add_mutually_exclusive_group()
 		group1.add_argument("--defaults", action="store_true",
 			help="Print the default values.")
@@ -53,8 +61,9 @@ class Command(openmediavault.confdbadm.ICommand,
 		if cmd_args.defaults:
 			objs = openmediavault.config.Object(cmd_args.id)
 		else:
-			# Query the database.
-			db = openmediavault.config.Database()
+			# Query the database. Only the subtree of the data model is
+			# parsed because the command is executed only once.
+			db = openmediavault.config.Database(streaming=True)
 			if cmd_args.filter:
 				filter = openmediavault.config.DatabaseFilter(cmd_args.filter)
 				objs = db.get_by_filter(cmd_args.id, filter)
@@ -67,8 +76,18 @@ class Command(openmediavault.confdbadm.ICommand,
 			if not isinstance(objs, openmediavault.config.Object):
 				return 1
 			data = objs.get_dict()
-		# Print the configuration objects as JSON to STDOUT.
-		if cmd_args.prettify:
+		# Print the configuration objects to STDOUT.
+		if "shell" == cmd_args.format:
+			prefix = cmd_args.prefix
+			if prefix is None:
+				prefix = openmediavault.confdbadm.get_shell_prefix(
+					cmd_args.id)
+			for line in openmediavault.confdbadm.to_shell(data, prefix):
+				print(line)
+		elif "jsonl" == cmd_args.format:
+			for obj in data if isinstance(data, list) else [ data ]:
+				print(json.dumps(obj))
+		elif cmd_args.prettify:
 			print(json.dumps(data, sort_keys=True, indent=4))
 		else:
 			print(json.dumps(data))
@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
 	def create_graph(self, config):
@@ -35,32 +34,31 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			'color_cpu_irq': '#9f009f',
 			'color_cpu_steal': '#000000'
 		})
-		args = []
-		args.append('{image_dir}/cpu-0-{period}.png'.format(**config))
-		args.extend(config['defaults'])
-		args.extend(['--start', config['start']])
-		args.extend(['--title', '"{title_cpu}{title_by_period}"'.format(**config)])
-		args.append('--slope-mode')
-		args.extend(['--upper-limit', '100'])
-		args.extend(['--lower-limit', '0'])
-		args.append('--rigid')
-		args.extend(['--vertical-label', 'Percent'])
-		args.append('DEF:idle={data_dir}/cpu-0/cpu-idle.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:nice={data_dir}/cpu-0/cpu-nice.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:user={data_dir}/cpu-0/cpu-user.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:waitio={data_dir}/cpu-0/cpu-wait.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:system={data_dir}/cpu-0/cpu-system.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:softirq={data_dir}/cpu-0/cpu-softirq.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:interrupt={data_dir}/cpu-0/cpu-interrupt.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:steal={data_dir}/cpu-0/cpu-steal.rrd:value:AVERAGE'.format(**config))
-		args.append('AREA:steal{color_cpu_steal}:"Steal"'.format(**config))
-		args.append('AREA:system{color_cpu_system}:"System":STACK'.format(**config))
-		args.append('AREA:waitio{color_cpu_waitio}:"Wait-IO":STACK'.format(**config))
-		args.append('AREA:nice{color_cpu_nice}:"Nice":STACK'.format(**config))
-		args.append('AREA:user{color_cpu_user}:"User":STACK'.format(**config))
-		args.append('AREA:softirq{color_cpu_softirq}:"Soft-IRQ\c":STACK'.format(**config))
-		args.append('AREA:interrupt{color_cpu_irq}:"IRQ":STACK'.format(**config))
-		args.append('AREA:idle{color_cpu_idle}:"Idle\c":STACK'.format(**config))
-		args.append('COMMENT:"{last_update}"'.format(**config))
-		openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			'{image_dir}/cpu-0-{period}.png'.format(**config), config['defaults'])
+		spec.option('--start', config['start'])
+		spec.option('--title', '{title_cpu}{title_by_period}'.format(**config))
+		spec.option('--slope-mode')
+		spec.option('--upper-limit', '100')
+		spec.option('--lower-limit', '0')
+		spec.option('--rigid')
+		spec.option('--vertical-label', 'Percent')
+		spec.DEF('idle', '{data_dir}/cpu-0/cpu-idle.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('nice', '{data_dir}/cpu-0/cpu-nice.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('user', '{data_dir}/cpu-0/cpu-user.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('waitio', '{data_dir}/cpu-0/cpu-wait.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('system', '{data_dir}/cpu-0/cpu-system.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('softirq', '{data_dir}/cpu-0/cpu-softirq.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('interrupt', '{data_dir}/cpu-0/cpu-interrupt.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('steal', '{data_dir}/cpu-0/cpu-steal.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.AREA('steal', config['color_cpu_steal'], 'Steal')
+		spec.AREA('system', config['color_cpu_system'], 'System', stack=True)
+		spec.AREA('waitio', config['color_cpu_waitio'], 'Wait-IO', stack=True)
+		spec.AREA('nice', config['color_cpu_nice'], 'Nice', stack=True)
+		spec.AREA('user', config['color_cpu_user'], 'User', stack=True)
+		spec.AREA('softirq', config['color_cpu_softirq'], 'Soft-IRQ\\c', stack=True)
+		spec.AREA('interrupt', config['color_cpu_irq'], 'IRQ', stack=True)
+		spec.AREA('idle', config['color_cpu_idle'], 'Idle\\c', stack=True)
+		spec.COMMENT(config['last_update'])
+		openmediavault.mkrrdgraph.render_graph(spec)
 		return 0
@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
 	def create_graph(self, config):
@@ -38,33 +37,32 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			if mountpoint == '/':
 				mountpoint = 'root'
 			config['mountpoint'] = mountpoint.lstrip('/').replace('/', '-')
-			args = []
-			args.append('{image_dir}/df-{mountpoint}-{period}.png'.format(**config))
-			args.extend(config['defaults'])
-			args.extend(['--start', config['start']])
-			args.extend(['--title', '"{title_df}{title_by_period}"'.format(**config)])
-			args.append('--slope-mode')
-			args.extend(['--lower-limit', '0'])
-			args.extend(['--vertical-label', 'Bytes'])
-			args.append('DEF:favg={data_dir}/df-{mountpoint}/df_complex-free.rrd:value:AVERAGE'.format(**config))
-			args.append('DEF:fmin={data_dir}/df-{mountpoint}/df_complex-free.rrd:value:MIN'.format(**config))
-			args.append('DEF:fmax={data_dir}/df-{mountpoint}/df_complex-free.rrd:value:MAX'.format(**config))
-			args.append('DEF:uavg={data_dir}/df-{mountpoint}/df_complex-used.rrd:value:AVERAGE'.format(**config))
-			args.append('DEF:umin={data_dir}/df-{mountpoint}/df_complex-used.rrd:value:MIN'.format(**config))
-			args.append('DEF:umax={data_dir}/df-{mountpoint}/df_complex-used.rrd:value:MAX'.format(**config))
-			args.append('CDEF:sum=favg,uavg,+')
-			args.append('AREA:sum{color_area_df_free}'.format(**config))
-			args.append('AREA:uavg{color_area_df_used}'.format(**config))
-			args.append('LINE1:sum{color_line_df_free}:"Free"'.format(**config))
-			args.append('GPRINT:fmin:MIN:"%5.1lf%sB Min"')
-			args.append('GPRINT:favg:AVERAGE:"%5.1lf%sB Avg"')
-			args.append('GPRINT:fmax:MAX:"%5.1lf%sB Max"')
-			args.append('GPRINT:favg:LAST:"%5.1lf%sB Last\l"')
-			args.append('LINE1:uavg{color_line_df_used}:"Used"'.format(**config))
-			args.append('GPRINT:umin:MIN:"%5.1lf%sB Min"')
-			args.append('GPRINT:uavg:AVERAGE:"%5.1lf%sB Avg"')
-			args.append('GPRINT:umax:MAX:"%5.1lf%sB Max"')
-			args.append('GPRINT:uavg:LAST:"%5.1lf%sB Last\l"')
-			args.append('COMMENT:"{last_update}"'.format(**config))
-			openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+			spec = openmediavault.mkrrdgraph.GraphSpec(
+				'{image_dir}/df-{mountpoint}-{period}.png'.format(**config), config['defaults'])
+			spec.option('--start', config['start'])
+			spec.option('--title', '{title_df}{title_by_period}'.format(**config))
+			spec.option('--slope-mode')
+			spec.option('--lower-limit', '0')
+			spec.option('--vertical-label', 'Bytes')
+			spec.DEF('favg', '{data_dir}/df-{mountpoint}/df_complex-free.rrd'.format(**config), 'value', 'AVERAGE')
+			spec.DEF('fmin', '{data_dir}/df-{mountpoint}/df_complex-free.rrd'.format(**config), 'value', 'MIN')
+			spec.DEF('fmax', '{data_dir}/df-{mountpoint}/df_complex-free.rrd'.format(**config), 'value', 'MAX')
+			spec.DEF('uavg', '{data_dir}/df-{mountpoint}/df_complex-used.rrd'.format(**config), 'value', 'AVERAGE')
+			spec.DEF('umin', '{data_dir}/df-{mountpoint}/df_complex-used.rrd'.format(**config), 'value', 'MIN')
+			spec.DEF('umax', '{data_dir}/df-{mountpoint}/df_complex-used.rrd'.format(**config), 'value', 'MAX')
+			spec.CDEF('sum', 'favg,uavg,+')
+			spec.AREA('sum', config['color_area_df_free'])
+			spec.AREA('uavg', config['color_area_df_used'])
+			spec.LINE('sum', config['color_line_df_free'], 'Free')
+			spec.GPRINT('fmin', '%5.1lf%sB Min', 'MIN')
+			spec.GPRINT('favg', '%5.1lf%sB Avg', 'AVERAGE')
+			spec.GPRINT('fmax', '%5.1lf%sB Max', 'MAX')
+			spec.GPRINT('favg', '%5.1lf%sB Last\\l', 'LAST')
+			spec.LINE('uavg', config['color_line_df_used'], 'Used')
+			spec.GPRINT('umin', '%5.1lf%sB Min', 'MIN')
+			spec.GPRINT('uavg', '%5.1lf%sB Avg', 'AVERAGE')
+			spec.GPRINT('umax', '%5.1lf%sB Max', 'MAX')
+			spec.GPRINT('uavg', '%5.1lf%sB Last\\l', 'LAST')
+			spec.COMMENT(config['last_update'])
+			openmediavault.mkrrdgraph.render_graph(spec)
 		return 0
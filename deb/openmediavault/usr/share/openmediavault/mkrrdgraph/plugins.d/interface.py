@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
 	def create_graph(self, config):
@@ -33,45 +32,44 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			'interface', 'Interface')
 		for interface in interfaces:
 			config['interface'] = interface
-			args = []
-			args.append('{image_dir}/interface-{interface}-{period}.png'.format(**config))
-			args.extend(config['defaults'])
-			args.extend(['--start', config['start']])
-			args.extend(['--title', '"{interface} traffic{title_by_period}"'.format(**config)])
-			args.append('--slope-mode')
-			args.extend(['--lower-limit', '0'])
-			args.extend(['--vertical-label', 'Bits/s'])
-			args.append('DEF:oavgraw={data_dir}/interface-{interface}/if_octets.rrd:tx:AVERAGE'.format(**config))
-			args.append('DEF:ominraw={data_dir}/interface-{interface}/if_octets.rrd:tx:MIN'.format(**config))
-			args.append('DEF:omaxraw={data_dir}/interface-{interface}/if_octets.rrd:tx:MAX'.format(**config))
-			args.append('DEF:iavgraw={data_dir}/interface-{interface}/if_octets.rrd:rx:AVERAGE'.format(**config))
-			args.append('DEF:iminraw={data_dir}/interface-{interface}/if_octets.rrd:rx:MIN'.format(**config))
-			args.append('DEF:imaxraw={data_dir}/interface-{interface}/if_octets.rrd:rx:MAX'.format(**config))
-			args.append('CDEF:oavg=oavgraw,8,*')
-			args.append('CDEF:omin=ominraw,8,*')
-			args.append('CDEF:omax=omaxraw,8,*')
-			args.append('VDEF:otot=oavg,TOTAL')
-			args.append('CDEF:iavg=iavgraw,8,*')
-			args.append('CDEF:imin=iminraw,8,*')
-			args.append('CDEF:imax=imaxraw,8,*')
-			args.append('VDEF:itot=iavg,TOTAL')
-			args.append('CDEF:tavg=oavg,iavg,+')
-			args.append('CDEF:tmin=omin,imin,+')
-			args.append('CDEF:tmax=omax,imax,+')
-			args.append('LINE1:oavg{color_interface_outgoing}:"Outgoing"'.format(**config))
-			args.append('GPRINT:oavg:AVERAGE:"%5.1lf%s Avg"')
-			args.append('GPRINT:omax:MAX:"%5.1lf%s Max"')
-			args.append('GPRINT:oavg:LAST:"%5.1lf%s Last"')
-			args.append('GPRINT:otot:"%5.1lf%s Total\l"')
-			args.append('LINE1:iavg{color_interface_incoming}:"Incoming"'.format(**config))
-			args.append('GPRINT:iavg:AVERAGE:"%5.1lf%s Avg"')
-			args.append('GPRINT:imax:MAX:"%5.1lf%s Max"')
-			args.append('GPRINT:iavg:LAST:"%5.1lf%s Last"')
-			args.append('GPRINT:itot:"%5.1lf%s Total\l"')
-			args.append('COMMENT:"  Total   "')
-			args.append('GPRINT:tavg:AVERAGE:"%5.1lf%s Avg"')
-			args.append('GPRINT:tmax:MAX:"%5.1lf%s Max"')
-			args.append('GPRINT:tavg:LAST:"%5.1lf%s Last\l"')
-			args.append('COMMENT:"{last_update}"'.format(**config))
-			openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+			spec = openmediavault.mkrrdgraph.GraphSpec(
+				'{image_dir}/interface-{interface}-{period}.png'.format(**config), config['defaults'])
+			spec.option('--start', config['start'])
+			spec.option('--title', '{interface} traffic{title_by_period}'.format(**config))
+			spec.option('--slope-mode')
+			spec.option('--lower-limit', '0')
+			spec.option('--vertical-label', 'Bits/s')
+			spec.DEF('oavgraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'tx', 'AVERAGE')
+			spec.DEF('ominraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'tx', 'MIN')
+			spec.DEF('omaxraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'tx', 'MAX')
+			spec.DEF('iavgraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'rx', 'AVERAGE')
+			spec.DEF('iminraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'rx', 'MIN')
+			spec.DEF('imaxraw', '{data_dir}/interface-{interface}/if_octets.rrd'.format(**config), 'rx', 'MAX')
+			spec.CDEF('oavg', 'oavgraw,8,*')
+			spec.CDEF('omin', 'ominraw,8,*')
+			spec.CDEF('omax', 'omaxraw,8,*')
+			spec.VDEF('otot', 'oavg,TOTAL')
+			spec.CDEF('iavg', 'iavgraw,8,*')
+			spec.CDEF('imin', 'iminraw,8,*')
+			spec.CDEF('imax', 'imaxraw,8,*')
+			spec.VDEF('itot', 'iavg,TOTAL')
+			spec.CDEF('tavg', 'oavg,iavg,+')
+			spec.CDEF('tmin', 'omin,imin,+')
+			spec.CDEF('tmax', 'omax,imax,+')
+			spec.LINE('oavg', config['color_interface_outgoing'], 'Outgoing')
+			spec.GPRINT('oavg', '%5.1lf%s Avg', 'AVERAGE')
+			spec.GPRINT('omax', '%5.1lf%s Max', 'MAX')
+			spec.GPRINT('oavg', '%5.1lf%s Last', 'LAST')
+			spec.GPRINT('otot', '%5.1lf%s Total\\l')
+			spec.LINE('iavg', config['color_interface_incoming'], 'Incoming')
+			spec.GPRINT('iavg', '%5.1lf%s Avg', 'AVERAGE')
+			spec.GPRINT('imax', '%5.1lf%s Max', 'MAX')
+			spec.GPRINT('iavg', '%5.1lf%s Last', 'LAST')
+			spec.GPRINT('itot', '%5.1lf%s Total\\l')
+			spec.COMMENT('  Total   ')
+			spec.GPRINT('tavg', '%5.1lf%s Avg', 'AVERAGE')
+			spec.GPRINT('tmax', '%5.1lf%s Max', 'MAX')
+			spec.GPRINT('tavg', '%5.1lf%s Last\\l', 'LAST')
+			spec.COMMENT(config['last_update'])
+			openmediavault.mkrrdgraph.render_graph(spec)
 		return 0
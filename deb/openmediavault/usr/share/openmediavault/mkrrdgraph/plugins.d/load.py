@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
 	def create_graph(self, config):
@@ -30,38 +29,37 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			'color_load_midterm': '#0bb6ff',   # blue
 			'color_load_longterm': '#ff1300'   # red
 		})
-		args = []
-		args.append('{image_dir}/load-{period}.png'.format(**config))
-		args.extend(config['defaults'])
-		args.extend(['--start', config['start']])
-		args.extend(['--title', '"{title_load}{title_by_period}"'.format(**config)])
-		args.append('--slope-mode')
-		args.extend(['--lower-limit', '0'])
-		args.extend(['--units-exponent', '0'])
-		args.append('DEF:savg={data_dir}/load/load.rrd:shortterm:AVERAGE'.format(**config))
-		args.append('DEF:smin={data_dir}/load/load.rrd:shortterm:MIN'.format(**config))
-		args.append('DEF:smax={data_dir}/load/load.rrd:shortterm:MAX'.format(**config))
-		args.append('DEF:mavg={data_dir}/load/load.rrd:midterm:AVERAGE'.format(**config))
-		args.append('DEF:mmin={data_dir}/load/load.rrd:midterm:MIN'.format(**config))
-		args.append('DEF:mmax={data_dir}/load/load.rrd:midterm:MAX'.format(**config))
-		args.append('DEF:lavg={data_dir}/load/load.rrd:longterm:AVERAGE'.format(**config))
-		args.append('DEF:lmin={data_dir}/load/load.rrd:longterm:MIN'.format(**config))
-		args.append('DEF:lmax={data_dir}/load/load.rrd:longterm:MAX'.format(**config))
-		args.append('LINE1:savg{color_load_shortterm}:" 1 min"'.format(**config))
-		args.append('GPRINT:smin:MIN:"%4.2lf Min"')
-		args.append('GPRINT:savg:AVERAGE:"%4.2lf Avg"')
-		args.append('GPRINT:smax:MAX:"%4.2lf Max"')
-		args.append('GPRINT:savg:LAST:"%4.2lf Last\l"')
-		args.append('LINE1:mavg{color_load_midterm}:" 5 min"'.format(**config))
-		args.append('GPRINT:mmin:MIN:"%4.2lf Min"')
-		args.append('GPRINT:mavg:AVERAGE:"%4.2lf Avg"')
-		args.append('GPRINT:mmax:MAX:"%4.2lf Max"')
-		args.append('GPRINT:mavg:LAST:"%4.2lf Last\l"')
-		args.append('LINE1:lavg{color_load_longterm}:"15 min"'.format(**config))
-		args.append('GPRINT:lmin:MIN:"%4.2lf Min"')
-		args.append('GPRINT:lavg:AVERAGE:"%4.2lf Avg"')
-		args.append('GPRINT:lmax:MAX:"%4.2lf Max"')
-		args.append('GPRINT:lavg:LAST:"%4.2lf Last\l"')
-		args.append('COMMENT:"{last_update}"'.format(**config))
-		openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			'{image_dir}/load-{period}.png'.format(**config), config['defaults'])
+		spec.option('--start', config['start'])
+		spec.option('--title', '{title_load}{title_by_period}'.format(**config))
+		spec.option('--slope-mode')
+		spec.option('--lower-limit', '0')
+		spec.option('--units-exponent', '0')
+		spec.DEF('savg', '{data_dir}/load/load.rrd'.format(**config), 'shortterm', 'AVERAGE')
+		spec.DEF('smin', '{data_dir}/load/load.rrd'.format(**config), 'shortterm', 'MIN')
+		spec.DEF('smax', '{data_dir}/load/load.rrd'.format(**config), 'shortterm', 'MAX')
+		spec.DEF('mavg', '{data_dir}/load/load.rrd'.format(**config), 'midterm', 'AVERAGE')
+		spec.DEF('mmin', '{data_dir}/load/load.rrd'.format(**config), 'midterm', 'MIN')
+		spec.DEF('mmax', '{data_dir}/load/load.rrd'.format(**config), 'midterm', 'MAX')
+		spec.DEF('lavg', '{data_dir}/load/load.rrd'.format(**config), 'longterm', 'AVERAGE')
+		spec.DEF('lmin', '{data_dir}/load/load.rrd'.format(**config), 'longterm', 'MIN')
+		spec.DEF('lmax', '{data_dir}/load/load.rrd'.format(**config), 'longterm', 'MAX')
+		spec.LINE('savg', config['color_load_shortterm'], ' 1 min')
+		spec.GPRINT('smin', '%4.2lf Min', 'MIN')
+		spec.GPRINT('savg', '%4.2lf Avg', 'AVERAGE')
+		spec.GPRINT('smax', '%4.2lf Max', 'MAX')
+		spec.GPRINT('savg', '%4.2lf Last\\l', 'LAST')
+		spec.LINE('mavg', config['color_load_midterm'], ' 5 min')
+		spec.GPRINT('mmin', '%4.2lf Min', 'MIN')
+		spec.GPRINT('mavg', '%4.2lf Avg', 'AVERAGE')
+		spec.GPRINT('mmax', '%4.2lf Max', 'MAX')
+		spec.GPRINT('mavg', '%4.2lf Last\\l', 'LAST')
+		spec.LINE('lavg', config['color_load_longterm'], '15 min')
+		spec.GPRINT('lmin', '%4.2lf Min', 'MIN')
+		spec.GPRINT('lavg', '%4.2lf Avg', 'AVERAGE')
+		spec.GPRINT('lmax', '%4.2lf Max', 'MAX')
+		spec.GPRINT('lavg', '%4.2lf Last\\l', 'LAST')
+		spec.COMMENT(config['last_update'])
+		openmediavault.mkrrdgraph.render_graph(spec)
 		return 0
@@ -19,7 +19,6 @@
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
 import openmediavault.mkrrdgraph
-import openmediavault.subprocess
 
 class Plugin(openmediavault.mkrrdgraph.IPlugin):
 	def create_graph(self, config):
@@ -31,47 +30,46 @@ class Plugin(openmediavault.mkrrdgraph.IPlugin):
 			'color_memory_buffered': '#c979ff', # pink
 			'color_memory_used': '#ff7a70'      # red
 		})
-		args = []
-		args.append('{image_dir}/memory-{period}.png'.format(**config))
-		args.extend(config['defaults'])
-		args.extend(['--start', config['start']])
-		args.extend(['--title', '"{title_memory}{title_by_period}"'.format(**config)])
-		args.append('--slope-mode')
-		args.extend(['--lower-limit', '0'])
-		args.extend(['--base', '1024'])
-		args.extend(['--vertical-label', 'Bytes'])
-		args.append('DEF:bavg={data_dir}/memory/memory-buffered.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:bmin={data_dir}/memory/memory-buffered.rrd:value:MIN'.format(**config))
-		args.append('DEF:bmax={data_dir}/memory/memory-buffered.rrd:value:MAX'.format(**config))
-		args.append('DEF:cavg={data_dir}/memory/memory-cached.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:cmin={data_dir}/memory/memory-cached.rrd:value:MIN'.format(**config))
-		args.append('DEF:cmax={data_dir}/memory/memory-cached.rrd:value:MAX'.format(**config))
-		args.append('DEF:favg={data_dir}/memory/memory-free.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:fmin={data_dir}/memory/memory-free.rrd:value:MIN'.format(**config))
-		args.append('DEF:fmax={data_dir}/memory/memory-free.rrd:value:MAX'.format(**config))
-		args.append('DEF:uavg={data_dir}/memory/memory-used.rrd:value:AVERAGE'.format(**config))
-		args.append('DEF:umin={data_dir}/memory/memory-used.rrd:value:MIN'.format(**config))
-		args.append('DEF:umax={data_dir}/memory/memory-used.rrd:value:MAX'.format(**config))
-		args.append('AREA:uavg{color_memory_used}:"Used        "'.format(**config))
-		args.append('GPRINT:umin:MIN:"%5.1lf%sB Min"')
-		args.append('GPRINT:uavg:AVERAGE:"%5.1lf%sB Avg"')
-		args.append('GPRINT:umax:MAX:"%5.1lf%sB Max"')
-		args.append('GPRINT:uavg:LAST:"%5.1lf%sB Last\l"')
-		args.append('AREA:bavg{color_memory_buffered}:"Buffer cache":STACK'.format(**config))
-		args.append('GPRINT:bmin:MIN:"%5.1lf%sB Min"')
-		args.append('GPRINT:bavg:AVERAGE:"%5.1lf%sB Avg"')
-		args.append('GPRINT:bmax:MAX:"%5.1lf%sB Max"')
-		args.append('GPRINT:bavg:LAST:"%5.1lf%sB Last\l"')
-		args.append('AREA:cavg{color_memory_cached}:"Page cache  ":STACK'.format(**config))
-		args.append('GPRINT:cmin:MIN:"%5.1lf%sB Min"')
-		args.append('GPRINT:cavg:AVERAGE:"%5.1lf%sB Avg"')
-		args.append('GPRINT:cmax:MAX:"%5.1lf%sB Max"')
-		args.append('GPRINT:cavg:LAST:"%5.1lf%sB Last\l"')
-		args.append('AREA:favg{color_memory_free}:"Free        ":STACK'.format(**config))
-		args.append('GPRINT:fmin:MIN:"%5.1lf%sB Min"')
-		args.append('GPRINT:favg:AVERAGE:"%5.1lf%sB Avg"')
-		args.append('GPRINT:fmax:MAX:"%5.1lf%sB Max"')
-		args.append('GPRINT:favg:LAST:"%5.1lf%sB Last\l"')
-		args.append('COMMENT:"{last_update}"'.format(**config))
-		openmediavault.mkrrdgraph.call_rrdtool_graph(args)
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			'{image_dir}/memory-{period}.png'.format(**config), config['defaults'])
+		spec.option('--start', config['start'])
+		spec.option('--title', '{title_memory}{title_by_period}'.format(**config))
+		spec.option('--slope-mode')
+		spec.option('--lower-limit', '0')
+		spec.option('--base', '1024')
+		spec.option('--vertical-label', 'Bytes')
+		spec.DEF('bavg', '{data_dir}/memory/memory-buffered.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('bmin', '{data_dir}/memory/memory-buffered.rrd'.format(**config), 'value', 'MIN')
+		spec.DEF('bmax', '{data_dir}/memory/memory-buffered.rrd'.format(**config), 'value', 'MAX')
+		spec.DEF('cavg', '{data_dir}/memory/memory-cached.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('cmin', '{data_dir}/memory/memory-cached.rrd'.format(**config), 'value', 'MIN')
+		spec.DEF('cmax', '{data_dir}/memory/memory-cached.rrd'.format(**config), 'value', 'MAX')
+		spec.DEF('favg', '{data_dir}/memory/memory-free.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('fmin', '{data_dir}/memory/memory-free.rrd'.format(**config), 'value', 'MIN')
+		spec.DEF('fmax', '{data_dir}/memory/memory-free.rrd'.format(**config), 'value', 'MAX')
+		spec.DEF('uavg', '{data_dir}/memory/memory-used.rrd'.format(**config), 'value', 'AVERAGE')
+		spec.DEF('umin', '{data_dir}/memory/memory-used.rrd'.format(**config), 'value', 'MIN')
+		spec.DEF('umax', '{data_dir}/memory/memory-used.rrd'.format(**config), 'value', 'MAX')
+		spec.AREA('uavg', config['color_memory_used'], 'Used        ')
+		spec.GPRINT('umin', '%5.1lf%sB Min', 'MIN')
+		spec.GPRINT('uavg', '%5.1lf%sB Avg', 'AVERAGE')
+		spec.GPRINT('umax', '%5.1lf%sB Max', 'MAX')
+		spec.GPRINT('uavg', '%5.1lf%sB Last\\l', 'LAST')
+		spec.AREA('bavg', config['color_memory_buffered'], 'Buffer cache', stack=True)
+		spec.GPRINT('bmin', '%5.1lf%sB Min', 'MIN')
+		spec.GPRINT('bavg', '%5.1lf%sB Avg', 'AVERAGE')
+		spec.GPRINT('bmax', '%5.1lf%sB Max', 'MAX')
+		spec.GPRINT('bavg', '%5.1lf%sB Last\\l', 'LAST')
+		spec.AREA('cavg', config['color_memory_cached'], 'Page cache  ', stack=True)
+		spec.GPRINT('cmin', '%5.1lf%sB Min', 'MIN')
+		spec.GPRINT('cavg', '%5.1lf%sB Avg', 'AVERAGE')
+		spec.GPRINT('cmax', '%5.1lf%sB Max', 'MAX')
+		spec.GPRINT('cavg', '%5.1lf%sB Last\\l', 'LAST')
+		spec.AREA('favg', config['color_memory_free'], 'Free        ', stack=True)
+		spec.GPRINT('fmin', '%5.1lf%sB Min', 'MIN')
+		spec.GPRINT('favg', '%5.1lf%sB Avg', 'AVERAGE')
+		spec.GPRINT('fmax', '%5.1lf%sB Max', 'MAX')
+		spec.GPRINT('favg', '%5.1lf%sB Last\\l', 'LAST')
+		spec.COMMENT(config['last_update'])
+		openmediavault.mkrrdgraph.render_graph(spec)
 		return 0
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import timeit
+import openmediavault.collections
+
+NUM_RUNS = 100000
+
+def create_dict():
+	return openmediavault.collections.DotDict({
+		"enable": True,
+		"name": "share01",
+		"privileges": {
+			"privilege": [{
+				"type": "user",
+				"name": "test",
+				"perms": 7
+			}]
+		}
+	})
+
+def run(name, func):
+	duration = timeit.timeit(func, number=NUM_RUNS)
+	print("%-28s %10.0f ops/s" % (name, NUM_RUNS / duration))
+
+def main():
+	d = create_dict()
+	# A builtin dictionary as reference.
+	ref = dict(d)
+	run("dict get", lambda: ref["name"])
+	run("get (plain)", lambda: d["name"])
+	run("get (dotted)", lambda: d["privileges.privilege.0.name"])
+	run("get (indexed)", lambda: d["privileges.privilege[0].name"])
+	run("get (attribute)", lambda: d.privileges.privilege[0].name)
+	run("dict set", lambda: ref.__setitem__("name", "share02"))
+	run("set (plain)", lambda: d.__setitem__("name", "share02"))
+	run("set (dotted)", lambda: d.__setitem__(
+		"privileges.privilege.0.name", "test2"))
+	run("set (indexed)", lambda: d.__setitem__(
+		"privileges.privilege[0].name", "test2"))
+	run("dict contains", lambda: "name" in ref)
+	run("contains (plain)", lambda: "name" in d)
+	run("contains (dotted)", lambda: "privileges.privilege" in d)
+	run("contains (missing)", lambda: "privileges.foo" in d)
+	run("create", create_dict)
+
+if __name__ == "__main__":
+	main()
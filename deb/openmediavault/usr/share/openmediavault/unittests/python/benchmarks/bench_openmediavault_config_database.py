@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import tempfile
+import timeit
+import uuid
+import lxml.etree
+import openmediavault
+import openmediavault.config
+
+NUM_SHARES = 5000
+NUM_RUNS = 20
+
+def create_config_database():
+	"""
+	Create a synthetic configuration database based on the unit test
+	database that contains NUM_SHARES shared folders.
+	:returns: Returns a tuple of the file path and the list of share UUIDs.
+	"""
+	config_file = "%s/../../data/config.xml" % os.path.dirname(
+		os.path.abspath(__file__))
+	tree = lxml.etree.parse(config_file)
+	shares = tree.find("system/shares")
+	uuids = []
+	for i in range(NUM_SHARES):
+		share_uuid = str(uuid.uuid4())
+		uuids.append(share_uuid)
+		element = lxml.etree.SubElement(shares, "sharedfolder")
+		for tag, text in [ ("uuid", share_uuid), ("name", "share%d" % i),
+				("comment", ""), ("mntentref", str(uuid.uuid4())),
+				("reldirpath", "share%d/" % i) ]:
+			lxml.etree.SubElement(element, tag).text = text
+		lxml.etree.SubElement(element, "privileges")
+	(fh, tmp_config_file) = tempfile.mkstemp()
+	os.close(fh)
+	tree.write(tmp_config_file, pretty_print=True, xml_declaration=True,
+		encoding="UTF-8")
+	return (tmp_config_file, uuids)
+
+def run(name, func):
+	for enabled in [ False, True ]:
+		openmediavault.config.DatabaseCache.enabled = enabled
+		openmediavault.config.DatabaseCache.invalidate()
+		duration = timeit.timeit(func, number=NUM_RUNS)
+		print("%-16s cache=%-5s %8.2f ms/call" % (name, enabled,
+			duration * 1000 / NUM_RUNS))
+
+def main():
+	(config_file, uuids) = create_config_database()
+	openmediavault.setenv("OMV_CONFIG_FILE", config_file)
+	print("Config file size: %d KiB, %d shared folders" % (
+		os.path.getsize(config_file) / 1024, NUM_SHARES))
+	db = openmediavault.config.Database()
+	share_uuid = uuids[NUM_SHARES // 2]
+	try:
+		run("get", lambda: db.get("conf.system.sharedfolder", share_uuid))
+		run("get_by_filter", lambda: db.get_by_filter(
+			"conf.system.sharedfolder",
+			openmediavault.config.DatabaseFilter({
+				'operator': 'stringEquals',
+				'arg0': 'name',
+				'arg1': 'share42'
+			})))
+		run("get (single)", lambda: db.get("conf.system.time"))
+	finally:
+		os.unlink(config_file)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import timeit
+import uuid
+import lxml.etree
+import openmediavault
+import openmediavault.config
+
+NUM_SHARES = 2000
+NUM_RUNS = 20
+
+def create_shares():
+	"""
+	Create a list of NUM_SHARES shared folder elements, each with a
+	couple of privileges.
+	:returns: Returns the list of XML elements.
+	"""
+	elements = []
+	for i in range(NUM_SHARES):
+		element = lxml.etree.Element("sharedfolder")
+		for tag, text in [ ("uuid", str(uuid.uuid4())),
+				("name", "share%d" % i), ("comment", ""),
+				("mntentref", str(uuid.uuid4())),
+				("reldirpath", "share%d/" % i) ]:
+			lxml.etree.SubElement(element, tag).text = text
+		privileges = lxml.etree.SubElement(element, "privileges")
+		for perms in [ "5", "7" ]:
+			privilege = lxml.etree.SubElement(privileges, "privilege")
+			for tag, text in [ ("type", "user"), ("name", "user%d" % i),
+					("perms", perms) ]:
+				lxml.etree.SubElement(privilege, tag).text = text
+		elements.append(element)
+	return elements
+
+def reset_model(query):
+	# Drop the property names cached by the data model to simulate
+	# the schema walk that was done for every query.
+	query.model._list_properties = None
+	query.model._dict_properties = None
+
+def main():
+	openmediavault.setenv("OMV_CONFIG_FILE", "%s/../../data/config.xml" %
+		os.path.dirname(os.path.abspath(__file__)))
+	elements = create_shares()
+	print("%d shared folder elements" % NUM_SHARES)
+	query = openmediavault.config.DatabaseGetQuery(
+		"conf.system.sharedfolder")
+	# Measure the query setup with and without the cached property names.
+	def setup_uncached():
+		reset_model(query)
+		query._parse_model()
+	duration = timeit.timeit(setup_uncached, number=NUM_RUNS * 100)
+	print("%-24s %8.3f ms/call" % ("parse model (uncached)",
+		duration * 1000 / (NUM_RUNS * 100)))
+	duration = timeit.timeit(query._parse_model, number=NUM_RUNS * 100)
+	print("%-24s %8.3f ms/call" % ("parse model (cached)",
+		duration * 1000 / (NUM_RUNS * 100)))
+	# Measure the per-element conversion with list and frozenset lookups.
+	for name, factory in [ ("list", list), ("frozenset", frozenset) ]:
+		query._force_list_tags = factory(query.model.list_properties)
+		query._force_dict_tags = factory(query.model.dict_properties)
+		duration = timeit.timeit(lambda: [ query._element_to_dict(element)
+			for element in elements ], number=NUM_RUNS)
+		print("%-24s %8.2f ms/call" % ("convert (%s)" % name,
+			duration * 1000 / NUM_RUNS))
+	# Measure the object hydration when reading a single property and
+	# when all objects are materialized.
+	def hydrate(materialize):
+		for obj in query._elements_to_object(elements):
+			obj.get("name")
+			if materialize:
+				obj.get_dict()
+	for name, materialize in [ ("lazy", False), ("materialized", True) ]:
+		duration = timeit.timeit(lambda: hydrate(materialize), number=1)
+		print("%-24s %8.2f ms/call" % ("hydrate (%s)" % name,
+			duration * 1000))
+
+if __name__ == "__main__":
+	main()
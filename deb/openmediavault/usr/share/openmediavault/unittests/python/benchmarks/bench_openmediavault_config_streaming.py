@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import resource
+import tempfile
+import timeit
+import uuid
+import lxml.etree
+import openmediavault
+import openmediavault.config
+
+NUM_SHARES = 5000
+NUM_RUNS = 20
+
+def create_config_database():
+	"""
+	Create a synthetic configuration database based on the unit test
+	database that contains NUM_SHARES FTP shares, thus the services
+	section is much bigger than the system section.
+	:returns: Returns the file path.
+	"""
+	config_file = "%s/../../data/config.xml" % os.path.dirname(
+		os.path.abspath(__file__))
+	tree = lxml.etree.parse(config_file)
+	shares = tree.find("services/ftp/shares")
+	for i in range(NUM_SHARES):
+		element = lxml.etree.SubElement(shares, "share")
+		for tag, text in [ ("uuid", str(uuid.uuid4())),
+				("sharedfolderref", str(uuid.uuid4())),
+				("comment", "share%d" % i), ("extraoptions", "") ]:
+			lxml.etree.SubElement(element, tag).text = text
+	(fh, tmp_config_file) = tempfile.mkstemp()
+	os.close(fh)
+	tree.write(tmp_config_file, pretty_print=True, xml_declaration=True,
+		encoding="UTF-8")
+	return tmp_config_file
+
+def run(name, func):
+	openmediavault.config.DatabaseCache.enabled = False
+	for streaming in [ False, True ]:
+		db = openmediavault.config.Database(streaming=streaming)
+		duration = timeit.timeit(lambda: func(db), number=NUM_RUNS)
+		print("%-16s streaming=%-5s %8.2f ms/call" % (name, streaming,
+			duration * 1000 / NUM_RUNS))
+
+def main():
+	config_file = create_config_database()
+	openmediavault.setenv("OMV_CONFIG_FILE", config_file)
+	print("Config file size: %d KiB, %d FTP shares" % (
+		os.path.getsize(config_file) / 1024, NUM_SHARES))
+	try:
+		run("get (system)", lambda db: db.get("conf.system.time"))
+		run("get (service)", lambda db: db.get("conf.service.ssh"))
+		run("get (ftp share)", lambda db: db.get_by_filter(
+			"conf.service.ftp.share",
+			openmediavault.config.DatabaseFilter({
+				'operator': 'stringEquals',
+				'arg0': 'comment',
+				'arg1': 'share42'
+			})))
+		print("Max. RSS: %d KiB" % resource.getrusage(
+			resource.RUSAGE_SELF).ru_maxrss)
+	finally:
+		os.unlink(config_file)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import timeit
+import openmediavault.mkrrdgraph
+
+# The number of RRD files, e.g. the number of disks of a NAS.
+NUM_SOURCES = 20
+PERIODS = [ ("hour", "-1h"), ("day", "-1d"), ("week", "-1w"),
+	("month", "-1m"), ("year", "-1y") ]
+NUM_RUNS = 3
+
+def create_fixtures(data_dir):
+	"""
+	Create NUM_SOURCES RRD files containing one day of data at a
+	resolution of one minute.
+	"""
+	now = int(time.time())
+	for i in range(NUM_SOURCES):
+		filename = os.path.join(data_dir, "load-%d.rrd" % i)
+		subprocess.check_call([ "rrdtool", "create", filename,
+			"--start", str(now - 86400), "--step", "60",
+			"DS:shortterm:GAUGE:120:0:U", "DS:midterm:GAUGE:120:0:U",
+			"RRA:AVERAGE:0.5:1:1440", "RRA:MIN:0.5:1:1440",
+			"RRA:MAX:0.5:1:1440", "RRA:AVERAGE:0.5:60:8760" ])
+		values = [ "%d:%f:%f" % (t, 1 + math.sin(t / 600 + i),
+			1 + math.cos(t / 3600 + i)) for t in range(now - 86340, now, 60) ]
+		subprocess.check_call([ "rrdtool", "update", filename, *values ])
+
+def create_jobs(data_dir, image_dir):
+	jobs = []
+	for i in range(NUM_SOURCES):
+		rrd = os.path.join(data_dir, "load-%d.rrd" % i)
+		for period, start in PERIODS:
+			spec = openmediavault.mkrrdgraph.GraphSpec(os.path.join(
+				image_dir, "load-%d-%s.png" % (i, period)), [
+				"--imgformat", "PNG", "--width", "400", "--height", "120",
+				"--start", start, "--title", "Load average - by %s" % period,
+				"--slope-mode", "--lower-limit", "0" ])
+			for ds in [ "shortterm", "midterm" ]:
+				for cf in [ "AVERAGE", "MIN", "MAX" ]:
+					spec.DEF("%s%s" % (ds[0], cf.lower()), rrd, ds, cf)
+			spec.LINE("saverage", "#0000fd", "Short")
+			spec.GPRINT("smin", "%4.2lf Min", "MIN")
+			spec.GPRINT("saverage", "%4.2lf Avg", "AVERAGE")
+			spec.GPRINT("smax", "%4.2lf Max\\l", "MAX")
+			spec.LINE("maverage", "#fd0000", "Mid")
+			spec.GPRINT("maverage", "%4.2lf Last\\l", "LAST")
+			spec.COMMENT("Last update\\: %s\\r" % time.ctime().replace(
+				":", "\\:"))
+			jobs.append(spec)
+	return jobs
+
+def run(name, engine, jobs, max_workers):
+	def render():
+		failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs,
+			max_workers, engine)
+		assert not failed, failed
+	duration = timeit.timeit(render, number=NUM_RUNS) / NUM_RUNS
+	print("%-28s %10.1f graphs/s" % (name, len(jobs) / duration))
+
+def main():
+	if shutil.which("rrdtool") is None:
+		print("rrdtool is not installed, skipping")
+		return
+	with tempfile.TemporaryDirectory() as tmpdir:
+		create_fixtures(tmpdir)
+		jobs = create_jobs(tmpdir, tmpdir)
+		# Compare the engines with a single job and with as many jobs
+		# as omv-mkrrdgraph is run with by cron, i.e. one per CPU. The
+		# module engine serializes the commands, thus it does not
+		# benefit from several jobs.
+		for max_workers in [ 1, max(os.cpu_count() or 1, 2) ]:
+			for name in [ "subprocess", "pipe", "module", "auto" ]:
+				try:
+					engine = openmediavault.mkrrdgraph.get_graph_engine(
+						name, max_workers)
+				except ImportError:
+					print("%-28s %10s" % (name, "n/a"))
+					continue
+				if "auto" == name:
+					name = "auto (%s)" % engine.name
+				with engine:
+					run("%s, jobs=%d" % (name, max_workers), engine, jobs,
+						max_workers)
+
+if __name__ == "__main__":
+	main()
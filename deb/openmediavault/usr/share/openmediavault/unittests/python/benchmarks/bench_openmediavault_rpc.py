@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import os
+import sys
+import timeit
+import openmediavault.rpc
+import openmediavault.rpc.aio
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(
+	__file__)), ".."))
+from engined_stub import EnginedStub
+
+NUM_RUNS = 2000
+NUM_BATCH = 10
+# The size of a big response, e.g. a list of disks including their
+# SMART attributes.
+BIG_SIZE = 2 * 1024 * 1024
+# The number of RPCs and the time the daemon needs to process each of
+# them, e.g. when a monitoring agent polls the status of all services.
+NUM_FANOUT = 32
+FANOUT_LATENCY = 0.01
+
+def run(name, func, number=NUM_RUNS, calls=1):
+	duration = timeit.timeit(func, number=number)
+	print("%-28s %10.0f calls/s" % (name, number * calls / duration))
+
+def run_once(name, func):
+	duration = timeit.timeit(func, number=1)
+	print("%-28s %10.1f ms" % (name, duration * 1000))
+
+def run_until_complete(coro):
+	loop = asyncio.new_event_loop()
+	try:
+		return loop.run_until_complete(coro)
+	finally:
+		loop.close()
+
+def main():
+	with EnginedStub() as server:
+		address = server.address
+		def connect_per_call(method, params=None):
+			with openmediavault.rpc.RpcClient(address, 10, 10) as c:
+				return c.call("Test", method, params)
+		client = openmediavault.rpc.RpcClient(address, 10, 10)
+		batch = [ ("Test", "echo", { "i": i }) for i in range(NUM_BATCH) ]
+		run("connect per call", lambda: connect_per_call("echo"))
+		run("persistent", lambda: client.call("Test", "echo", {}))
+		run("persistent call_many", lambda: client.call_many(batch),
+			number=NUM_RUNS // NUM_BATCH, calls=NUM_BATCH)
+		big = { "size": BIG_SIZE }
+		run("big, connect per call", lambda: connect_per_call("big", big),
+			number=20)
+		run("big, persistent", lambda: client.call("Test", "big", big),
+			number=20)
+		# Fan-out latency.
+		calls = [ ("Test", "sleep", { "seconds": FANOUT_LATENCY })
+			] * NUM_FANOUT
+		run_once("fan-out, sequential", lambda: client.call_many(calls))
+		for limit in [ 4, 16 ]:
+			run_once("fan-out, aio limit=%d" % limit,
+				lambda: run_until_complete(
+					openmediavault.rpc.aio.gather_calls(calls, limit=limit,
+						address=address, timeout=10)))
+		client.close()
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+class EnginedStub(threading.Thread):
+	"""
+	A stand-in for omv-engined that speaks the same NUL framed JSON
+	protocol. Every connection is served by its own thread, similar to
+	the child processes forked by the daemon. The following RPCs of the
+	service 'Test' are available:
+	- echo: Returns the request.
+	- big: Returns a string of the size given by the parameter 'size'.
+	- sleep: Waits for the number of seconds given by the parameter
+	  'seconds' and returns the parameters.
+	- crash: Closes the connection without a response, like a child
+	  process that died, as long as 'crashes' is greater than 0.
+	  Returns the request afterwards.
+	- Any other method raises an error.
+	"""
+
+	def __init__(self, keepalive=True):
+		"""
+		:param keepalive:	If False, the connection is closed after a
+			response has been sent. Defaults to True.
+		"""
+		super().__init__(daemon=True)
+		self.keepalive = keepalive
+		self.crashes = 0
+		self.connections = 0
+		self.closed = 0
+		# The methods of the executed requests.
+		self.requests = []
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.address = os.path.join(self._tmpdir.name, "engined.sock")
+		self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self._socket.bind(self.address)
+		self._socket.listen(128)
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, *args):
+		self.stop()
+
+	def stop(self):
+		self._socket.close()
+		self._tmpdir.cleanup()
+
+	def run(self):
+		while True:
+			try:
+				conn, _ = self._socket.accept()
+			except OSError:
+				break
+			self.connections += 1
+			threading.Thread(target=self._serve, args=(conn,),
+				daemon=True).start()
+
+	def _serve(self, conn):
+		try:
+			with conn:
+				buffer = b""
+				while True:
+					data = conn.recv(65536)
+					if not data:
+						return
+					buffer += data
+					while b"\0" in buffer:
+						request, buffer = buffer.split(b"\0", 1)
+						response = self._execute(json.loads(
+							request.decode()))
+						if response is None:
+							return
+						conn.sendall(response.encode() + b"\0")
+						if not self.keepalive:
+							return
+		finally:
+			self.closed += 1
+
+	def _execute(self, request):
+		response = { "response": None, "error": None }
+		self.requests.append(request["method"])
+		if request["method"] == "crash" and 0 < self.crashes:
+			self.crashes -= 1
+			return None
+		if request["method"] in [ "echo", "crash" ]:
+			response["response"] = request
+		elif request["method"] == "big":
+			response["response"] = "x" * request["params"]["size"]
+		elif request["method"] == "sleep":
+			time.sleep(request["params"]["seconds"])
+			response["response"] = request["params"]
+		else:
+			response["error"] = {
+				"code": 5001,
+				"message": "Failed",
+				"trace": "#0 {main}"
+			}
+		return json.dumps(response)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import tempfile
+import unittest
+import openmediavault.collectd
+
+CONFIG = """
+# Generated by omv-mkconf.
+LoadPlugin df
+<Plugin df>
+  MountPoint "/"
+  MountPoint "/srv/dev-disk-by-label-data" # The data disk.
+  IgnoreSelected false
+</Plugin>
+<Plugin "disk">
+  Disk "sda" \\
+    "sdb"
+  Disk /^md/
+</Plugin>
+<LoadPlugin python>
+  Interval 60.5
+</LoadPlugin>
+<Plugin python>
+  <Module "nas">
+    Path "/tmp/\\"x\\""
+    Port 3493
+  </Module>
+</Plugin>
+<Plugin df>
+  MountPoint "/var"
+</Plugin>
+"""
+
+class CollectdTestCase(unittest.TestCase):
+	def test_parse(self):
+		config = openmediavault.collectd.parse(CONFIG)
+		self.assertEqual([ item.key for item in config.children ], [
+			"LoadPlugin", "Plugin", "Plugin", "LoadPlugin", "Plugin",
+			"Plugin" ])
+		self.assertEqual(config.children[0].values, [ "df" ])
+		self.assertEqual(config.find_all("loadplugin")[1].get_values(
+			"Interval"), [ 60.5 ])
+
+	def test_get_plugin_values(self):
+		config = openmediavault.collectd.parse(CONFIG)
+		# The option is repeated and the plugin is configured twice.
+		self.assertEqual(config.get_plugin_values("df", "MountPoint"), [
+			"/", "/srv/dev-disk-by-label-data", "/var" ])
+		self.assertEqual(config.get_plugin_values("DF", "ignoreselected"),
+			[ False ])
+		self.assertEqual(config.get_plugin_values("disk", "Disk"), [
+			"sda", "sdb", "/^md/" ])
+		self.assertEqual(config.get_plugin_values("cpu", "ReportByCpu"), [])
+
+	def test_raw_values(self):
+		config = openmediavault.collectd.parse(
+			"<Plugin nut>\n  UPS \"ups@localhost\" 01 1e3 On\n</Plugin>\n")
+		self.assertEqual(config.get_plugin_values("nut", "UPS"), [
+			"ups@localhost", 1, 1000.0, True ])
+		self.assertEqual(config.get_plugin_values("nut", "UPS", raw=True), [
+			"ups@localhost", "01", "1e3", "On" ])
+
+	def test_nested(self):
+		config = openmediavault.collectd.parse(CONFIG)
+		# Options of nested blocks are not options of the plugin.
+		self.assertEqual(config.get_plugin_values("python", "Port"), [])
+		module = config.get_plugin("python")[0].find_all("Module")[0]
+		self.assertEqual(module.values, [ "nas" ])
+		self.assertEqual(module.get_values("Path"), [ '/tmp/"x"' ])
+		self.assertEqual(module.get_values("Port"), [ 3493 ])
+
+	def test_parse_fail(self):
+		for text in [ "<Plugin df>\n", "</Plugin>\n",
+				"<Plugin df>\n</Module>\n", "MountPoint \"/\n",
+				"<Plugin df\n" ]:
+			self.assertRaises(openmediavault.collectd.ConfigParseError,
+				openmediavault.collectd.parse, text)
+
+	def test_load(self):
+		with tempfile.TemporaryDirectory() as tmpdir:
+			filename = os.path.join(tmpdir, "df.conf")
+			with open(filename, "w") as fd:
+				fd.write(CONFIG)
+			config = openmediavault.collectd.load(filename)
+			# The file is not parsed again.
+			self.assertIs(openmediavault.collectd.load(filename), config)
+			with open(filename, "a") as fd:
+				fd.write("LoadPlugin cpu\n")
+			config = openmediavault.collectd.load(filename)
+			self.assertEqual(config.children[-1].values, [ "cpu" ])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -96,6 +96,26 @@ class DotDictTestCase(unittest.TestCase):
 		d = self._get_dict()
 		self.assertFalse("a.x" in d)
 
+	def test_in_index(self):
+		d = self._get_dict()
+		self.assertTrue("y.z[1]" in d)
+		self.assertTrue("y.z[1].aa" in d)
+		self.assertFalse("y.z[2]" in d)
+		self.assertFalse("y.z[1].xx" in d)
+		self.assertFalse("q[0]" in d)
+
+	def test_in_index_out_of_range(self):
+		d = self._get_dict()
+		self.assertFalse("y.z[5].aa" in d)
+		self.assertFalse("k[5].x" in d)
+
+	def test_get_cached(self):
+		d = self._get_dict()
+		for _ in range(2):
+			self.assertEqual(d['y.z[1].cc'], "33")
+			self.assertEqual(d['y.z.1.cc'], "33")
+		self.assertEqual(d.get('a.b.x', 5), 5)
+
 	def test_set_1(self):
 		d = self._get_dict()
 		d.y.z[0].bb = "bb"
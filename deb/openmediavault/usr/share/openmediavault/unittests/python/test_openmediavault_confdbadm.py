@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import contextlib
+import io
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+import lxml.etree
+import openmediavault
+import openmediavault.confdbadm
+import openmediavault.config
+import openmediavault.plugins
+
+class ToShellTestCase(unittest.TestCase):
+	def test_object(self):
+		self.assertEqual(openmediavault.confdbadm.to_shell({
+			"timezone": "Europe/Berlin",
+			"ntp": { "enable": False, "timeservers": "pool.ntp.org" }
+		}), [
+			"timezone=Europe/Berlin",
+			"ntp_enable=0",
+			"ntp_timeservers=pool.ntp.org"
+		])
+
+	def test_list(self):
+		self.assertEqual(openmediavault.confdbadm.to_shell([
+			{ "uuid": "abc", "extra-options": None },
+			{ "uuid": "def", "extra-options": "" }
+		], "share_"), [
+			"share_count=2",
+			"share_0_uuid=abc",
+			"share_0_extra_options=''",
+			"share_1_uuid=def",
+			"share_1_extra_options=''"
+		])
+
+	def test_list_no_prefix(self):
+		self.assertEqual(openmediavault.confdbadm.to_shell([
+			{ "name": "a" } ], ""), [ "count=1", "_0_name=a" ])
+
+	def test_identifiers(self):
+		data = [ { "name": "a", "1st": [ "x" ], "ä-b": { "c d": 1 } } ]
+		for prefix in [ "", "share_", "1-", "-" ]:
+			for line in openmediavault.confdbadm.to_shell(data, prefix):
+				name = line.split("=", 1)[0]
+				self.assertTrue(name.isidentifier() and all(
+					c < "\x80" for c in name),
+					"%r is no valid shell identifier" % name)
+		# The shell must accept the assignments.
+		script = "\n".join(openmediavault.confdbadm.to_shell(data, "")) + \
+			'\nprintf "%s" "${_0_name}"'
+		self.assertEqual(subprocess.check_output([ "sh", "-c", script ],
+			universal_newlines=True), "a")
+
+	def test_get_shell_prefix(self):
+		self.assertEqual(openmediavault.confdbadm.get_shell_prefix(
+			"conf.service.ssh"), "ssh_")
+		self.assertEqual(openmediavault.confdbadm.get_shell_prefix(
+			"conf.system.sharedfolder"), "sharedfolder_")
+
+	def test_eval_prefix(self):
+		# The variables of the calling script are not overwritten.
+		data = {
+			"enable": True,
+			"port": 22,
+			"extraoptions": "AllowUsers 'root'\nBanner $HOME/x"
+		}
+		script = "\n".join([ "enable=keep" ] +
+			openmediavault.confdbadm.to_shell(data, "ssh_") +
+			[ 'printf "%s|%s|%s|%s" "${enable}" "${ssh_enable}" '
+			'"${ssh_port}" "${ssh_extraoptions}"' ])
+		self.assertEqual(subprocess.check_output([ "sh", "-c", script ],
+			universal_newlines=True),
+			"keep|1|22|AllowUsers 'root'\nBanner $HOME/x")
+
+	def test_eval(self):
+		value = "it's a \"test\"\n$HOME `id` \\"
+		script = "\n".join(openmediavault.confdbadm.to_shell({
+			"comment": value })) + '\nprintf "%s" "${comment}"'
+		self.assertEqual(subprocess.check_output([ "sh", "-c", script ],
+			universal_newlines=True), value)
+
+NOTIFICATION_UUID = "c1cd54af-660d-4311-8e21-2a19420355bb"
+
+class Stdin(object):
+	"""
+	Feeds the commands to the batch command and records the inode of
+	the configuration file before every command is processed.
+	"""
+
+	def __init__(self, commands, config_file):
+		self.commands = commands
+		self.config_file = config_file
+		self.inodes = []
+
+	def __iter__(self):
+		for command in self.commands:
+			self.inodes.append(os.stat(self.config_file).st_ino)
+			yield json.dumps(command) + "\n"
+
+class BatchTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		# Work on a copy of the test database. Note, the environment
+		# variable OMV_CONFIG_FILE is ignored by openmediavault.getenv().
+		self.config_file = os.path.join(self._tmpdir.name, "config.xml")
+		shutil.copy("%s/../data/config.xml" % os.getcwd(), self.config_file)
+		self.create_dir = os.path.join(self._tmpdir.name, "create.d")
+		os.mkdir(self.create_dir)
+		self._env = {}
+		for key, value in [ ("OMV_CONFIG_FILE", self.config_file),
+				("OMV_CONFDB_CREATE_DIR", self.create_dir) ]:
+			self._env[key] = openmediavault.setenv(key, value)
+		registry = openmediavault.plugins.Registry(os.path.join(
+			os.getcwd(), "..", "..", "confdbadm", "commands.d"), "Command")
+		self.command = registry.get("batch").get_instance()
+
+	def tearDown(self):
+		for key, value in self._env.items():
+			if value is None:
+				openmediavault.settings.Environment.as_dict().pop(key)
+			else:
+				openmediavault.setenv(key, value)
+		openmediavault.config.DatabaseCache.invalidate()
+		self._tmpdir.cleanup()
+
+	def _write_create_script(self, id, rc=0):
+		# The script adds an element to the configuration file.
+		filename = os.path.join(self.create_dir, "%s.sh" % id)
+		with open(filename, "w") as fd:
+			fd.write("#!/bin/sh\nsed -i 's#</config>#<created/></config>#' "
+				"\"%s\"\nexit %d\n" % (self.config_file, rc))
+		os.chmod(filename, stat.S_IRWXU)
+
+	def _execute(self, commands):
+		stdin = Stdin(commands, self.config_file)
+		stdout = io.StringIO()
+		old_stdin = sys.stdin
+		sys.stdin = stdin
+		try:
+			with contextlib.redirect_stdout(stdout):
+				rc = self.command.execute("omv-confdbadm", "batch")
+		finally:
+			sys.stdin = old_stdin
+		results = [ json.loads(line) for line in
+			stdout.getvalue().splitlines() ]
+		return (rc, results, stdin.inodes)
+
+	def _get_db(self):
+		openmediavault.config.DatabaseCache.invalidate()
+		return openmediavault.config.Database()
+
+	def _assert_written_once(self, inodes):
+		# The configuration file is replaced by a new file when it is
+		# written, this must happen after all commands are processed.
+		self.assertEqual(len(set(inodes)), 1)
+		self.assertNotEqual(os.stat(self.config_file).st_ino, inodes[0])
+
+	def test_read(self):
+		rc, results, _ = self._execute([
+			{ "command": "read", "id": "conf.system.time" },
+			{ "command": "read", "id": "conf.system.notification.notification",
+				"uuid": NOTIFICATION_UUID },
+			{ "command": "read", "id": "conf.system.notification.notification",
+				"uuid": "00000000-0000-4000-8000-000000000000" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results[0]["response"]["timezone"], "Europe/Berlin")
+		self.assertEqual(results[1]["response"]["uuid"], NOTIFICATION_UUID)
+		self.assertIn("error", results[2])
+
+	def test_read_missing(self):
+		# A non-iterable object that does not exist is reported as an
+		# error instead of aborting the batch.
+		tree = lxml.etree.parse(self.config_file)
+		element = tree.find("./system/time")
+		element.getparent().remove(element)
+		tree.write(self.config_file)
+		rc, results, _ = self._execute([
+			{ "command": "read", "id": "conf.system.time" },
+			{ "command": "exists", "id": "conf.system.sharedfolder" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results, [
+			{ "error": "No such object: conf.system.time" },
+			{ "response": True }
+		])
+
+	def test_exists(self):
+		rc, results, _ = self._execute([
+			{ "command": "exists", "id": "conf.system.sharedfolder" },
+			{ "command": "exists", "id": "conf.system.sharedfolder",
+				"filter": { "operator": "stringEquals", "arg0": "name",
+				"arg1": "xyz" } },
+			{ "command": "exists" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results[:2], [ { "response": True },
+			{ "response": False } ])
+		self.assertEqual(results[2], {
+			"error": "The command has no 'id' property." })
+
+	def test_update(self):
+		rc, results, inodes = self._execute([
+			{ "command": "update", "id": "conf.system.time", "data": {
+				"timezone": "UTC", "ntp": { "enable": True,
+				"timeservers": "pool.ntp.org" } } },
+			{ "command": "update", "id": "conf.system.time", "data": {
+				"timezone": 1, "ntp": "xyz" } },
+			{ "command": "read", "id": "conf.system.time" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results[0]["response"]["timezone"], "UTC")
+		self.assertIn("error", results[1])
+		# The failed update did not modify the configuration.
+		self.assertEqual(results[2]["response"]["timezone"], "UTC")
+		self._assert_written_once(inodes)
+		obj = self._get_db().get("conf.system.time")
+		self.assertEqual(obj.get("timezone"), "UTC")
+		self.assertTrue(obj.get("ntp.enable"))
+
+	def test_delete(self):
+		id = "conf.system.notification.notification"
+		count = len(self._get_db().get(id))
+		rc, results, inodes = self._execute([
+			{ "command": "delete", "id": id, "uuid": NOTIFICATION_UUID },
+			{ "command": "delete", "id": "conf.xyz" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results[0], { "response": 1 })
+		self.assertIn("error", results[1])
+		self._assert_written_once(inodes)
+		self.assertEqual(len(self._get_db().get(id)), count - 1)
+
+	def test_delete_partial(self):
+		# A delete that fails after some objects have been deleted must
+		# not leave these modifications behind.
+		id = "conf.system.notification.notification"
+		count = len(self._get_db().get(id))
+		def delete(db, cmd):
+			objs = db.get(cmd["id"])
+			db.delete(objs[0])
+			raise RuntimeError("Failed to delete %s" % objs[1].get("uuid"))
+		self.command._delete = delete
+		rc, results, _ = self._execute([
+			{ "command": "delete", "id": id },
+			{ "command": "read", "id": id }
+		])
+		self.assertEqual(rc, 1)
+		self.assertIn("error", results[0])
+		self.assertEqual(len(results[1]["response"]), count)
+		self.assertEqual(len(self._get_db().get(id)), count)
+
+	def test_create(self):
+		self._write_create_script("conf.system.time")
+		rc, results, _ = self._execute([
+			{ "command": "update", "id": "conf.system.time", "data": {
+				"timezone": "UTC", "ntp": { "enable": False,
+				"timeservers": "pool.ntp.org" } } },
+			{ "command": "create", "id": "conf.system.time" },
+			{ "command": "create", "id": "conf.service.ssh" },
+			{ "command": "read", "id": "conf.system.time" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertEqual(results[1], { "response": True })
+		self.assertIn("error", results[2])
+		self.assertEqual(results[3]["response"]["timezone"], "UTC")
+		# The pending modifications are written before the script is
+		# executed, the modifications of the script are kept.
+		tree = lxml.etree.parse(self.config_file)
+		self.assertEqual(len(tree.findall("./created")), 1)
+		self.assertEqual(tree.findtext("./system/time/timezone"), "UTC")
+
+	def test_create_fail(self):
+		self._write_create_script("conf.system.time", rc=1)
+		rc, results, _ = self._execute([
+			{ "command": "create", "id": "conf.system.time" }
+		])
+		self.assertEqual(rc, 1)
+		self.assertIn("error", results[0])
+		# The modifications of the failed script are rolled back.
+		tree = lxml.etree.parse(self.config_file)
+		self.assertEqual(tree.findall("./created"), [])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import lxml.etree
+import openmediavault
+import openmediavault.confdbd
+
+class EvaluateTestCase(unittest.TestCase):
+	def setUp(self):
+		self.tree = lxml.etree.parse("%s/../data/config.xml" % os.getcwd())
+
+	def test_value(self):
+		self.assertEqual(openmediavault.confdbd.evaluate(self.tree,
+			"//system/time/timezone"), "Europe/Berlin")
+
+	def test_not_found(self):
+		self.assertEqual(openmediavault.confdbd.evaluate(self.tree,
+			"//system/xyz"), "")
+
+	def test_count(self):
+		self.assertEqual(openmediavault.confdbd.evaluate(self.tree,
+			"count(//system/time)"), "1")
+		self.assertEqual(openmediavault.confdbd.evaluate(self.tree,
+			"count(//system/xyz)"), "0")
+
+	def test_node_set(self):
+		tree = lxml.etree.fromstring("<a><b>1</b><b>x<c>2</c></b></a>")
+		self.assertEqual(openmediavault.confdbd.evaluate(tree, "//b"),
+			"1\nx2")
+
+	def test_types(self):
+		for expr, value in [ ("1 div 4", "0.25"), ("1 div 0", "Infinity"),
+				("0 div 0", "NaN"), ("1 = 1", "true"),
+				("concat('a', 'b')", "ab") ]:
+			self.assertEqual(openmediavault.confdbd.evaluate(self.tree,
+				expr), value)
+
+	def test_invalid(self):
+		self.assertRaises(lxml.etree.XPathError,
+			openmediavault.confdbd.evaluate, self.tree, "//system[")
+
+class ServerTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.config_file = os.path.join(self._tmpdir.name, "config.xml")
+		shutil.copy("%s/../data/config.xml" % os.getcwd(), self.config_file)
+		self._old_config_file = openmediavault.setenv("OMV_CONFIG_FILE",
+			self.config_file)
+		self.address = os.path.join(self._tmpdir.name, "confdbd.sock")
+		self.server = openmediavault.confdbd.Server(self.address,
+			openmediavault.confdbd.RequestHandler)
+		threading.Thread(target=self.server.serve_forever,
+			daemon=True).start()
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+		openmediavault.setenv("OMV_CONFIG_FILE", self._old_config_file)
+		self._tmpdir.cleanup()
+
+	def _query(self, *queries):
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.connect(self.address)
+		with sock, sock.makefile("rwb") as fd:
+			responses = []
+			for query in queries:
+				fd.write(("%s\n" % query).encode())
+				fd.flush()
+				status, _, data = fd.readline().decode().rstrip(
+					"\n").partition(" ")
+				responses.append(json.loads(data) if "OK" == status
+					else (status, data))
+			return responses
+
+	def test_xpath(self):
+		self.assertEqual(self._query("xpath //system/time/timezone",
+			"xpath count(//system/time)"), [ "Europe/Berlin", "1" ])
+
+	def test_get(self):
+		obj = self._query("get conf.system.time")[0]
+		self.assertEqual(obj["timezone"], "Europe/Berlin")
+
+	def test_error(self):
+		for query in [ "xpath //system[", "get conf.xyz", "xyz" ]:
+			status, message = self._query(query)[0]
+			self.assertEqual(status, "ERROR")
+			self.assertTrue(message)
+
+	def test_reload(self):
+		self.assertEqual(self._query("xpath //system/time/timezone"),
+			[ "Europe/Berlin" ])
+		with open(self.config_file) as fd:
+			content = fd.read()
+		with open(self.config_file, "w") as fd:
+			fd.write(content.replace("Europe/Berlin", "Europe/Paris"))
+		self.assertEqual(self._query("xpath //system/time/timezone"),
+			[ "Europe/Paris" ])
+
+	def test_reload_same_size_same_mtime(self):
+		# The PHP implementation rewrites the file in place, thus the
+		# inode is kept. Neither the size nor the modification time
+		# changes if it is modified within the same timestamp tick.
+		self.assertEqual(self._query("xpath //system/time/timezone"),
+			[ "Europe/Berlin" ])
+		st = os.stat(self.config_file)
+		with open(self.config_file, "rb") as fd:
+			content = fd.read()
+		with open(self.config_file, "r+b") as fd:
+			fd.write(content.replace(b"Europe/Berlin", b"Europe/Zurich"))
+		os.utime(self.config_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+		self.assertEqual(self._query("xpath //system/time/timezone"),
+			[ "Europe/Zurich" ])
+
+if __name__ == "__main__":
+	unittest.main()
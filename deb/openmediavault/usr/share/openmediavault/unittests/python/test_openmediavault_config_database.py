@@ -120,14 +120,14 @@ class DatabaseTestCase(unittest.TestCase):
 	def test_get_list_tags(self):
 		query = openmediavault.config.DatabaseGetQuery("conf.service.rsyncd")
 		# Attention, this is a private class member.
-		self.assertIsInstance(query._force_list_tags, list)
-		self.assertEqual(query._force_list_tags, [ "module", "user" ])
+		self.assertIsInstance(query._force_list_tags, frozenset)
+		self.assertEqual(query._force_list_tags, { "module", "user" })
 
 	def test_get_dict_tags(self):
 		query = openmediavault.config.DatabaseGetQuery("conf.service.rsyncd")
 		# Attention, this is a private class member.
-		self.assertIsInstance(query._force_dict_tags, list)
-		self.assertEqual(query._force_dict_tags, [ "modules", "users" ])
+		self.assertIsInstance(query._force_dict_tags, frozenset)
+		self.assertEqual(query._force_dict_tags, { "modules", "users" })
 
 	def test_get_query(self):
 		query = openmediavault.config.DatabaseGetQuery("conf.system.time")
@@ -178,6 +178,47 @@ class DatabaseTestCase(unittest.TestCase):
 		self.assertEqual(query.xpath, "//system/network/proxy[(port=8080 or " \
 			"port=4443)]")
 
+	def test_filter_query_quotes(self):
+		query = openmediavault.config.DatabaseGetByFilterQuery(
+			"conf.system.notification.notification",
+			openmediavault.config.DatabaseFilter({
+				'operator': 'or',
+				'arg0': {
+					'operator': 'stringEquals',
+					'arg0': 'id',
+					'arg1': "it's"
+				},
+				'arg1': {
+					'operator': 'stringEquals',
+					'arg0': 'id',
+					'arg1': "it's \"quoted\""
+				}
+			}))
+		self.assertEqual(query.xpath, "//system/notification/notifications/" \
+			"notification[(id=\"it's\" or id=concat('it', \"'\", " \
+			"'s \"quoted\"'))]")
+		query.execute()
+		self.assertEqual(query.response, [])
+
+	def test_filter_query_compiled(self):
+		db = openmediavault.config.Database()
+		# Attention, this is a private module function.
+		compile_xpath = openmediavault.config.database._compile_xpath
+		compile_xpath.cache_clear()
+		for uuid in [ "03dc067d-1310-45b5-899f-b471a0ae9233",
+				"c1cd54af-660d-4311-8e21-2a19420355bb" ]:
+			objs = db.get_by_filter("conf.system.notification.notification",
+				openmediavault.config.DatabaseFilter({
+					'operator': 'stringEquals',
+					'arg0': 'uuid',
+					'arg1': uuid
+				}))
+			self.assertEqual(objs[0].get("uuid"), uuid)
+		# The XPath query must be compiled only once.
+		cache_info = compile_xpath.cache_info()
+		self.assertEqual(cache_info.misses, 1)
+		self.assertEqual(cache_info.hits, 1)
+
 	def test_is_unique(self):
 		db = openmediavault.config.Database()
 		obj = db.get("conf.system.notification.notification",
@@ -361,5 +402,258 @@ class DatabaseTestCase(unittest.TestCase):
 		self.assertEqual(obj.get("privileges.privilege.0.perms"), 7)
 		self.assertEqual(obj.get("privileges.privilege.1.name"), "test2")
 
+	def test_cache_get(self):
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		tree = openmediavault.config.DatabaseCache.get(config_file)
+		self.assertIsInstance(tree, lxml.etree._ElementTree)
+		self.assertIs(openmediavault.config.DatabaseCache.get(config_file),
+			tree)
+
+	def test_cache_invalidate_on_change(self):
+		self._use_tmp_config_database()
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		tree = openmediavault.config.DatabaseCache.get(config_file)
+		# Modify the file behind the back of the cache.
+		with open(config_file, "ab") as f:
+			f.write(b"\n")
+		self.assertIsNot(openmediavault.config.DatabaseCache.get(config_file),
+			tree)
+
+	def test_cache_same_size_same_mtime(self):
+		# A file that is rewritten in place within the same tick of the
+		# file system timestamps, e.g. by the PHP implementation, keeps
+		# its inode, size and modification time.
+		self._use_tmp_config_database()
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		tree = openmediavault.config.DatabaseCache.get(config_file)
+		self.assertIs(openmediavault.config.DatabaseCache.get(config_file),
+			tree)
+		st = os.stat(config_file)
+		with open(config_file, "rb") as f:
+			content = f.read()
+		with open(config_file, "r+b") as f:
+			f.write(content.replace(b"Europe/Berlin", b"Europe/Zurich"))
+		os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+		self.assertEqual(os.stat(config_file).st_ino, st.st_ino)
+		tree = openmediavault.config.DatabaseCache.get(config_file)
+		self.assertEqual(tree.findtext("system/time/timezone"),
+			"Europe/Zurich")
+
+	def test_cache_update_on_set(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		obj = db.get("conf.system.apt.distribution")
+		obj.set("proposed", True)
+		db.set(obj)
+		# The cache must contain the tree that has just been written.
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		tree = openmediavault.config.DatabaseCache.get(config_file)
+		self.assertEqual(tree.findtext("system/apt/distribution/proposed"),
+			"1")
+
+	def test_transaction(self):
+		self._use_tmp_config_database()
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		with open(config_file, "rb") as f:
+			content = f.read()
+		db = openmediavault.config.Database()
+		with db.transaction():
+			for id in [ "test1", "test2" ]:
+				new_obj = openmediavault.config.Object(
+					"conf.system.notification.notification")
+				new_obj.set_dict({
+					'uuid': openmediavault.getenv('OMV_CONFIGOBJECT_NEW_UUID'),
+					'id': id,
+					'enable': False
+				})
+				db.set(new_obj)
+			# The queries within the transaction must see the changes ...
+			self.assertEqual(len(db.get(
+				"conf.system.notification.notification")), 10)
+			# ... but the file must not be modified until now.
+			with open(config_file, "rb") as f:
+				self.assertEqual(f.read(), content)
+		objs = db.get("conf.system.notification.notification")
+		self.assertEqual(len(objs), 10)
+
+	def test_transaction_rollback(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		def _delete():
+			with db.transaction():
+				db.delete_by_filter("conf.system.notification.notification",
+					openmediavault.config.DatabaseFilter({
+						'operator': 'stringContains',
+						'arg0': 'id',
+						'arg1': 'monit'
+					}))
+				raise RuntimeError("Abort")
+		self.assertRaises(RuntimeError, _delete)
+		objs = db.get("conf.system.notification.notification")
+		self.assertEqual(len(objs), 8)
+
+	def test_transaction_savepoint(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		id = "conf.system.notification.notification"
+		with db.transaction() as transaction:
+			objs = db.get(id)
+			db.delete(objs[0])
+			def _delete():
+				with transaction.savepoint():
+					db.delete(objs[1])
+					self.assertEqual(len(db.get(id)), 6)
+					raise RuntimeError("Abort")
+			self.assertRaises(RuntimeError, _delete)
+			# Only the modifications within the block are discarded.
+			self.assertEqual(len(db.get(id)), 7)
+			self.assertEqual(db.get(id, objs[1].get("uuid")).get("uuid"),
+				objs[1].get("uuid"))
+		self.assertEqual(len(db.get(id)), 7)
+
+	def test_transaction_savepoint_delete(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		id = "conf.system.sharedfolder"
+		with db.transaction() as transaction:
+			objs = db.get(id)
+			self.assertTrue(1 < len(objs))
+			mntent = db.get("conf.system.filesystem.mountpoint",
+				objs[0].get("mntentref"))
+			self.assertTrue(db.is_referenced(mntent))
+			tree = lxml.etree.tostring(transaction.root_element)
+			index = transaction.index
+			ids = { name: { key: set(elements) for key, elements in
+				values.items() } for name, values in index._ids.items() }
+			refs = { name: dict(values) for name, values in
+				index._refs.items() }
+			# Delete all shared folders, but fail before the last one.
+			def _delete():
+				with transaction.savepoint():
+					for obj in objs[:-1]:
+						db.delete(obj)
+					self.assertEqual(len(db.get(id)), 1)
+					raise RuntimeError("Abort")
+			self.assertRaises(RuntimeError, _delete)
+			# The XML tree and the indexes must be restored.
+			self.assertFalse(transaction.is_modified)
+			self.assertEqual(lxml.etree.tostring(transaction.root_element),
+				tree)
+			self.assertEqual({ name: { key: set(elements) for key, elements
+				in values.items() } for name, values in index._ids.items() },
+				ids)
+			self.assertEqual({ name: dict(values) for name, values in
+				index._refs.items() }, refs)
+			for obj in objs:
+				self.assertEqual(db.get(id, obj.get("uuid")).get("name"),
+					obj.get("name"))
+			self.assertTrue(db.is_referenced(mntent))
+
+	def test_save_atomic(self):
+		self._use_tmp_config_database()
+		config_file = openmediavault.getenv("OMV_CONFIG_FILE")
+		os.chmod(config_file, 0o640)
+		st = os.stat(config_file)
+		db = openmediavault.config.Database()
+		obj = db.get("conf.system.apt.distribution")
+		obj.set("proposed", True)
+		db.set(obj)
+		# The file must have been replaced, but the permissions must
+		# be kept.
+		new_st = os.stat(config_file)
+		self.assertNotEqual(new_st.st_ino, st.st_ino)
+		self.assertEqual(new_st.st_mode, st.st_mode)
+		# No temporary file must be left behind.
+		dirname, basename = os.path.split(config_file)
+		self.assertEqual([ name for name in os.listdir(dirname)
+			if name.startswith(".%s." % basename) ], [])
+
+	def test_object_lazy(self):
+		db = openmediavault.config.Database()
+		obj = db.get("conf.system.notification.notification",
+			"03dc067d-1310-45b5-899f-b471a0ae9233")
+		self.assertIsInstance(obj, openmediavault.config.DatabaseObject)
+		self.assertEqual(obj.get("id"), "monitmemoryusage")
+		self.assertIsInstance(obj.get("enable"), bool)
+		self.assertFalse(obj.is_materialized)
+		self.assertEqual(obj.get_dict()['id'], "monitmemoryusage")
+		self.assertTrue(obj.is_materialized)
+
+	def test_object_lazy_set(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		obj = db.get("conf.system.notification.notification",
+			"03dc067d-1310-45b5-899f-b471a0ae9233")
+		obj.set("enable", False)
+		self.assertTrue(obj.is_materialized)
+		self.assertEqual(obj.get("id"), "monitmemoryusage")
+		db.set(obj)
+		obj = db.get("conf.system.notification.notification",
+			"03dc067d-1310-45b5-899f-b471a0ae9233")
+		self.assertFalse(obj.get("enable"))
+
+	def test_streaming_get(self):
+		db = openmediavault.config.Database(streaming=True)
+		objs = db.get("conf.system.notification.notification")
+		self.assertIsInstance(objs, list)
+		self.assertEqual(len(objs), len(openmediavault.config.Database().get(
+			"conf.system.notification.notification")))
+		obj = db.get("conf.system.notification.notification",
+			"03dc067d-1310-45b5-899f-b471a0ae9233")
+		self.assertEqual(obj.get("id"), "monitmemoryusage")
+		obj = db.get("conf.service.ftp")
+		self.assertIsInstance(obj, openmediavault.config.Object)
+
+	def test_streaming_subtree(self):
+		tree = openmediavault.config.database._parse_subtree(
+			openmediavault.getenv("OMV_CONFIG_FILE"),
+			[ "system", "notification", "notifications", "notification" ])
+		root = tree.getroot()
+		self.assertEqual([ child.tag for child in root
+			if isinstance(child.tag, str) ], [ "system" ])
+		self.assertEqual(len(root.find("system")), 1)
+		self.assertLess(0, len(root.findall(
+			"system/notification/notifications/notification")))
+
+	def test_index_get(self):
+		db = openmediavault.config.Database()
+		# Get the index of the cached XML tree.
+		(tree, index) = openmediavault.config.DatabaseCache.lookup(
+			openmediavault.getenv("OMV_CONFIG_FILE"))
+		model = openmediavault.config.Datamodel("conf.system.sharedfolder")
+		self.assertTrue(index.is_indexable(model))
+		elements = index.get(model, "339bd101-5744-4017-9392-01a156f15ab9")
+		self.assertEqual(len(elements), 1)
+		self.assertEqual(elements[0].findtext("name"), "data")
+		# The element must not be found via another data model.
+		model = openmediavault.config.Datamodel(
+			"conf.system.notification.notification")
+		self.assertEqual(index.get(model,
+			"339bd101-5744-4017-9392-01a156f15ab9"), [])
+
+	def test_index_update(self):
+		self._use_tmp_config_database()
+		db = openmediavault.config.Database()
+		obj = db.get("conf.system.sharedfolder",
+			"91fe93fc-ef9d-11e6-9b06-000c2900c2de")
+		self.assertFalse(db.is_referenced(obj))
+		with db.transaction():
+			# Reference the shared folder by a FTP share.
+			share = openmediavault.config.Object("conf.service.ftp.share")
+			share.set_dict({
+				'uuid': openmediavault.getenv('OMV_CONFIGOBJECT_NEW_UUID'),
+				'sharedfolderref': obj.get("uuid")
+			})
+			db.set(share)
+			self.assertTrue(db.is_referenced(obj))
+			# Delete the shared folder.
+			db.delete(obj)
+			self.assertRaises(
+				openmediavault.config.database.DatabaseQueryNotFoundException,
+				lambda: db.get("conf.system.sharedfolder", obj.get("uuid")))
+			# Remove the reference.
+			db.delete(share)
+			self.assertFalse(db.is_referenced(obj))
+
 if __name__ == "__main__":
 	unittest.main()
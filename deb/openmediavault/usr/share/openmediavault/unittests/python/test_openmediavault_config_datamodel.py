@@ -18,7 +18,12 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import json
+import os
+import shutil
+import tempfile
 import unittest
+import openmediavault
 import openmediavault.config.datamodel
 
 class DatamodelTestCase(unittest.TestCase):
@@ -73,5 +78,83 @@ class DatamodelTestCase(unittest.TestCase):
 		value = datamodel.property_convert("integer", "20")
 		self.assertEqual(value, 20)
 
+	def test_list_properties(self):
+		datamodel = openmediavault.config.Datamodel("conf.service.rsyncd")
+		self.assertEqual(datamodel.list_properties, { "module", "user" })
+		self.assertEqual(datamodel.dict_properties, { "modules", "users" })
+
+	def test_registry(self):
+		datamodel = openmediavault.config.DatamodelRegistry.get(
+			"conf.system.time")
+		self.assertIsInstance(datamodel, openmediavault.config.Datamodel)
+		self.assertEqual(datamodel.id, "conf.system.time")
+		# The data model must be loaded only once.
+		self.assertIs(openmediavault.config.DatamodelRegistry.get(
+			"conf.system.time"), datamodel)
+
+	def test_registry_not_found(self):
+		self.assertRaises(
+			openmediavault.config.datamodel.DatamodelNotFoundException,
+			lambda: openmediavault.config.DatamodelRegistry.get("conf.xyz"))
+
+	def test_registry_bundle(self):
+		(fh, bundle_file) = tempfile.mkstemp()
+		os.close(fh)
+		openmediavault.setenv("OMV_DATAMODELS_BUNDLE_FILE", bundle_file)
+		try:
+			count = openmediavault.config.DatamodelRegistry.compile()
+			self.assertTrue(0 < count)
+			# Attention, this is a private class member.
+			models = openmediavault.config.DatamodelRegistry._load_bundle(
+				openmediavault.getenv("OMV_DATAMODELS_DIR",
+					"/usr/share/openmediavault/datamodels"), bundle_file)
+			self.assertEqual(len(models), count)
+			datamodel = openmediavault.config.Datamodel("conf.system.time")
+			self.assertEqual(datamodel.model, models['conf.system.time'])
+		finally:
+			os.unlink(bundle_file)
+			openmediavault.config.DatamodelRegistry.clear()
+
+	def test_registry_modified(self):
+		tmpdir = tempfile.TemporaryDirectory()
+		(fh, bundle_file) = tempfile.mkstemp()
+		os.close(fh)
+		filename = os.path.join(tmpdir.name, "conf.system.time.json")
+		shutil.copy(os.path.join(openmediavault.getenv("OMV_DATAMODELS_DIR",
+			"/usr/share/openmediavault/datamodels"), "conf.system.time.json"),
+			filename)
+		old_dir = openmediavault.setenv("OMV_DATAMODELS_DIR", tmpdir.name)
+		old_bundle_file = openmediavault.setenv("OMV_DATAMODELS_BUNDLE_FILE",
+			bundle_file)
+		check_interval = openmediavault.config.DatamodelRegistry.CHECK_INTERVAL
+		openmediavault.config.DatamodelRegistry.CHECK_INTERVAL = 0
+		try:
+			openmediavault.config.DatamodelRegistry.compile()
+			datamodel = openmediavault.config.DatamodelRegistry.get(
+				"conf.system.time")
+			self.assertEqual(datamodel.title, "")
+			# Modify the file in place, this does not change the
+			# modification time of the directory.
+			st = os.stat(tmpdir.name)
+			with open(filename) as f:
+				model = json.load(f)
+			model["title"] = "Time"
+			with open(filename, "w") as f:
+				json.dump(model, f)
+			os.utime(tmpdir.name, ns=(st.st_atime_ns, st.st_mtime_ns))
+			datamodel = openmediavault.config.DatamodelRegistry.get(
+				"conf.system.time")
+			self.assertEqual(datamodel.title, "Time")
+		finally:
+			openmediavault.config.DatamodelRegistry.CHECK_INTERVAL = \
+				check_interval
+			openmediavault.setenv("OMV_DATAMODELS_DIR", old_dir)
+			if old_bundle_file is not None:
+				openmediavault.setenv("OMV_DATAMODELS_BUNDLE_FILE",
+					old_bundle_file)
+			os.unlink(bundle_file)
+			tmpdir.cleanup()
+			openmediavault.config.DatamodelRegistry.clear()
+
 if __name__ == "__main__":
 	unittest.main()
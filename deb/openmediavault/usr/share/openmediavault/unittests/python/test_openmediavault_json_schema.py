@@ -105,6 +105,73 @@ class SchemaTestCase(unittest.TestCase):
 		self.assertRaises(openmediavault.json.SchemaValidationException,
 			lambda: schema.validate({ "name": "Eggs", "price": 34.99 }))
 
+	def test_validate_exclusive_maximum(self):
+		schema = openmediavault.json.Schema({ "type": "object",
+			"properties": { "price": { "type": "integer",
+				"maximum": 40, "exclusiveMaximum": True } } })
+		with self.assertRaises(
+				openmediavault.json.SchemaValidationException) as cm:
+			schema.validate({ "price": 40 })
+		self.assertEqual(str(cm.exception),
+			"price: Invalid value 40, must be less than 40.")
+
+	def test_validate_exclusive_minimum(self):
+		schema = openmediavault.json.Schema({ "type": "object",
+			"properties": { "price": { "type": "integer",
+				"minimum": 35, "exclusiveMinimum": True } } })
+		with self.assertRaises(
+				openmediavault.json.SchemaValidationException) as cm:
+			schema.validate({ "price": 35 })
+		self.assertEqual(str(cm.exception),
+			"price: Invalid value 35, must be greater than 35.")
+
+	def test_validate_json_string(self):
+		schema = self._get_schema()
+		schema.validate("37", "price")
+		self.assertRaises(openmediavault.json.SchemaValidationException,
+			lambda: schema.validate("41", "price"))
+
+	def test_validate_enum(self):
+		schema = self._get_schema()
+		schema.validate(5, "privilege.perms")
+		self.assertRaises(openmediavault.json.SchemaValidationException,
+			lambda: schema.validate(3, "privilege.perms"))
+
+	def test_validate_array(self):
+		schema = self._get_schema()
+		schema.validate({ "name": "Apple", "privilege": [
+			{ "type": "user", "name": "test", "perms": 7 }
+		]})
+		with self.assertRaises(
+				openmediavault.json.SchemaValidationException) as cm:
+			schema.validate({ "name": "Apple", "privilege": [
+				{ "type": "user", "name": "test", "perms": 7 },
+				{ "type": "foo", "name": "test", "perms": 7 }
+			]})
+		self.assertEqual(cm.exception.path, "privilege[1].type")
+
+	def test_validate_type_list(self):
+		schema = openmediavault.json.Schema({
+			"type": [ "integer", "null" ]
+		})
+		schema.validate(None)
+		schema.validate(1)
+		self.assertRaises(openmediavault.json.SchemaValidationException,
+			lambda: schema.validate("abc"))
+
+	def test_validate_type_unknown(self):
+		schema = openmediavault.json.Schema({ "type": "abc" })
+		self.assertRaises(openmediavault.json.SchemaException,
+			lambda: schema.validate(1))
+
+	def test_compile(self):
+		schema = self._get_schema()
+		validator = schema.compile("price")
+		self.assertIs(validator, schema.compile("price"))
+		validator(38)
+		self.assertRaises(openmediavault.json.SchemaValidationException,
+			lambda: validator(34))
+
 	def test_check_format_unknown(self):
 		schema = openmediavault.json.Schema({})
 		self.assertRaises(openmediavault.json.SchemaException, lambda:
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+import openmediavault.mkconf
+
+SCRIPT = """#!/bin/sh
+# omv-mkconf-after: {after}
+echo "{name}"
+echo "start {name}" >> "{log}"
+sleep {sleep}
+echo "end {name}" >> "{log}"
+exit {rc}
+"""
+
+class MkconfTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.log = os.path.join(self._tmpdir.name, "log")
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _write_script(self, name, after="", sleep=0, rc=0):
+		filename = os.path.join(self._tmpdir.name, name)
+		with open(filename, "w") as fd:
+			fd.write(SCRIPT.format(name=name, after=after, log=self.log,
+				sleep=sleep, rc=rc))
+		os.chmod(filename, os.stat(filename).st_mode | stat.S_IXUSR)
+
+	def _read_log(self):
+		with open(self.log, "r") as fd:
+			return fd.read().splitlines()
+
+	def test_get_dependencies(self):
+		self._write_script("nginx", after="certificates php-fpm")
+		self.assertEqual(openmediavault.mkconf.get_dependencies(
+			os.path.join(self._tmpdir.name, "nginx")),
+			[ "certificates", "php-fpm" ])
+
+	def test_get_order(self):
+		order = openmediavault.mkconf.get_order({
+			"nginx": [ "certificates", "php-fpm" ],
+			"php-fpm": [],
+			"certificates": [ "unknown" ]
+		})
+		self.assertLess(order.index("certificates"), order.index("nginx"))
+		self.assertLess(order.index("php-fpm"), order.index("nginx"))
+
+	def test_get_order_circular(self):
+		self.assertRaises(ValueError, openmediavault.mkconf.get_order, {
+			"a": [ "b" ], "b": [ "a" ], "c": []
+		})
+
+	def test_run_scripts(self):
+		self._write_script("certificates", sleep=0.3)
+		self._write_script("nginx", after="certificates")
+		self._write_script("samba", rc=3)
+		finished = []
+		results = openmediavault.mkconf.run_scripts(self._tmpdir.name,
+			[ "nginx", "samba", "certificates" ], max_workers=3,
+			callback=lambda name, rc, output: finished.append(name))
+		self.assertEqual(list(results), [ "nginx", "samba", "certificates" ])
+		self.assertEqual(results["nginx"], (0, "nginx\n"))
+		self.assertEqual(results["samba"], (3, "samba\n"))
+		self.assertEqual(sorted(finished), sorted(results))
+		# 'nginx' must not be started before 'certificates' has been
+		# finished, 'samba' runs in parallel to 'certificates'.
+		log = self._read_log()
+		self.assertLess(log.index("end certificates"),
+			log.index("start nginx"))
+		self.assertLess(log.index("start samba"),
+			log.index("end certificates"))
+
+	def test_run_scripts_ignore_unscheduled(self):
+		# Dependencies are ignored if they are not executed, too.
+		self._write_script("nginx", after="certificates")
+		results = openmediavault.mkconf.run_scripts(self._tmpdir.name,
+			[ "nginx" ])
+		self.assertEqual(results["nginx"][0], 0)
+
+	def test_run_scripts_circular(self):
+		self._write_script("a", after="b")
+		self._write_script("b", after="a")
+		self.assertRaises(ValueError, openmediavault.mkconf.run_scripts,
+			self._tmpdir.name, [ "a", "b" ])
+		self.assertFalse(os.path.exists(self.log))
+
+# Executes omv-mkconf with the given scripts directory. The directory
+# must be set via openmediavault.setenv() because openmediavault.getenv()
+# ignores the process environment.
+MAIN = """import importlib.machinery, importlib.util, sys, openmediavault
+openmediavault.setenv("OMV_MKCONF_SCRIPTS_DIR", sys.argv[1])
+loader = importlib.machinery.SourceFileLoader("omv_mkconf", sys.argv[2])
+module = importlib.util.module_from_spec(
+	importlib.util.spec_from_loader(loader.name, loader))
+loader.exec_module(module)
+sys.argv = [ "omv-mkconf" ] + sys.argv[3:]
+sys.exit(module.main())
+"""
+
+class MainTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		for name in [ "certificates", "nginx" ]:
+			filename = os.path.join(self._tmpdir.name, name)
+			with open(filename, "w") as fd:
+				fd.write("#!/bin/sh\necho \"$(basename \"$0\") $*\"\n")
+			os.chmod(filename, stat.S_IRWXU)
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _main(self, *args):
+		script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+			"..", "..", "..", "..", "sbin", "omv-mkconf")
+		result = subprocess.run([ sys.executable, "-c", MAIN,
+			self._tmpdir.name, script ] + list(args),
+			stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+			universal_newlines=True)
+		return (result.returncode, result.stdout)
+
+	def test_single(self):
+		# Without --jobs the extra arguments are passed to the script,
+		# even if they are names of scripts.
+		self.assertEqual(self._main("nginx", "certificates"),
+			(0, "nginx certificates\n"))
+
+	def test_jobs(self):
+		# The scripts are executed, but no arguments are passed.
+		rc, output = self._main("-j", "2", "nginx", "certificates")
+		self.assertEqual(rc, 0)
+		self.assertIn(">>> certificates\ncertificates \n", output)
+		self.assertIn(">>> nginx\nnginx \n", output)
+
+	def test_all(self):
+		rc, output = self._main("--all")
+		self.assertEqual(rc, 0)
+		self.assertIn(">>> certificates\n", output)
+		self.assertIn(">>> nginx\n", output)
+
+	def test_jobs_not_found(self):
+		self.assertEqual(self._main("-j", "2", "nginx", "xyz"), (100, ""))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,734 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import importlib.machinery
+import importlib.util
+import os
+import stat
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import openmediavault.mkrrdgraph
+import openmediavault.settings
+
+try:
+	import rrdtool
+except ImportError:
+	rrdtool = None
+
+# A fake rrdtool executable. The graph command writes the arguments
+# into the image file, it fails if the image file is located in a
+# non-existing directory. The arguments of the flushcached command are
+# appended to the file 'flushcached'. The PID of every 'rrdtool -'
+# process is appended to the file 'pipes'.
+FAKE_RRDTOOL = """#!{python}
+import os, sys
+
+def log(name, text):
+	with open(os.path.join({dir!r}, name), "a") as fd:
+		fd.write(text + "\\n")
+
+def execute(args):
+	if args[0] == "flushcached":
+		log("flushcached", " ".join(args[1:]))
+		if os.environ["FLUSHCACHED_RC"] != "0":
+			raise Exception("Failed to flush")
+	elif args[0] == "graph":
+		with open(args[1], "w") as fd:
+			fd.write(" ".join(args[2:]) + "\\n")
+		print("497x179")
+
+def split(line):
+	# Split the line like rrdtool does.
+	args, arg, quote = [], None, None
+	for c in line.rstrip("\\n"):
+		if c == " " and quote is None:
+			if arg is not None:
+				args.append(arg)
+				arg = None
+		elif c in "\\"'" and quote in (None, c):
+			arg = arg or ""
+			quote = None if quote else c
+		else:
+			arg = (arg or "") + c
+	if arg is not None:
+		args.append(arg)
+	return args
+
+if sys.argv[1] == "-":
+	log("pipes", str(os.getpid()))
+	for line in sys.stdin:
+		try:
+			execute(split(line))
+			print("OK u:0.00 s:0.00 r:0.00")
+		except Exception as e:
+			print("ERROR: %s" % e)
+		sys.stdout.flush()
+else:
+	try:
+		execute(sys.argv[1:])
+	except Exception as e:
+		sys.exit(str(e))
+"""
+
+class FakeRrdtoolTestCase(unittest.TestCase):
+	"""
+	Puts the fake rrdtool executable into the search path.
+	"""
+
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		filename = os.path.join(self._tmpdir.name, "rrdtool")
+		with open(filename, "w") as fd:
+			fd.write(FAKE_RRDTOOL.format(python=sys.executable,
+				dir=self._tmpdir.name))
+		os.chmod(filename, stat.S_IRWXU)
+		self._path = os.environ["PATH"]
+		os.environ["PATH"] = "%s:%s" % (self._tmpdir.name, self._path)
+		os.environ["FLUSHCACHED_RC"] = "0"
+
+	def tearDown(self):
+		os.environ["PATH"] = self._path
+		del os.environ["FLUSHCACHED_RC"]
+		self._tmpdir.cleanup()
+
+	def _get_filename(self, name):
+		return os.path.join(self._tmpdir.name, name)
+
+class MkRrdGraphTestCase(FakeRrdtoolTestCase):
+	def test_collect_graph_jobs(self):
+		with openmediavault.mkrrdgraph.collect_graph_jobs() as jobs:
+			rc = openmediavault.mkrrdgraph.call_rrdtool_graph([
+				self._get_filename("cpu-0-hour.png"), "--start", "-1h" ])
+		self.assertEqual(rc, 0)
+		self.assertEqual(len(jobs), 1)
+		self.assertEqual(jobs[0].filename, self._get_filename(
+			"cpu-0-hour.png"))
+		self.assertEqual(jobs[0].to_args(), [
+			self._get_filename("cpu-0-hour.png"), "--start", "-1h" ])
+		self.assertTrue(jobs[0].shell)
+		# The graph has not been created.
+		self.assertFalse(os.path.exists(self._get_filename(
+			"cpu-0-hour.png")))
+
+	def test_call_rrdtool_graph(self):
+		# The graph is created immediately if the jobs are not collected.
+		with openmediavault.mkrrdgraph.collect_graph_jobs():
+			pass
+		openmediavault.mkrrdgraph.call_rrdtool_graph([
+			self._get_filename("cpu-0-hour.png"), "--start", "-1h" ])
+		self.assertTrue(os.path.exists(self._get_filename(
+			"cpu-0-hour.png")))
+
+	def test_render_graph(self):
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			self._get_filename("load-hour.png"), [ "--start", "-1h" ])
+		spec.option("--title", "Load average - by hour")
+		spec.COMMENT("Last update\\: now")
+		self.assertEqual(openmediavault.mkrrdgraph.render_graph(spec), 0)
+		# The arguments are not passed to a shell.
+		with open(self._get_filename("load-hour.png")) as fd:
+			self.assertEqual(fd.read(), "--start -1h --title Load average "
+				"- by hour COMMENT:Last update\\: now\n")
+
+	def test_run_graph_jobs(self):
+		jobs = [ openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+			"load-%d.png" % i), [ '"Load %d"' % i ], shell=True)
+			for i in range(10) ]
+		failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 4)
+		self.assertEqual(failed, [])
+		for i in range(10):
+			with open(self._get_filename("load-%d.png" % i)) as fd:
+				self.assertEqual(fd.read(), "Load %d\n" % i)
+
+	def test_run_graph_jobs_fail(self):
+		jobs = [ openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+			name)) for name in [ "load-0.png", "xyz/load-1.png",
+			"load-2.png" ] ]
+		failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 2)
+		self.assertEqual(failed, [ self._get_filename("xyz/load-1.png") ])
+		self.assertTrue(os.path.exists(self._get_filename("load-0.png")))
+		self.assertTrue(os.path.exists(self._get_filename("load-2.png")))
+
+	def _get_flush_jobs(self):
+		rrd = self._get_filename("load.rrd")
+		open(rrd, "w").close()
+		jobs = []
+		for period in [ "hour", "day" ]:
+			spec = openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+				"load-%s.png" % period), [ "--daemon", "unix:/rrdcached.sock" ])
+			spec.DEF("s", rrd, "shortterm", "AVERAGE")
+			spec.DEF("m", self._get_filename("missing.rrd"), "midterm",
+				"AVERAGE")
+			jobs.append(spec)
+		return jobs
+
+	def test_run_graph_jobs_flushcached(self):
+		jobs = self._get_flush_jobs()
+		failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 2)
+		self.assertEqual(failed, [])
+		# The existing RRD files of all graphs are flushed at once.
+		with open(self._get_filename("flushcached")) as fd:
+			self.assertEqual(fd.read(), "--daemon unix:/rrdcached.sock "
+				"%s\n" % self._get_filename("load.rrd"))
+		# The graphs are rendered without the --daemon option.
+		with open(self._get_filename("load-hour.png")) as fd:
+			self.assertNotIn("--daemon", fd.read())
+
+	def test_run_graph_jobs_flushcached_fail(self):
+		os.environ["FLUSHCACHED_RC"] = "1"
+		jobs = self._get_flush_jobs()
+		failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 2)
+		self.assertEqual(failed, [])
+		# Every graph flushes its RRD files by itself.
+		with open(self._get_filename("load-hour.png")) as fd:
+			self.assertIn("--daemon unix:/rrdcached.sock", fd.read())
+
+	def _get_lines(self, name):
+		with open(self._get_filename(name)) as fd:
+			return fd.read().splitlines()
+
+	def test_pipe_engine(self):
+		jobs = []
+		for i in range(10):
+			spec = openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+				"load-%d.png" % i), [ "--title", "Load average %d" % i ])
+			spec.COMMENT("Load \"%d\"" % i)
+			spec.COMMENT("")
+			jobs.append(spec)
+		with openmediavault.mkrrdgraph.PipeEngine() as engine:
+			failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 2,
+				engine)
+		self.assertEqual(failed, [])
+		for i in range(10):
+			self.assertEqual(self._get_lines("load-%d.png" % i), [
+				"--title Load average %d COMMENT:Load \"%d\" "
+				"COMMENT:" % (i, i) ])
+		# At most one process per worker has been started.
+		self.assertLessEqual(len(self._get_lines("pipes")), 2)
+
+	def test_pipe_engine_error(self):
+		with openmediavault.mkrrdgraph.PipeEngine() as engine:
+			self.assertRaises(openmediavault.mkrrdgraph.RrdtoolError,
+				engine.render, openmediavault.mkrrdgraph.GraphSpec(
+					self._get_filename("xyz/load.png")))
+			# The process is still used.
+			engine.render(openmediavault.mkrrdgraph.GraphSpec(
+				self._get_filename("load.png")))
+		self.assertTrue(os.path.exists(self._get_filename("load.png")))
+		self.assertEqual(len(self._get_lines("pipes")), 1)
+
+	def test_pipe_engine_fallback(self):
+		# Arguments containing both types of quotes can't be passed to
+		# 'rrdtool -', thus a separate process is used.
+		spec = openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+			"load.png"))
+		spec.COMMENT("It's \"now\"")
+		with openmediavault.mkrrdgraph.PipeEngine() as engine:
+			engine.render(spec)
+		self.assertEqual(self._get_lines("load.png"),
+			[ "COMMENT:It's \"now\"" ])
+		self.assertFalse(os.path.exists(self._get_filename("pipes")))
+
+	def test_pipe_engine_flushcached(self):
+		jobs = self._get_flush_jobs()
+		with openmediavault.mkrrdgraph.PipeEngine() as engine:
+			failed = openmediavault.mkrrdgraph.run_graph_jobs(jobs, 1,
+				engine)
+		self.assertEqual(failed, [])
+		self.assertEqual(self._get_lines("flushcached"), [
+			"--daemon unix:/rrdcached.sock %s" %
+			self._get_filename("load.rrd") ])
+		self.assertEqual(len(self._get_lines("pipes")), 1)
+
+	def test_get_graph_engine(self):
+		self.assertIsInstance(openmediavault.mkrrdgraph.get_graph_engine(
+			"subprocess"), openmediavault.mkrrdgraph.SubprocessEngine)
+		self.assertIsInstance(openmediavault.mkrrdgraph.get_graph_engine(
+			"pipe"), openmediavault.mkrrdgraph.PipeEngine)
+		self.assertIsInstance(openmediavault.mkrrdgraph.get_graph_engine(),
+			openmediavault.mkrrdgraph.PipeEngine if rrdtool is None else
+			openmediavault.mkrrdgraph.ModuleEngine)
+		# The module engine serializes the commands, thus it is not
+		# used if the graphs are rendered in parallel.
+		self.assertIsInstance(openmediavault.mkrrdgraph.get_graph_engine(
+			"auto", 4), openmediavault.mkrrdgraph.PipeEngine)
+		self.assertRaises(ValueError,
+			openmediavault.mkrrdgraph.get_graph_engine, "xyz")
+
+	@unittest.skipIf(rrdtool is None, "The rrdtool module is not installed")
+	def test_module_engine(self):
+		rrd = self._get_filename("load.rrd")
+		rrdtool.create(rrd, "--start", "now-1h", "--step", "60",
+			"DS:shortterm:GAUGE:120:0:U", "RRA:AVERAGE:0.5:1:60")
+		spec = openmediavault.mkrrdgraph.GraphSpec(self._get_filename(
+			"load.png"), [ "--start", "-1h" ])
+		spec.DEF("s", rrd, "shortterm", "AVERAGE")
+		spec.LINE("s", "#0000ff", "Load average")
+		with openmediavault.mkrrdgraph.ModuleEngine() as engine:
+			engine.render(spec)
+			self.assertRaises(openmediavault.mkrrdgraph.RrdtoolError,
+				engine.render, openmediavault.mkrrdgraph.GraphSpec(
+					self._get_filename("xyz/load.png")))
+		self.assertTrue(os.path.exists(self._get_filename("load.png")))
+
+	def test_get_graph_sources(self):
+		self.assertEqual(openmediavault.mkrrdgraph.get_graph_sources([
+			"df-root-hour.png",
+			"DEF:favg=/db/df-root/df_complex-free.rrd:value:AVERAGE",
+			"DEF:fmin=/db/df-root/df_complex-free.rrd:value:MIN",
+			"DEF:uavg=/db/df-root/df_complex-used.rrd:value:AVERAGE:step=60",
+			"CDEF:sum=favg,uavg,+",
+			"GPRINT:fmin:MIN:\"%5.1lf%sB Min\""
+		]), [
+			"/db/df-root/df_complex-free.rrd",
+			"/db/df-root/df_complex-used.rrd"
+		])
+
+	def test_load_collectd_config(self):
+		with open(self._get_filename("interface.conf"), "w") as fd:
+			fd.write("LoadPlugin interface\n<Plugin interface>\n"
+				"  Interface \"eth0\"\n  Interface \"eth1\"\n"
+				"  IgnoreSelected false\n</Plugin>\n")
+		old_value = openmediavault.setenv("OMV_COLLECTD_CONFIG_DIR",
+			self._tmpdir.name)
+		try:
+			self.assertEqual(openmediavault.mkrrdgraph.load_collectd_config(
+				"interface", "Interface"), [ "eth0", "eth1" ])
+			self.assertEqual(openmediavault.mkrrdgraph.load_collectd_config(
+				"interface", "IgnoreSelected"), [ "false" ])
+			self.assertEqual(openmediavault.mkrrdgraph.load_collectd_config(
+				"df", "MountPoint"), [])
+			# Unquoted values are returned as written in the file.
+			with open(self._get_filename("nut.conf"), "w") as fd:
+				fd.write("<Plugin nut>\n  UPS 01\n  UPS 1e3\n</Plugin>\n")
+			self.assertEqual(openmediavault.mkrrdgraph.load_collectd_config(
+				"nut", "UPS"), [ "01", "1e3" ])
+			# Files that can't be parsed are scanned line by line.
+			with open(self._get_filename("df.conf"), "w") as fd:
+				fd.write("<Plugin df>\n  MountPoint \"/srv\"\n"
+					"  Invalid <\n</Plugin>\n")
+			self.assertEqual(openmediavault.mkrrdgraph.load_collectd_config(
+				"df", "MountPoint"), [ "/srv" ])
+		finally:
+			if old_value is None:
+				openmediavault.settings.Environment.as_dict().pop(
+					"OMV_COLLECTD_CONFIG_DIR")
+			else:
+				openmediavault.setenv("OMV_COLLECTD_CONFIG_DIR", old_value)
+
+class GraphSpecTestCase(unittest.TestCase):
+	def test_to_args(self):
+		spec = openmediavault.mkrrdgraph.GraphSpec("load-hour.png",
+			[ "--daemon", "unix:/rrdcached.sock", "--width", "400" ])
+		spec.option("--start", "-1h").option("--slope-mode")
+		spec.DEF("savg", "/db/load/load.rrd", "shortterm", "AVERAGE")
+		spec.VDEF("smax", "savg,MAXIMUM")
+		spec.AREA("savg", "#00cc00")
+		spec.LINE("savg", "#0bb6ff", "Short")
+		spec.LINE("savg", "#ff0000", stack=True)
+		spec.GPRINT("savg", "%4.2lf Last\\l", "LAST")
+		spec.GPRINT("smax", "%4.2lf Max")
+		spec.COMMENT("Last update\\: now")
+		self.assertEqual(spec.to_args(), [ "load-hour.png",
+			"--daemon", "unix:/rrdcached.sock", "--width", "400",
+			"--start", "-1h", "--slope-mode",
+			"DEF:savg=/db/load/load.rrd:shortterm:AVERAGE",
+			"VDEF:smax=savg,MAXIMUM",
+			"AREA:savg#00cc00",
+			"LINE1:savg#0bb6ff:Short",
+			"LINE1:savg#ff0000::STACK",
+			"GPRINT:savg:LAST:%4.2lf Last\\l",
+			"GPRINT:smax:%4.2lf Max",
+			"COMMENT:Last update\\: now" ])
+		self.assertEqual(spec.to_args(daemon=False)[1:3],
+			[ "--width", "400" ])
+		self.assertEqual(spec.to_argv()[:3], [ "rrdtool", "graph",
+			"load-hour.png" ])
+		self.assertEqual(spec.get_option("--width"), "400")
+		self.assertIsNone(spec.get_option("--title"))
+		self.assertEqual(spec.sources, [ "/db/load/load.rrd" ])
+
+	def test_def_duplicate(self):
+		spec = openmediavault.mkrrdgraph.GraphSpec("cpu-hour.png")
+		spec.DEF("a", "/db/cpu.rrd", "value", "AVERAGE")
+		spec.DEF("a", "/db/cpu.rrd", "value", "AVERAGE")
+		spec.DEF("b", "/db/cpu.rrd", "value", "AVERAGE")
+		spec.DEF("c", "/db/cpu.rrd", "value", "MAX")
+		self.assertEqual(spec.to_args(), [ "cpu-hour.png",
+			"DEF:a=/db/cpu.rrd:value:AVERAGE",
+			"CDEF:b=a",
+			"DEF:c=/db/cpu.rrd:value:MAX" ])
+
+	def test_to_argv_shell(self):
+		spec = openmediavault.mkrrdgraph.GraphSpec("cpu-hour.png",
+			[ "--title", '"CPU usage"' ], shell=True)
+		self.assertEqual(spec.to_argv(),
+			'rrdtool graph cpu-hour.png --title "CPU usage"')
+
+PLUGIN = """import openmediavault.mkrrdgraph
+
+class Plugin(openmediavault.mkrrdgraph.IPlugin):
+	def create_graph(self, config):
+		return {!r}
+"""
+
+class PluginRegistryTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.registry = openmediavault.mkrrdgraph.PluginRegistry(
+			self._tmpdir.name)
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _write_plugin(self, name, content, mtime=None):
+		filename = os.path.join(self._tmpdir.name, name)
+		with open(filename, "w") as fd:
+			fd.write(content)
+		if mtime is not None:
+			os.utime(filename, (mtime, mtime))
+
+	def test_get_plugins(self):
+		self._write_plugin("cpu.py", PLUGIN.format("cpu"))
+		self._write_plugin("load.py", PLUGIN.format("load"))
+		self._write_plugin("README", "")
+		plugins = self.registry.get_plugins()
+		self.assertEqual(sorted(plugins), [ "cpu", "load" ])
+		self.assertEqual(plugins["cpu"].create_graph({}), "cpu")
+		# The plugins are not loaded again.
+		self.assertIs(self.registry.get_plugins()["cpu"], plugins["cpu"])
+
+	def test_reload(self):
+		self._write_plugin("cpu.py", PLUGIN.format("cpu"), 1000)
+		plugins = self.registry.get_plugins()
+		self._write_plugin("cpu.py", PLUGIN.format("cpu2"), 2000)
+		self.assertEqual(self.registry.get_plugins()["cpu"].create_graph(
+			{}), "cpu2")
+		os.unlink(os.path.join(self._tmpdir.name, "cpu.py"))
+		self.assertEqual(self.registry.get_plugins(), {})
+
+	def test_broken_plugin(self):
+		self._write_plugin("cpu.py", PLUGIN.format("cpu"))
+		self._write_plugin("df.py", "import xyz_does_not_exist\n")
+		self.assertEqual(sorted(self.registry.get_plugins()), [ "cpu" ])
+
+LOAD_PLUGIN = """import openmediavault.mkrrdgraph
+
+class Plugin(openmediavault.mkrrdgraph.IPlugin):
+	def create_graph(self, config):
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			'{image_dir}/load-{period}.png'.format(**config),
+			config['defaults'])
+		spec.option('--start', config['start'])
+		openmediavault.mkrrdgraph.render_graph(spec)
+"""
+
+class FileEngine(openmediavault.mkrrdgraph.GraphEngine):
+	"""
+	Writes the arguments into the image file.
+	"""
+
+	def __init__(self, delay=0):
+		self.delay = delay
+		self.count = 0
+
+	def execute(self, command, args):
+		time.sleep(self.delay)
+		self.count += 1
+		with open(args[0], "w") as fd:
+			fd.write(" ".join(args[1:]))
+
+# A plugin that creates a graph in a non-existing directory if the file
+# 'fail' exists in the image directory.
+FAIL_PLUGIN = """import os
+import openmediavault.mkrrdgraph
+
+class Plugin(openmediavault.mkrrdgraph.IPlugin):
+	def create_graph(self, config):
+		image_dir = config['image_dir']
+		if os.path.exists(os.path.join(image_dir, 'fail')):
+			image_dir = os.path.join(image_dir, 'xyz')
+		spec = openmediavault.mkrrdgraph.GraphSpec(
+			'{}/fail-{}.png'.format(image_dir, config['period']),
+			config['defaults'])
+		openmediavault.mkrrdgraph.render_graph(spec)
+"""
+
+def load_script(name):
+	"""
+	Load the given script from /usr/sbin as module.
+	"""
+	path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+		"..", "..", "..", "..", "sbin", name)
+	loader = importlib.machinery.SourceFileLoader(
+		name.replace("-", "_"), path)
+	module = importlib.util.module_from_spec(
+		importlib.util.spec_from_loader(loader.name, loader))
+	loader.exec_module(module)
+	return module
+
+class MainTestCase(FakeRrdtoolTestCase):
+	def setUp(self):
+		super().setUp()
+		self.script = load_script("omv-mkrrdgraph")
+		os.mkdir(self._get_filename("plugins.d"))
+		with open(self._get_filename("plugins.d/fail.py"), "w") as fd:
+			fd.write(FAIL_PLUGIN)
+		self._env = {}
+		for key, value in [
+				("OMV_MKRRDGRAPH_PLUGINS_DIR", self._get_filename("plugins.d")),
+				("OMV_COLLECTD_RRDTOOL_GRAPH_IMGDIR",
+					self._get_filename("images")) ]:
+			self._env[key] = openmediavault.settings.Environment.set(
+				key, value)
+		self._argv = sys.argv
+
+	def tearDown(self):
+		sys.argv = self._argv
+		for key, value in self._env.items():
+			openmediavault.settings.Environment.set(key, value)
+		super().tearDown()
+
+	def _main(self):
+		sys.argv = [ "omv-mkrrdgraph", "--engine", "subprocess" ]
+		return self.script.main()
+
+	def test_main(self):
+		self.assertEqual(self._main(), 0)
+		self.assertTrue(os.path.exists(self._get_filename(
+			"images/fail-hour.png")))
+
+	def test_main_fail(self):
+		# The exit code reports that some graphs could not be created.
+		os.makedirs(self._get_filename("images"))
+		open(self._get_filename("images/fail"), "w").close()
+		self.assertEqual(self._main(), 1)
+
+class GraphCacheTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		os.makedirs(self._get_filename("plugins.d"))
+		with open(self._get_filename("plugins.d/load.py"), "w") as fd:
+			fd.write(LOAD_PLUGIN)
+		self.engine = FileEngine()
+		self.cache = openmediavault.mkrrdgraph.GraphCache(
+			openmediavault.mkrrdgraph.PluginRegistry(
+				self._get_filename("plugins.d")), self.engine,
+			self._get_config)
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _get_filename(self, name):
+		return os.path.join(self._tmpdir.name, name)
+
+	def _get_config(self, period):
+		seconds = { "hour": 3600, "year": 31536000 }[period]
+		return { "defaults": [ "--width", "400" ], "period": period,
+			"start": "-1" + period[0], "seconds": seconds,
+			"image_dir": self._tmpdir.name }
+
+	def _set_mtime(self, name, mtime):
+		os.utime(self._get_filename(name), (mtime, mtime))
+
+	def test_get_graph(self):
+		filename = self.cache.get_graph("load-hour.png")
+		self.assertEqual(filename, self._get_filename("load-hour.png"))
+		with open(filename) as fd:
+			self.assertEqual(fd.read(), "--width 400 --start -1h")
+		# The graph is not rendered again within the resolution of
+		# its period (3600s / 400px).
+		self.cache.get_graph("load-hour.png")
+		self.assertEqual(self.engine.count, 1)
+		self._set_mtime("load-hour.png", time.time() - 10)
+		self.cache.get_graph("load-hour.png")
+		self.assertEqual(self.engine.count, 2)
+		# The resolution of the yearly graph is much lower.
+		self.cache.get_graph("load-year.png")
+		self._set_mtime("load-year.png", time.time() - 10)
+		self.cache.get_graph("load-year.png")
+		self.assertEqual(self.engine.count, 3)
+
+	def test_get_graph_unknown(self):
+		for name in [ "cpu-0-hour.png", "load-minute.png", "load.png",
+				"../load-hour.png", "load-hour.svg" ]:
+			self.assertRaises(KeyError, self.cache.get_graph, name)
+		self.assertEqual(self.engine.count, 0)
+
+	def test_get_graph_concurrent(self):
+		self.engine.delay = 0.2
+		threads = [ threading.Thread(target=self.cache.get_graph,
+			args=("load-hour.png",)) for _ in range(5) ]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(self.engine.count, 1)
+
+class RunCoalescerTestCase(unittest.TestCase):
+	def test_request(self):
+		runs = []
+		def func():
+			runs.append(len(runs))
+			time.sleep(0.2)
+			return len(runs)
+		runner = openmediavault.mkrrdgraph.RunCoalescer(func)
+		results = []
+		def request():
+			results.append(runner.request())
+		threads = [ threading.Thread(target=request) ]
+		threads[0].start()
+		time.sleep(0.05)
+		# These requests arrive while the first run is in progress,
+		# they are served together by the second run.
+		threads.extend(threading.Thread(target=request) for _ in range(3))
+		for thread in threads[1:]:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(len(runs), 2)
+		self.assertEqual(sorted(results), [ 1, 2, 2, 2 ])
+
+	def _wait_for(self, predicate):
+		for _ in range(200):
+			if predicate():
+				return
+			time.sleep(0.01)
+		self.fail("Timeout")
+
+	def test_request_result_per_run(self):
+		# Every request gets the result of the run that served it, even
+		# if a later run has been finished in the meantime.
+		gates = [ threading.Event() for _ in range(3) ]
+		runs = []
+		def func():
+			index = len(runs)
+			runs.append(index)
+			gates[index].wait(5)
+			return index
+		runner = openmediavault.mkrrdgraph.RunCoalescer(func)
+		results = {}
+		def request(name):
+			results[name] = runner.request()
+		def start(name):
+			thread = threading.Thread(target=request, args=(name,))
+			thread.start()
+			return thread
+		threads = [ start("a") ]
+		self._wait_for(lambda: len(runs) == 1)
+		threads.extend([ start("b"), start("c") ])
+		self._wait_for(lambda: runner._pending is not None)
+		time.sleep(0.05)
+		gates[0].set()
+		self._wait_for(lambda: len(runs) == 2)
+		threads.append(start("d"))
+		self._wait_for(lambda: runner._pending is not None)
+		gates[1].set()
+		gates[2].set()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(results, { "a": 0, "b": 1, "c": 1, "d": 2 })
+
+	def test_request_fail(self):
+		def func():
+			raise ValueError("xyz")
+		runner = openmediavault.mkrrdgraph.RunCoalescer(func)
+		self.assertRaises(ValueError, runner.request)
+		self.assertRaises(ValueError, runner.request)
+
+class GraphStateTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.rrd = self._get_filename("load.rrd")
+		self.image = self._get_filename("load-year.png")
+		for filename in [ self.rrd, self.image ]:
+			open(filename, "w").close()
+		self._set_mtime(1000)
+		self.spec = self._get_spec("-1y", "Last update\\: %s" %
+			time.ctime())
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _get_filename(self, name):
+		return os.path.join(self._tmpdir.name, name)
+
+	def _set_mtime(self, mtime):
+		os.utime(self.rrd, (mtime, mtime))
+
+	def _get_spec(self, start, comment):
+		spec = openmediavault.mkrrdgraph.GraphSpec(self.image,
+			[ "--start", start ])
+		spec.DEF("s", self.rrd, "shortterm", "AVERAGE")
+		spec.COMMENT(comment)
+		return spec
+
+	def _get_state(self):
+		state = openmediavault.mkrrdgraph.GraphState(
+			self._get_filename("state/mkrrdgraph.json"))
+		state.load()
+		return state
+
+	def test_is_outdated(self):
+		state = self._get_state()
+		self.assertTrue(state.is_outdated(self.spec, 60))
+		state.update(self.spec)
+		self.assertFalse(state.is_outdated(self.spec, 60))
+		# The data has not advanced enough.
+		self._set_mtime(1060)
+		self.assertFalse(state.is_outdated(self.spec, 60))
+		self._set_mtime(1061)
+		self.assertTrue(state.is_outdated(self.spec, 60))
+
+	def test_is_outdated_comment(self):
+		state = self._get_state()
+		state.update(self.spec)
+		spec = self._get_spec("-1y", "Last update\\: now")
+		self.assertFalse(state.is_outdated(spec, 60))
+
+	def test_is_outdated_args(self):
+		state = self._get_state()
+		state.update(self.spec)
+		spec = self._get_spec("-2y", "Last update\\: now")
+		self.assertTrue(state.is_outdated(spec, 60))
+
+	def test_is_outdated_missing(self):
+		state = self._get_state()
+		state.update(self.spec)
+		os.unlink(self.image)
+		self.assertTrue(state.is_outdated(self.spec, 60))
+
+	def test_save(self):
+		state = self._get_state()
+		state.update(self.spec)
+		state.save()
+		self.assertFalse(self._get_state().is_outdated(self.spec, 60))
+
+	def test_load_corrupt(self):
+		os.makedirs(self._get_filename("state"))
+		with open(self._get_filename("state/mkrrdgraph.json"), "w") as fd:
+			fd.write("{")
+		self.assertTrue(self._get_state().is_outdated(self.spec, 60))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import os
+import tempfile
+import unittest
+import openmediavault.plugins
+
+PLUGIN = """import os
+
+# Record that the module has been imported.
+open(os.path.join({dir!r}, "{name}.imported"), "w").close()
+
+class IPlugin(object):
+	pass
+
+class Command(IPlugin):
+{body}
+"""
+
+class IPlugin(object):
+	pass
+
+class RegistryTestCase(unittest.TestCase):
+	def setUp(self):
+		self._tmpdir = tempfile.TemporaryDirectory()
+		self.registry = openmediavault.plugins.Registry(self._tmpdir.name,
+			"Command")
+
+	def tearDown(self):
+		self._tmpdir.cleanup()
+
+	def _write_plugin(self, name, body, mtime=None):
+		filename = os.path.join(self._tmpdir.name, "%s.py" % name)
+		with open(filename, "w") as fd:
+			fd.write(PLUGIN.format(dir=self._tmpdir.name, name=name,
+				body=body))
+		if mtime is not None:
+			os.utime(filename, (mtime, mtime))
+
+	def _is_imported(self, name):
+		return os.path.exists(os.path.join(self._tmpdir.name,
+			"%s.imported" % name))
+
+	def test_get_entries(self):
+		self._write_plugin("read", "\t@property\n\tdef description(self):\n"
+			"\t\treturn \"Read objects.\"")
+		self._write_plugin("list-ids", "\tdescription = 'List IDs.'")
+		with open(os.path.join(self._tmpdir.name, "helper.py"), "w") as fd:
+			fd.write("def xyz():\n\tpass\n")
+		entries = self.registry.get_entries()
+		self.assertEqual(list(entries), [ "list-ids", "read" ])
+		self.assertEqual(entries["read"].description, "Read objects.")
+		self.assertEqual(entries["list-ids"].description, "List IDs.")
+		# Listing the plugins does not import them.
+		self.assertFalse(self._is_imported("read"))
+		self.assertFalse(self._is_imported("list-ids"))
+
+	def test_get_instance(self):
+		self._write_plugin("read", "\tdescription = 'Read objects.'")
+		self._write_plugin("update", "\tdescription = 'Update objects.'")
+		instance = self.registry.get("read").get_instance()
+		self.assertEqual(instance.description, "Read objects.")
+		self.assertIs(self.registry.get("read").get_instance(), instance)
+		self.assertTrue(self._is_imported("read"))
+		self.assertFalse(self._is_imported("update"))
+
+	def test_computed_description(self):
+		self._write_plugin("read", "\t@property\n\tdef description(self):\n"
+			"\t\treturn 'Read %s.' % 'objects'")
+		self.assertEqual(self.registry.get("read").description,
+			"Read objects.")
+		self.assertTrue(self._is_imported("read"))
+
+	def test_reload(self):
+		self._write_plugin("read", "\tdescription = 'a'", 1000)
+		entry = self.registry.get("read")
+		entry.get_instance()
+		self.assertIs(self.registry.get("read"), entry)
+		self._write_plugin("read", "\tdescription = 'b'", 2000)
+		self.assertEqual(self.registry.get("read").get_instance().description,
+			"b")
+		os.unlink(os.path.join(self._tmpdir.name, "read.py"))
+		self.assertRaises(KeyError, self.registry.get, "read")
+
+	def test_base_class(self):
+		self._write_plugin("read", "\tdescription = 'a'")
+		registry = openmediavault.plugins.Registry(self._tmpdir.name,
+			"Command", IPlugin)
+		self.assertRaises(TypeError, registry.get("read").get_instance)
+		# The plugin is handled like an unknown plugin afterwards.
+		self.assertNotIn("read", registry.get_entries())
+		self.assertRaises(KeyError, registry.get, "read")
+
+	def test_base_class_object(self):
+		# A class that is derived from 'object' only can't be a plugin,
+		# it is not listed at all.
+		with open(os.path.join(self._tmpdir.name, "read.py"), "w") as fd:
+			fd.write("class Command(object):\n\tdescription = 'a'\n")
+		registry = openmediavault.plugins.Registry(self._tmpdir.name,
+			"Command", IPlugin)
+		self.assertEqual(registry.get_entries(), {})
+		self.assertFalse(self._is_imported("read"))
+
+	def test_base_class_description(self):
+		self._write_plugin("read", "\tdescription = 'a'.upper()")
+		self._write_plugin("write", "\tdescription = 'b'")
+		registry = openmediavault.plugins.Registry(self._tmpdir.name,
+			"Command", IPlugin)
+		# The plugin is imported to get the description.
+		entry = registry.get("read")
+		self.assertRaises(TypeError, getattr, entry, "description")
+		self.assertEqual(list(registry.get_entries()), [ "write" ])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of OpenMediaVault.
+#
+# @license   http://www.gnu.org/licenses/gpl.html GPL Version 3
+# @author    Volker Theile <volker.theile@openmediavault.org>
+# @copyright Copyright (c) 2009-2018 Volker Theile
+#
+# OpenMediaVault is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# OpenMediaVault is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OpenMediaVault. If not, see <http://www.gnu.org/licenses/>.
+import asyncio
+import time
+import unittest
+import openmediavault.rpc
+import openmediavault.rpc.aio
+from engined_stub import EnginedStub
+
+class RpcClientTestCase(unittest.TestCase):
+	def setUp(self):
+		self.server = EnginedStub()
+		self.server.start()
+
+	def tearDown(self):
+		self.server.stop()
+
+	def _get_client(self):
+		return openmediavault.rpc.RpcClient(self.server.address, 10, 10)
+
+	def test_call(self):
+		with self._get_client() as client:
+			response = client.call("Test", "echo", { "a": 1 })
+		self.assertEqual(response["service"], "Test")
+		self.assertEqual(response["params"], { "a": 1 })
+		self.assertEqual(response["context"]["username"], "admin")
+
+	def test_call_persistent(self):
+		with self._get_client() as client:
+			for i in range(3):
+				response = client.call("Test", "echo", i)
+				self.assertEqual(response["params"], i)
+		self.assertEqual(self.server.connections, 1)
+
+	def test_call_big(self):
+		with self._get_client() as client:
+			response = client.call("Test", "big", { "size": 300000 })
+			self.assertEqual(len(response), 300000)
+			# The connection is still usable.
+			response = client.call("Test", "echo")
+			self.assertEqual(response["method"], "echo")
+
+	def test_call_fail(self):
+		with self._get_client() as client:
+			with self.assertRaises(openmediavault.rpc.RpcException) as cm:
+				client.call("Test", "fail")
+		self.assertEqual(str(cm.exception), "Failed")
+		self.assertEqual(cm.exception.code, 5001)
+		self.assertEqual(cm.exception.trace, "#0 {main}")
+
+	def test_call_many(self):
+		with self._get_client() as client:
+			responses = client.call_many([
+				("Test", "echo", 1),
+				("Test", "big", { "size": 70000 }),
+				("Test", "echo", 3)
+			])
+		self.assertEqual(len(responses), 3)
+		self.assertEqual(responses[0]["params"], 1)
+		self.assertEqual(len(responses[1]), 70000)
+		self.assertEqual(responses[2]["params"], 3)
+		self.assertEqual(self.server.connections, 1)
+
+	def test_call_many_empty(self):
+		with self._get_client() as client:
+			self.assertEqual(client.call_many([]), [])
+			self.assertFalse(client.connected)
+
+	def test_call_many_fail(self):
+		with self._get_client() as client:
+			self.assertRaises(openmediavault.rpc.RpcException,
+				client.call_many, [
+					("Test", "echo", 1),
+					("Test", "fail", None)
+				])
+			# The remaining responses have been consumed.
+			response = client.call("Test", "echo", 2)
+			self.assertEqual(response["params"], 2)
+
+	def _wait_closed(self, count):
+		for i in range(100):
+			if self.server.closed >= count:
+				return
+			time.sleep(0.01)
+		self.fail("The connection has not been closed")
+
+	def test_reconnect(self):
+		self.server.keepalive = False
+		with self._get_client() as client:
+			for i in range(3):
+				# The idle connection has been closed by the daemon.
+				self._wait_closed(i)
+				response = client.call("Test", "echo", i)
+				self.assertEqual(response["params"], i)
+		self.assertEqual(self.server.connections, 3)
+		self.assertEqual(self.server.requests, [ "echo" ] * 3)
+
+	def test_no_retry_after_send(self):
+		# The requests are not sent again if the connection breaks
+		# after they have been sent, e.g. because the child process of
+		# the daemon died after executing some of them.
+		self.server.crashes = 1
+		with self._get_client() as client:
+			client.call("Test", "echo")
+			self.assertRaises(ConnectionError, client.call_many, [
+				("Test", "crash", None), ("Test", "echo", 1) ])
+			self.assertFalse(client.connected)
+		self.assertEqual(self.server.requests, [ "echo", "crash" ])
+
+	def test_retry_idempotent(self):
+		self.server.crashes = 1
+		with self._get_client() as client:
+			client.call("Test", "echo")
+			response = client.call("Test", "crash", 1, idempotent=True)
+			self.assertEqual(response["params"], 1)
+		self.assertEqual(self.server.requests, [ "echo", "crash", "crash" ])
+		self.assertEqual(self.server.connections, 2)
+
+	def test_get_pooled(self):
+		client = openmediavault.rpc.RpcClient.get_pooled(
+			self.server.address)
+		self.assertIsInstance(client, openmediavault.rpc.RpcClient)
+		self.assertIs(client, openmediavault.rpc.RpcClient.get_pooled(
+			self.server.address))
+
+class AioTestCase(unittest.TestCase):
+	def setUp(self):
+		self.server = EnginedStub()
+		self.server.start()
+
+	def tearDown(self):
+		self.server.stop()
+
+	def _run(self, coro):
+		loop = asyncio.new_event_loop()
+		try:
+			return loop.run_until_complete(coro)
+		finally:
+			loop.close()
+
+	def test_call(self):
+		response = self._run(openmediavault.rpc.aio.call("Test", "echo",
+			{ "a": 1 }, address=self.server.address, timeout=10))
+		self.assertEqual(response["method"], "echo")
+		self.assertEqual(response["params"], { "a": 1 })
+
+	def test_call_big(self):
+		response = self._run(openmediavault.rpc.aio.call("Test", "big",
+			{ "size": 300000 }, address=self.server.address, timeout=10))
+		self.assertEqual(len(response), 300000)
+
+	def test_call_fail(self):
+		with self.assertRaises(openmediavault.rpc.RpcException) as cm:
+			self._run(openmediavault.rpc.aio.call("Test", "fail",
+				address=self.server.address, timeout=10))
+		self.assertEqual(cm.exception.code, 5001)
+
+	def test_gather_calls(self):
+		calls = [ ("Test", "echo", i) for i in range(10) ]
+		responses = self._run(openmediavault.rpc.aio.gather_calls(calls,
+			limit=3, address=self.server.address, timeout=10))
+		self.assertEqual([ r["params"] for r in responses ],
+			list(range(10)))
+		self.assertEqual(self.server.connections, 3)
+
+	def test_gather_calls_concurrent(self):
+		calls = [ ("Test", "sleep", { "seconds": 0.2 }) ] * 4
+		start = time.monotonic()
+		self._run(openmediavault.rpc.aio.gather_calls(calls, limit=4,
+			address=self.server.address, timeout=10))
+		self.assertLess(time.monotonic() - start, 0.6)
+
+	def test_gather_calls_fail(self):
+		calls = [ ("Test", "echo", 1), ("Test", "fail", None) ]
+		self.assertRaises(openmediavault.rpc.RpcException, self._run,
+			openmediavault.rpc.aio.gather_calls(calls, limit=1,
+				address=self.server.address, timeout=10))
+
+	def test_gather_calls_return_exceptions(self):
+		calls = [ ("Test", "fail", None), ("Test", "echo", 2) ]
+		responses = self._run(openmediavault.rpc.aio.gather_calls(calls,
+			limit=1, address=self.server.address, timeout=10,
+			return_exceptions=True))
+		self.assertIsInstance(responses[0],
+			openmediavault.rpc.RpcException)
+		self.assertEqual(responses[1]["params"], 2)
+
+	def test_gather_calls_timeout(self):
+		calls = [
+			("Test", "sleep", { "seconds": 0.5 }),
+			("Test", "echo", 2)
+		]
+		responses = self._run(openmediavault.rpc.aio.gather_calls(calls,
+			limit=1, address=self.server.address, timeout=0.1,
+			return_exceptions=True))
+		self.assertIsInstance(responses[0], asyncio.TimeoutError)
+		# A new connection has been used for the second call.
+		self.assertEqual(responses[1]["params"], 2)
+		self.assertEqual(self.server.connections, 2)
+
+	def test_gather_calls_invalid_limit(self):
+		calls = [ ("Test", "echo", 1) ]
+		self.assertRaises(ValueError, self._run,
+			openmediavault.rpc.aio.gather_calls(calls, limit=0,
+				address=self.server.address, timeout=10))
+
+	def test_gather_calls_empty(self):
+		self.assertEqual(self._run(openmediavault.rpc.aio.gather_calls([],
+			address=self.server.address, timeout=10)), [])
+
+if __name__ == "__main__":
+	unittest.main()
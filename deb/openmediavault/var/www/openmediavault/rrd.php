@@ -36,6 +36,17 @@ try {
 		throw new \OMV\Exception(
 		  "The parameter 'name' contains forbidden two-dot symbols.");
 	}
+	// Let the omv-mkrrdgraph daemon render the graph if it is outdated.
+	// The existing image is displayed if the daemon is not running.
+	$socket = @stream_socket_client(sprintf("unix://%s",
+	  \OMV\Environment::get("OMV_MKRRDGRAPH_SOCKET",
+	  "/var/run/omv-mkrrdgraph.sock")), $errno, $errstr, 1);
+	if (FALSE !== $socket) {
+		stream_set_timeout($socket, 30);
+		fwrite($socket, sprintf("graph %s\n", $_GET['name']));
+		fgets($socket);
+		fclose($socket);
+	}
 	// Build the image file path. If it does not exist, then display an
 	// error image by default.
 	$pathName = build_path(DIRECTORY_SEPARATOR, \OMV\Environment::get(